@@ -0,0 +1,66 @@
+"""
+Benchmark the fused intake call against the classifier + clarifier two-call path.
+
+Usage:
+    python benchmark_intake.py [runs_per_idea]
+"""
+import sys
+import time
+import uuid
+import statistics
+from langchain_core.messages import HumanMessage
+
+from src.agents.agent import get_classifier_agent, get_clarifier_agent, get_intake_agent
+from src.models.agentComp import ClarifierResp, IntakeResp
+from src.utils.helper import process_agent_response
+from src.utils import toon
+from src.config.model_config import get_model
+
+IDEAS = [
+    "A habit tracker for remote software teams with Slack reminders and weekly streak reports.",
+    "A marketplace where local farmers sell produce subscriptions directly to city households.",
+    "An app that helps parents of toddlers plan allergy-safe meals and share recipes.",
+]
+
+def _invoke(agent, content: str):
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    start = time.perf_counter()
+    result = agent.invoke({"messages": [HumanMessage(content=content)]}, config)
+    elapsed = time.perf_counter() - start
+    message = result["messages"][-1]
+    usage = message.response_metadata.get("token_usage", {}) if hasattr(message, "response_metadata") else {}
+    return message.content, elapsed, usage.get("total_tokens", 0)
+
+def run_two_call(classifier, clarifier, idea: str):
+    classification, t1, tok1 = _invoke(classifier, f"Idea: {idea}")
+    questions, t2, tok2 = _invoke(clarifier, f"Start gathering requirements for a new mobile app based on this: {idea}.")
+    parsed = bool(toon.parse_response(classification).get("domain")) and process_agent_response(questions, ClarifierResp) is not None
+    return t1 + t2, tok1 + tok2, parsed
+
+def run_fused(intake, idea: str):
+    response, elapsed, tokens = _invoke(intake, f"Start gathering requirements for a new mobile app based on this: {idea}.")
+    return elapsed, tokens, process_agent_response(response, IntakeResp) is not None
+
+def report(name: str, samples):
+    latencies = [s[0] for s in samples]
+    tokens = [s[1] for s in samples]
+    parsed = sum(1 for s in samples if s[2])
+    print(f"{name:>10}: median {statistics.median(latencies):.2f}s | "
+          f"mean tokens {statistics.mean(tokens):.0f} | parsed {parsed}/{len(samples)}")
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    model = get_model(agent_type="clarifier")
+    classifier = get_classifier_agent(model)
+    clarifier = get_clarifier_agent(model)
+    intake = get_intake_agent(model)
+
+    two_call, fused = [], []
+    for idea in IDEAS:
+        for _ in range(runs):
+            two_call.append(run_two_call(classifier, clarifier, idea))
+            fused.append(run_fused(intake, idea))
+
+    print(f"\n{len(IDEAS)} ideas x {runs} runs")
+    report("two-call", two_call)
+    report("fused", fused)
@@ -0,0 +1,90 @@
+"""
+Benchmark the local CPU model against the hosted model on the cheap stages.
+
+Runs the classifier and the TTS text converter on both providers and reports
+latency, parse rate and how often the local classification agrees with the
+hosted one. Start a local OpenAI-compatible server first (see LOCAL_MODEL_BASE),
+e.g. llama.cpp: llama-server -m qwen2.5-1.5b-instruct-q4_k_m.gguf --port 8080
+
+Usage:
+    python benchmark_local_model.py [runs_per_input]
+"""
+import sys
+import time
+import uuid
+import statistics
+from langchain_core.messages import HumanMessage
+
+from src.agents.agent import get_classifier_agent
+from src.services.tts.tts_summarize import get_tts_converter_agent
+from src.utils import toon
+from src.config.model_config import get_model, select_model
+
+IDEAS = [
+    "A habit tracker for remote software teams with Slack reminders and weekly streak reports.",
+    "A marketplace where local farmers sell produce subscriptions directly to city households.",
+    "An app that helps parents of toddlers plan allergy-safe meals and share recipes.",
+]
+
+SUMMARIES = [
+    "The platform combines a React Native client, a FastAPI backend and PostgreSQL. Estimated MVP timeline is "
+    "12 weeks at roughly $40,000. Key risks are GDPR consent for analytics and payment provider lock-in.",
+    "Market analysis shows three direct competitors priced between $5 and $12 per month. The viability score is "
+    "7/10; the main gap is offline support for rural users.",
+]
+
+def _invoke(agent, content: str):
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    start = time.perf_counter()
+    result = agent.invoke({"messages": [HumanMessage(content=content)]}, config)
+    return result["messages"][-1].content, time.perf_counter() - start
+
+def run_classifier(agent, idea: str):
+    response, elapsed = _invoke(agent, f"Idea: {idea}")
+    parsed = toon.parse_response(response)
+    label = (str(parsed.get("domain", "")).strip().lower(), str(parsed.get("complexity", "")).strip().lower())
+    return elapsed, bool(label[0]), label
+
+def run_tts(agent, summary: str):
+    response, elapsed = _invoke(agent, summary)
+    # Usable TTS text: non-empty and free of markdown / code fences
+    usable = bool(response.strip()) and "```" not in response and "**" not in response
+    return elapsed, usable, len(response)
+
+def report(name: str, samples):
+    latencies = [s[0] for s in samples]
+    ok = sum(1 for s in samples if s[1])
+    print(f"{name:>20}: median {statistics.median(latencies):.2f}s | p90 {sorted(latencies)[int(len(latencies) * 0.9)]:.2f}s"
+          f" | usable {ok}/{len(samples)}")
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    providers = {
+        # An explicit model name keeps the hosted run off LOCAL_AGENT_TYPES routing
+        "hosted": lambda agent_type: get_model(provider="openai", model_name=select_model(agent_type)),
+        "local": lambda agent_type: get_model(provider="local", agent_type=agent_type),
+    }
+
+    results = {}
+    for provider, make_model in providers.items():
+        classifier = get_classifier_agent(make_model("classifier"), stateless=True)
+        tts = get_tts_converter_agent(make_model("tts_converter"))
+        results[provider] = {
+            "classifier": [run_classifier(classifier, idea) for idea in IDEAS for _ in range(runs)],
+            "tts": [run_tts(tts, summary) for summary in SUMMARIES for _ in range(runs)],
+        }
+
+    print(f"\n{len(IDEAS)} ideas / {len(SUMMARIES)} summaries x {runs} runs")
+    for stage in ("classifier", "tts"):
+        for provider in providers:
+            report(f"{stage} ({provider})", results[provider][stage])
+
+    hosted_labels = [s[2] for s in results["hosted"]["classifier"]]
+    local_labels = [s[2] for s in results["local"]["classifier"]]
+    domain_agree = sum(1 for h, l in zip(hosted_labels, local_labels) if h[0] and h[0] == l[0])
+    complexity_agree = sum(1 for h, l in zip(hosted_labels, local_labels) if h[1] and h[1] == l[1])
+    print(f"\nclassifier agreement with hosted: domain {domain_agree}/{len(hosted_labels)}, "
+          f"complexity {complexity_agree}/{len(hosted_labels)}")
+    hosted_len = statistics.mean(s[2] for s in results["hosted"]["tts"])
+    local_len = statistics.mean(s[2] for s in results["local"]["tts"])
+    print(f"tts output length local/hosted: {local_len / hosted_len:.2f}")
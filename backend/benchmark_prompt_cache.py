@@ -0,0 +1,59 @@
+"""
+Measure provider prompt-cache hits and latency for the static-prefix prompt layout.
+
+Runs the clarifier and product agents with several max_questions / max_features
+settings and different ideas. The system prompt prefix is identical across all
+of them, so after the first call per agent the provider can serve it from cache.
+Note: OpenAI only caches prompts of 1024+ tokens.
+
+Usage:
+    python benchmark_prompt_cache.py [rounds]
+"""
+import sys
+import time
+import uuid
+import statistics
+from langchain_core.messages import HumanMessage
+
+from src.agents.agent import get_clarifier_agent, get_product_agent
+from src.config.model_config import get_model
+from src.utils.token_tracker import cached_prompt_tokens
+
+IDEAS = [
+    "A habit tracker for remote software teams with Slack reminders and weekly streak reports.",
+    "A marketplace where local farmers sell produce subscriptions directly to city households.",
+    "An app that helps parents of toddlers plan allergy-safe meals and share recipes.",
+]
+LIMITS = [2, 3, 5]
+
+def _invoke(agent, content: str):
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    start = time.perf_counter()
+    result = agent.invoke({"messages": [HumanMessage(content=content)]}, config)
+    elapsed = time.perf_counter() - start
+    message = result["messages"][-1]
+    usage = message.response_metadata.get("token_usage", {}) if hasattr(message, "response_metadata") else {}
+    return elapsed, usage.get("prompt_tokens", 0), cached_prompt_tokens(usage)
+
+def run(name: str, factory, rounds: int):
+    samples = []
+    for _ in range(rounds):
+        for limit in LIMITS:
+            agent = factory(limit)
+            for idea in IDEAS:
+                samples.append(_invoke(agent, f"Start gathering requirements for a new mobile app based on this: {idea}."))
+
+    cold, warm = samples[0], samples[1:]
+    prompt = sum(s[1] for s in samples)
+    cached = sum(s[2] for s in samples)
+    hits = [s[0] for s in warm if s[2]]
+    misses = [s[0] for s in warm if not s[2]]
+    print(f"{name:>10}: {len(samples)} calls | cold {cold[0]:.2f}s | "
+          f"cache hit rate {cached / prompt if prompt else 0:.1%} ({len(hits)}/{len(warm)} warm calls hit)")
+    if hits and misses:
+        print(f"{'':>10}  median latency hit {statistics.median(hits):.2f}s vs miss {statistics.median(misses):.2f}s")
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    run("clarifier", lambda n: get_clarifier_agent(get_model(agent_type="clarifier"), max_questions=n), rounds)
+    run("product", lambda n: get_product_agent(get_model(agent_type="product"), max_features=n), rounds)
@@ -1,25 +1,20 @@
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpoint import get_checkpointer
 from src.config.model_config import get_model
 
 # --- Create memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 
 from src.config.model_limits import get_agent_limit
-
-# --- Create agents ---
-def get_clarifier_agent(model, max_questions=None):
-    if max_questions is None:
-        max_questions = get_agent_limit("clarifier", "max_questions", 5)
-    
-    max_tokens = get_agent_limit("clarifier", "max_tokens", 1000)
-    if max_tokens:
-        model = model.bind(max_tokens=max_tokens)
-        
-    return create_react_agent(
-        model=model,
-        tools=[],
-        prompt=f"""
+from src.utils.max_tokens_tuner import with_max_tokens
+from src.utils.prompt_layout import build_prompt
+from src.utils.structured_output import with_output_mode
+from src.models.agentComp import ClarifierResp, ProductResp, IntakeResp
+
+# --- Static prompts ---
+# Kept free of run-specific values so the prefix stays byte-identical across
+# configurations; limits are appended by build_prompt.
+CLARIFIER_PROMPT = """
 You are Clarifier, an expert in gathering product requirements.
 Your task is to ask focused questions about product features and business logic to the user.
 
@@ -29,7 +24,7 @@ Instructions:
 3. Leave the "answer" field EMPTY for every question you ask.
 4. If the user has provided answers in the chat history, use that context to ask follow-up questions or set "done" to true if you have enough information.
 
-Limit the total number of questions to a maximum of {max_questions}.
+Never ask more questions in total than the max_questions run setting.
 
 Your response must be in TOON (Token-Oriented Object Notation) format:
 
@@ -46,25 +41,11 @@ Important:
 - ALWAYS include the header line "question | answer" before the list of questions.
 - ALWAYS leave the answer field empty when asking a question.
 - Set "done" to true ONLY when you have a clear understanding of the product requirements (usually after 2-3 rounds of Q&A).
-""",
-        checkpointer=memory,
-        name="Clarifier",
-    )
+"""
 
-def get_product_agent(model, max_features=None):
-    if max_features is None:
-        max_features = get_agent_limit("product", "max_features", 5)
-    
-    max_tokens = get_agent_limit("product", "max_tokens", 1500)
-    if max_tokens:
-        model = model.bind(max_tokens=max_tokens)
-        
-    return create_react_agent(
-        model=model,
-        tools=[],
-        prompt=f"""
+PRODUCT_PROMPT = """
 You are Product, responsible for confirming requirements and providing feature details.
-Based on the conversation history, generate a product description with at least {max_features} features.
+Based on the conversation history, generate a product description with at least min_features features (see run settings).
 
 Your response must be in TOON format:
 
@@ -79,14 +60,68 @@ features:
 Important:
 - Respond with ONLY the TOON data
 - ALWAYS include the header line "name | reason | goal_oriented | development_time | cost_estimate" before the list of features.
-- Include at least {max_features} features
+- Include at least min_features features
 - Follow the exact indentation and CSV-like structure for lists
-""",
-        checkpointer=memory,
-        name="Product"
+"""
+
+INTAKE_PROMPT = """
+You are Intake, combining the Classifier and Clarifier roles.
+For the user's product idea you must, in ONE response:
+1. Identify the core product concept or problem being solved.
+2. Categorize the domain (e.g., Health & Fitness, Productivity, Social, etc.).
+3. Assess the complexity (Low, Medium, High).
+4. Ask 3-5 distinct questions about product features and business logic that will help clarify the idea.
+
+Rules for the questions:
+- Do NOT infer or make up answers. You must ask the user.
+- Leave the "answer" field EMPTY for every question you ask.
+- Never ask more questions than the max_questions run setting.
+
+Your response must be in TOON (Token-Oriented Object Notation) format:
+
+```toon
+idea: The core product idea summary
+domain: The primary domain
+complexity: Low/Medium/High
+done: false
+resp:
+  question | answer
+  What is the target audience? | 
+  What are the key features? | 
+```
+
+Important:
+- Respond with ONLY the TOON data.
+- ALWAYS include the header line "question | answer" before the list of questions.
+- "done" is always false in this first round.
+"""
+
+# --- Create agents ---
+def get_clarifier_agent(model, max_questions=None, structured=None, stateless=False):
+    if max_questions is None:
+        max_questions = get_agent_limit("clarifier", "max_questions", 5)
+    
+    model = with_max_tokens(model, "clarifier")
+        
+    return with_output_mode(
+        "Clarifier", model, build_prompt(CLARIFIER_PROMPT, max_questions=max_questions), ClarifierResp,
+        lambda m, p: create_react_agent(model=m, tools=[], prompt=p, checkpointer=None if stateless else memory, name="Clarifier"),
+        structured=structured,
+    )
+
+def get_product_agent(model, max_features=None, structured=None, stateless=False):
+    if max_features is None:
+        max_features = get_agent_limit("product", "max_features", 5)
+    
+    model = with_max_tokens(model, "product")
+        
+    return with_output_mode(
+        "Product", model, build_prompt(PRODUCT_PROMPT, min_features=max_features), ProductResp,
+        lambda m, p: create_react_agent(model=m, tools=[], prompt=p, checkpointer=None if stateless else memory, name="Product"),
+        structured=structured,
     )
 
-def get_classifier_agent(model):
+def get_classifier_agent(model, stateless=False):
     """
     Creates an agent responsible for classifying user input into a product idea.
     """
@@ -113,10 +148,26 @@ domain: The primary domain
 complexity: Low/Medium/High
 ```
 """,
-        checkpointer=memory,
+        checkpointer=None if stateless else memory,
         name="Classifier"
     )
 
+def get_intake_agent(model, max_questions=None, structured=None, stateless=False):
+    """
+    Creates an agent that classifies the idea and asks the first round of
+    clarifier questions in a single completion.
+    """
+    if max_questions is None:
+        max_questions = get_agent_limit("clarifier", "max_questions", 5)
+
+    model = with_max_tokens(model, "clarifier")
+
+    return with_output_mode(
+        "Intake", model, build_prompt(INTAKE_PROMPT, max_questions=max_questions), IntakeResp,
+        lambda m, p: create_react_agent(model=m, tools=[], prompt=p, checkpointer=None if stateless else memory, name="Intake"),
+        structured=structured,
+    )
+
 # Backward compatibility (uses default model)
 try:
     from src.config.model_config import default_model
@@ -5,31 +5,34 @@ from typing import List, Dict, Any
 from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpoint import get_checkpointer
 
 from src.utils import toon
 from src.config.model_limits import get_agent_limit
+from src.utils.max_tokens_tuner import with_max_tokens
+from src.utils.prompt_layout import build_prompt
+from src.utils.structured_output import with_output_mode
+from src.models.agentComp import CustomerResp
 from src.config.model_config import get_model
 # --- Memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 
 # --- Factory Function ---
-def get_customer_agent(model):
+def get_customer_agent(model, structured=None, stateless=False):
     # Get limits
     max_results = get_agent_limit("customer", "max_results", 2)
     min_features = get_agent_limit("customer", "min_features",1)
-    max_tokens = get_agent_limit("customer", "max_tokens", 2000)
+    # max_tokens is resolved per call from the observed completion lengths
+    model = with_max_tokens(model, "customer")
     
     # Bind parameters to model
     bind_params = {}
     # bind_params["plugins"] = [{"id": "web", "max_results": max_results}] # Removed as it causes 500 error with current provider
-    if max_tokens:
-        bind_params["max_tokens"] = max_tokens
     
     if bind_params:
         model = model.bind(**bind_params)
     
-    market_analyst_prompt = f"""
+    market_analyst_prompt = """
 You are Customer, a market research expert.
 Your goal is to validate product ideas against current market trends and competitor data.
 
@@ -60,16 +63,16 @@ Important:
 - Use the exact format shown above
 - **target_audience** MUST be a single descriptive string, NOT a list or object.
 - ALWAYS include the header line "name | pros | cons | pricing" before the list of competitors
-- Include at least {min_features} competitors if possible
+- Include at least min_competitors competitors (see run settings) if possible
+- Put pros and cons as short comma-separated lists and pricing as an amount with its period (e.g. $10/mo)
+- Do NOT include chart or graph data; it is computed from your competitor table
 - Be specific with your analysis
 """
     
-    return create_react_agent(
-        model=model,
-        tools=[],
-        prompt=market_analyst_prompt,
-        checkpointer=memory,
-        name="Customer"
+    return with_output_mode(
+        "Customer", model, build_prompt(market_analyst_prompt, min_competitors=min_features), CustomerResp,
+        lambda m, p: create_react_agent(model=m, tools=[], prompt=p, checkpointer=None if stateless else memory, name="Customer"),
+        structured=structured,
     )
 
 # --- Customer Function ---
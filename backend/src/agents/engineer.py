@@ -1,10 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
-from src.models.agentComp import ClarifierResp, ProductResp
+from src.utils.checkpoint import get_checkpointer
+from src.models.agentComp import ClarifierResp, ProductResp, EngineerResp
+from src.utils.structured_output import with_output_mode
 from src.config.model_config import get_model
 
 # --- Create memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 engineer_prompt = """
 You are Engineer, a Systems Architect and Technical Lead.
 Your task is to design the technical architecture and implementation plan for the product.
@@ -58,22 +62,117 @@ Thought:{agent_scratchpad}
 """
 # --- Create agents ---
 from src.config.model_limits import get_agent_limit
+from src.utils.max_tokens_tuner import with_max_tokens
 
 # --- Create agents ---
-def get_engineer_agent(model):
-    max_tokens = get_agent_limit("engineer", "max_tokens", 2000)
-    if max_tokens:
-        model = model.bind(max_tokens=max_tokens)
+def get_engineer_agent(model, structured=None, stateless=False):
+    model = with_max_tokens(model, "engineer")
     
+    return with_output_mode(
+        "Engineer", model, engineer_prompt, EngineerResp,
+        lambda m, p: create_react_agent(model=m, tools=[], prompt=p, checkpointer=None if stateless else memory, name="Engineer"),
+        structured=structured,
+    )
+
+# --- Section-parallel analysis ---
+# Each section of the analysis block with the TOON format it must follow
+ENGINEER_SECTIONS: Dict[str, str] = {
+    "feasibility_score": """feasibility_score: 0.9""",
+    "tech_stack": """tech_stack:
+  frontend:
+    - React
+    - TypeScript
+  backend:
+    - Python
+    - FastAPI
+  database:
+    - PostgreSQL
+  infrastructure:
+    - Docker
+    - AWS""",
+    "technical_challenges": """technical_challenges:
+  title | severity | description | mitigation
+  Real-time Sync | High | Latency issues in data sync | Use WebSockets and optimistic UI updates""",
+    "implementation_plan": """implementation_plan:
+  phase | duration | description
+  Phase 1: MVP | 4 weeks | Core features implementation
+  Phase 2: Beta | 2 weeks | Testing and bug fixes""",
+}
+
+engineer_section_prompt = """
+You are Engineer, a Systems Architect and Technical Lead.
+You produce ONE section of the technical analysis for a product at a time.
+
+Rules:
+- Respond with ONLY the requested section as TOON data, in the exact format given in the request.
+- Keep the header line of any table exactly as shown.
+- Be specific with technology choices and provide realistic estimates.
+"""
+
+def get_engineer_section_agent(model, stateless=False):
+    model = with_max_tokens(model, "engineer", "section_max_tokens")
+
     return create_react_agent(
         model=model,
         tools=[],
-        prompt=engineer_prompt,
-        checkpointer=memory,
-        name="Engineer",
-        # response_format=ClarifierResp
+        prompt=engineer_section_prompt,
+        checkpointer=None if stateless else memory,
+        name="EngineerSection",
     )
 
+def _extract_section(parsed: Dict[str, Any], section: str) -> Any:
+    """Find a section in parsed TOON, with or without an 'analysis' wrapper"""
+    if not isinstance(parsed, dict):
+        return None
+    if section in parsed:
+        return parsed[section]
+    analysis = parsed.get("analysis")
+    if isinstance(analysis, dict):
+        return analysis.get(section)
+    return None
+
+def run_engineer_sections(section_agent, payload: str, thread_id: str = "engineer_sections",
+                          max_workers: int = None,
+                          on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Generate the engineer analysis sections as concurrent, smaller completions.
+
+    Args:
+        section_agent: Agent from get_engineer_section_agent
+        payload: Product/customer input, as sent to the single-call engineer agent
+        thread_id: Base thread id; each section gets its own thread
+        max_workers: Concurrent LLM calls (defaults to one per section)
+        on_result: Optional callback receiving each section agent result (e.g. to record its output mode)
+    Returns:
+        Dict with an 'analysis' block shaped like the single-call engineer output
+    """
+    from src.utils import toon
+    from src.utils.token_tracker import token_tracker
+
+    def generate(section: str):
+        content = (f"Section: {section}\n"
+                   f"Format:\n```toon\n{ENGINEER_SECTIONS[section]}\n```\n\n"
+                   f"Product input:\n{payload}")
+        config = {"configurable": {"thread_id": f"{thread_id}:{section}"}}
+        try:
+            result = section_agent.invoke({"messages": [HumanMessage(content=content)]}, config)
+        except Exception as e:
+            print(f"Engineer section '{section}' failed: {e}")
+            return section, None
+        if on_result:
+            on_result(result)
+        last_message = result["messages"][-1]
+        usage_metadata = last_message.response_metadata.get("token_usage") if hasattr(last_message, "response_metadata") else None
+        if usage_metadata:
+            token_tracker.track_usage(usage_metadata)
+        return section, _extract_section(toon.parse_response(last_message.content), section)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(ENGINEER_SECTIONS), thread_name_prefix="engineer") as executor:
+        results = dict(executor.map(generate, ENGINEER_SECTIONS))
+
+    analysis = {section: results[section] for section in ENGINEER_SECTIONS if results.get(section) is not None}
+    return {"analysis": analysis}
+
 # Backward compatibility
 try:
     from src.config.model_config import default_model
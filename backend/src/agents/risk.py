@@ -1,9 +1,17 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpoint import get_checkpointer
 from src.config.model_config import get_model
+from src.models.agentComp import RiskAssessment, RiskFeature
+from src.utils import toon
+from src.utils.risk_screen import prescreen_features, unassessed_row
+from src.utils.structured_output import with_output_mode
 
 # --- Create memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 
 # --- Enhanced Risk Assessment Prompt ---
 risk_prompt = """
@@ -23,7 +31,8 @@ Your response must be in TOON (Token-Oriented Object Notation) format:
 done: false
 summary: Overall risk assessment summary
 recommendations:
-  Rec 1 | Rec 2
+  - Rec 1
+  - Rec 2
 features:
   feature | law_interaction | is_potential_risk | potential_risk | border_line_thing | gdpr_compliance | data_retention | user_consent | risk_level | mitigation
   Feature 1 | Interaction | true | Risk desc | Borderline | GDPR | Retention | Consent | high | Mitigation
@@ -56,21 +65,197 @@ Thought:{agent_scratchpad}
 
 # --- Create agents ---
 from src.config.model_limits import get_agent_limit
+from src.utils.max_tokens_tuner import with_max_tokens
 
 # --- Create agents ---
-def get_risk_agent(model):
-    max_tokens = get_agent_limit("risk", "max_tokens", 2000)
-    if max_tokens:
-        model = model.bind(max_tokens=max_tokens)
+def get_risk_agent(model, structured=None, stateless=False):
+    model = with_max_tokens(model, "risk")
         
-    return create_react_agent(
-        model=model,
-        tools=[],
-        prompt=risk_prompt,
-        checkpointer=memory,
-        name="Risk",
+    return with_output_mode(
+        "Risk", model, risk_prompt, RiskAssessment,
+        lambda m, p: create_react_agent(model=m, tools=[], prompt=p, checkpointer=None if stateless else memory, name="Risk"),
+        structured=structured,
     )
 
+# --- Fan-out risk assessment ---
+RISK_LEVEL_ORDER = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+RISK_FIELDS = list(RiskFeature.model_fields.keys())
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "yes", "1")
+
+def _normalize_feature(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce a parsed TOON feature row into RiskFeature fields"""
+    normalized = {field: str(row.get(field, "") if row.get(field) is not None else "").strip() for field in RISK_FIELDS}
+    normalized["is_potential_risk"] = _as_bool(row.get("is_potential_risk", False))
+    normalized["risk_level"] = normalized["risk_level"].lower() or "low"
+    return normalized
+
+def _as_list(value: Any) -> List[str]:
+    """Recommendations come back as a list, a pipe-separated string or table rows"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split("|") if v.strip()]
+    if isinstance(value, list):
+        items = []
+        for item in value:
+            if isinstance(item, dict):
+                items.extend(str(v).strip() for v in item.values() if str(v).strip())
+            elif str(item).strip():
+                items.append(str(item).strip())
+        return items
+    return [str(value)]
+
+def dedupe_recommendations(recommendations: List[str]) -> List[str]:
+    """Drop recommendations that only differ in case, punctuation or whitespace"""
+    seen = set()
+    unique = []
+    for rec in recommendations:
+        key = re.sub(r"[^a-z0-9 ]", "", rec.lower())
+        key = " ".join(key.split())
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(rec)
+    return unique
+
+def summarize_risk_features(features: List[Dict[str, Any]]) -> str:
+    """Recompute the overall risk summary locally from the merged feature rows"""
+    if not features:
+        return "No features were assessed."
+    counts = {}
+    for feature in features:
+        counts[feature["risk_level"]] = counts.get(feature["risk_level"], 0) + 1
+    levels = ", ".join(f"{count} {level}" for level, count in
+                       sorted(counts.items(), key=lambda kv: -RISK_LEVEL_ORDER.get(kv[0], 0)))
+    laws = sorted({law.strip() for f in features for law in re.split(r"[,/;]", f["law_interaction"])
+                   if law.strip() and law.strip().lower() != "none"})
+    flagged = [f["feature"] for f in features if RISK_LEVEL_ORDER.get(f["risk_level"], 0) >= RISK_LEVEL_ORDER["high"]]
+
+    summary = f"{len(features)} features assessed ({levels} risk)."
+    if flagged:
+        summary += f" Highest-risk features: {', '.join(flagged)}."
+    if laws:
+        summary += f" Applicable laws: {', '.join(laws)}."
+    return summary
+
+def merge_risk_assessments(parts: List[Dict[str, Any]]) -> RiskAssessment:
+    """
+    Merge per-batch risk assessments into one RiskAssessment.
+
+    Duplicate feature rows keep the highest risk level, recommendations are
+    deduplicated and the summary is recomputed from the merged rows.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    recommendations: List[str] = []
+    for part in parts:
+        for row in part.get("features") or []:
+            if not isinstance(row, dict) or not row.get("feature"):
+                continue
+            feature = _normalize_feature(row)
+            key = feature["feature"].lower()
+            existing = merged.get(key)
+            if existing is None or RISK_LEVEL_ORDER.get(feature["risk_level"], 0) > RISK_LEVEL_ORDER.get(existing["risk_level"], 0):
+                merged[key] = feature
+        recommendations.extend(_as_list(part.get("recommendations")))
+
+    features = list(merged.values())
+    return RiskAssessment(
+        done=True,
+        summary=summarize_risk_features(features),
+        recommendations=dedupe_recommendations(recommendations),
+        features=[RiskFeature(**f) for f in features],
+    )
+
+def _assess_batch(risk_agent, batch: List[Dict[str, Any]], context: str, thread_id: str,
+                  on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Run the risk agent on one group of features and return the parsed TOON"""
+    from src.utils.token_tracker import token_tracker
+
+    hint_keys = [key for key in ("data_categories", "laws") if any(key in f for f in batch)]
+    rows = [{"name": f.get("name", ""), "reason": f.get("reason", ""), **{key: f.get(key, "") for key in hint_keys}}
+            for f in batch]
+    content = (f"{context}\n\nAssess ONLY these features and set done to true:\n"
+               f"{toon.dumps({'features': rows}, delimiter='|')}")
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        result = risk_agent.invoke({"messages": [HumanMessage(content=content)]}, config)
+    except Exception as e:
+        print(f"Risk batch {thread_id} failed: {e}")
+        return {}
+    if on_result:
+        on_result(result)
+    last_message = result["messages"][-1]
+    usage_metadata = last_message.response_metadata.get("token_usage") if hasattr(last_message, "response_metadata") else None
+    if usage_metadata:
+        token_tracker.track_usage(usage_metadata)
+    parsed = toon.parse_response(last_message.content)
+    return parsed if isinstance(parsed, dict) else {}
+
+def _backfill_unassessed(parts: List[Dict[str, Any]], features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add a conservative unassessed_row for every feature no part returned a row for"""
+    assessed = {str(row.get("feature", "")).lower() for part in parts for row in (part.get("features") or [])
+                if isinstance(row, dict)}
+    missing = [unassessed_row(f) for f in features if str(f.get("name", "")).lower() not in assessed]
+    if missing:
+        print(f"Risk assessment returned no row for {len(missing)} features; marking them for review")
+        return parts + [{"features": missing}]
+    return parts
+
+def assess_risk_fanout(risk_agent, features: List[Dict[str, Any]], context: str,
+                       thread_id: str = "risk_fanout", batch_size: int = None,
+                       max_workers: int = None,
+                       on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> RiskAssessment:
+    """
+    Assess product features in parallel micro-batches and merge the results.
+
+    Args:
+        risk_agent: Agent from get_risk_agent
+        features: Product feature dicts (need at least a 'name')
+        context: Shared product/engineering context sent with every batch
+        thread_id: Base thread id; each batch gets its own thread
+        batch_size: Features per LLM call (defaults to AGENT_LIMITS["risk"]["batch_size"])
+        max_workers: Concurrent LLM calls (defaults to AGENT_LIMITS["risk"]["max_workers"])
+        on_result: Optional callback receiving each batch's agent result (e.g. to record its output mode)
+    Returns:
+        Merged RiskAssessment; features of failed or unparseable batches get a
+        conservative unassessed row instead of being dropped
+    """
+    batch_size = batch_size or get_agent_limit("risk", "batch_size", 2)
+    max_workers = max_workers or get_agent_limit("risk", "max_workers", 4)
+    batches = [features[i:i + batch_size] for i in range(0, len(features), batch_size)]
+
+    print(f"Assessing {len(features)} features in {len(batches)} parallel batches...")
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="risk") as executor:
+        parts = list(executor.map(
+            lambda item: _assess_batch(risk_agent, item[1], context, f"{thread_id}:{item[0]}", on_result),
+            enumerate(batches)
+        ))
+
+    return merge_risk_assessments(_backfill_unassessed(parts, features))
+
+def assess_risk_prescreened(risk_agent, features: List[Dict[str, Any]], context: str,
+                            thread_id: str = "risk", fanout: bool = False,
+                            on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> RiskAssessment:
+    """
+    Pre-screen features locally and only send plausibly risky ones to the LLM.
+
+    Features that touch no regulated data category get deterministic low-risk
+    rows; the rest are assessed in one call (or fanned out) and merged back.
+    on_result receives each agent result, as in assess_risk_fanout.
+    """
+    risky, low_risk_rows = prescreen_features(features)
+    parts = [{"features": low_risk_rows}]
+    if risky:
+        if fanout:
+            parts.append(assess_risk_fanout(risk_agent, risky, context, thread_id=thread_id, on_result=on_result).model_dump())
+        else:
+            parts.append(_assess_batch(risk_agent, risky, context, thread_id, on_result))
+        parts = parts[:1] + _backfill_unassessed(parts[1:], risky)
+    return merge_risk_assessments(parts)
+
 # Backward compatibility
 try:
     from src.config.model_config import default_model
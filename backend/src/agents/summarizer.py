@@ -1,11 +1,14 @@
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpoint import get_checkpointer
 
 # --- Create memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 
 from src.utils import toon
 from src.config.model_limits import get_agent_limit
+from src.utils.max_tokens_tuner import with_max_tokens
+from src.utils.structured_output import with_output_mode
+from src.models.agentComp import SummarizerOutput
 
 # --- Summarization Agent Prompt ---
 summarizer_prompt = """
@@ -27,6 +30,7 @@ Instructions:
     4. Risk Assessment & Mitigation
     5. Conclusion & Next Steps
 - Use bullet points where appropriate for readability.
+- The input "figures" block holds exact precomputed totals (cost, timeline, goal scores, risk counts). Quote them as-is; never recompute or estimate them.
 
 Output format:
 Your response must be in JSON format:
@@ -41,22 +45,173 @@ Input: {input}
 """
 
 # --- Create summarization agent ---
-def get_summarizer_agent(model):
-    max_tokens = get_agent_limit("summarizer", "max_tokens", 1000)
-    # Bind the limit to the model
-    # Bind the limit to the model
-    # Bind the limit to the model
-    if max_tokens:
-        model = model.bind(max_tokens=max_tokens)
+def get_summarizer_agent(model, structured=None, stateless=False):
+    model = with_max_tokens(model, "summarizer")
         
+    return with_output_mode(
+        "Summarizer", model, summarizer_prompt, SummarizerOutput,
+        lambda m, p: create_react_agent(model=m, tools=[], prompt=p, checkpointer=None if stateless else memory, name="Summarizer"),
+        structured=structured,
+    )
+
+# --- Map-reduce summarization ---
+# Report sections drafted as soon as their source stage finishes.
+# Keys match the projections in src.utils.projections ("summary_<key>").
+SUMMARY_SECTIONS = {
+    "market": "Market Analysis & Customer Insights",
+    "technical": "Technical Feasibility & Architecture",
+    "risk": "Risk Assessment & Mitigation",
+}
+
+section_prompt = """
+You are the Summarizer Agent, drafting ONE section of a product report.
+You receive the findings of the agents relevant to this section.
+
+Instructions:
+- Write only the body of the section named in the request, in Markdown.
+- Do not add the section header or any other section.
+- Preserve key details, numbers and named technologies, laws or competitors.
+- Quote precomputed "figures" / "risk_levels" as-is; never recompute totals or timelines.
+- Highlight trade-offs and dependencies; use bullet points where appropriate.
+- Keep it concise: at most 200 words.
+"""
+
+merge_prompt = """
+You are the Summarizer Agent, finishing a product report whose middle sections are already written.
+
+Instructions:
+- Read the drafted sections and write the two missing sections:
+    1. Executive Summary: an integrated overview connecting market, technical and risk findings
+    2. Conclusion & Next Steps: the verdict and concrete next steps
+- Do not repeat the drafted sections.
+- Keep each section under 150 words.
+
+Output format:
+Your response must be in JSON format:
+
+```json
+{
+    "executive_summary": "...",
+    "conclusion": "..."
+}
+```
+"""
+
+def get_section_summarizer_agent(model):
+    model = with_max_tokens(model, "summarizer", "section_max_tokens")
+
     return create_react_agent(
         model=model,
         tools=[],
-        prompt=summarizer_prompt,
+        prompt=section_prompt,
         checkpointer=memory,
-        name="Summarizer"
+        name="SectionSummarizer"
     )
 
+def get_summary_merge_agent(model):
+    model = with_max_tokens(model, "summarizer", "merge_max_tokens")
+
+    return create_react_agent(
+        model=model,
+        tools=[],
+        prompt=merge_prompt,
+        checkpointer=memory,
+        name="SummaryMerger"
+    )
+
+class SectionSummarizer:
+    """
+    Map-reduce summarizer that overlaps with the upstream pipeline.
+
+    submit() drafts a section in a background thread as soon as its source stage
+    is done; merge() waits for the drafts, writes the Executive Summary and
+    Conclusion in one short call and stitches the report together.
+
+    Each report gets its own thread pool (created by the first submit() and shut
+    down by merge()) and its own checkpoint threads, so one instance can produce
+    any number of reports.
+    """
+
+    def __init__(self, model, thread_id: str = "summarizer_sections", max_workers: int = 3):
+        self.thread_id = thread_id
+        self.max_workers = max_workers
+        self.section_agent = get_section_summarizer_agent(model)
+        self.merge_agent = get_summary_merge_agent(model)
+        self.executor = None
+        self.futures = {}
+        self.reports = 0
+
+    def _invoke(self, agent, content: str, name: str) -> str:
+        from langchain_core.messages import HumanMessage
+        from src.utils.token_tracker import token_tracker
+
+        config = {"configurable": {"thread_id": f"{self.thread_id}:{self.reports}:{name}"}}
+        result = agent.invoke({"messages": [HumanMessage(content=content)]}, config)
+        last_message = result["messages"][-1]
+        usage_metadata = last_message.response_metadata.get("token_usage") if hasattr(last_message, "response_metadata") else None
+        if usage_metadata:
+            token_tracker.track_usage(usage_metadata)
+        return last_message.content
+
+    def _draft(self, section: str, data: dict) -> str:
+        from src.utils.projections import project_payload
+
+        payload, _ = project_payload(f"summary_{section}", data)
+        content = f"Section: {SUMMARY_SECTIONS[section]}\n\n{payload}"
+        return self._invoke(self.section_agent, content, section).strip()
+
+    def submit(self, section: str, final_data: dict) -> None:
+        """Start drafting a section from a snapshot of the pipeline data"""
+        if self.executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="summary")
+        self.futures[section] = self.executor.submit(self._draft, section, dict(final_data))
+
+    def close(self) -> None:
+        """Shut down the current report's thread pool and start a new report"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.executor = None
+        self.futures = {}
+        self.reports += 1
+
+    def merge(self, final_data: dict) -> str:
+        """Collect drafted sections, write the framing sections and return the Markdown report"""
+        try:
+            return self._merge(final_data)
+        finally:
+            self.close()
+
+    def _merge(self, final_data: dict) -> str:
+        sections = {}
+        for section in SUMMARY_SECTIONS:
+            try:
+                future = self.futures.get(section)
+                sections[section] = future.result() if future else self._draft(section, final_data)
+            except Exception as e:
+                print(f"Section '{section}' draft failed: {e}")
+                sections[section] = ""
+
+        drafted = "\n\n".join(
+            f"## {SUMMARY_SECTIONS[key]}\n\n{body}" for key, body in sections.items() if body
+        )
+        merge_response = self._invoke(self.merge_agent, f"Product: {(final_data.get('product') or {}).get('name', '')}\n\n{drafted}", "merge")
+
+        try:
+            framing = toon.parse_response(merge_response)
+        except Exception:
+            framing = {}
+        executive_summary = framing.get("executive_summary") or merge_response.strip()
+        conclusion = framing.get("conclusion", "")
+
+        report = [f"## Executive Summary\n\n{executive_summary}"]
+        report.append(drafted)
+        if conclusion:
+            report.append(f"## Conclusion & Next Steps\n\n{conclusion}")
+
+        return "\n\n".join(part for part in report if part)
+
 # Backward compatibility
 try:
     from src.config.model_config import default_model
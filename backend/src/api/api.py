@@ -4,14 +4,28 @@ import json
 import uuid
 from typing import Dict, Any, List, Optional
 from langchain_core.messages import HumanMessage, AIMessage
-from src.agents.agent import get_clarifier_agent, get_product_agent, get_classifier_agent
-from src.models.agentComp import ClarifierResp, ProductResp, EngineerAnalysis, RiskAssessment, CustomerAnalysis, SummarizerOutput
-from src.agents.engineer import get_engineer_agent
+from src.agents.agent import get_clarifier_agent, get_product_agent, get_classifier_agent, get_intake_agent
+from src.models.agentComp import ClarifierResp, IntakeResp, ProductResp, EngineerAnalysis, RiskAssessment, CustomerAnalysis, SummarizerOutput
+from src.agents.engineer import get_engineer_agent, get_engineer_section_agent, run_engineer_sections
 from src.agents.customer import get_customer_agent
-from src.agents.risk import get_risk_agent
+from src.agents.risk import get_risk_agent, assess_risk_fanout, assess_risk_prescreened
 from src.agents.summarizer import get_summarizer_agent
 import src.utils.toon as toon
+from src.utils.helper import run_batched_clarifier, ClarifierCoverage
+from src.utils.projections import project_payload
+from src.utils.repair import repair_response
+from src.utils.analytics import compute_analytics, attach_customer_graph
+from src.utils.token_tracker import token_tracker
+from src.utils.checkpoint import get_checkpointer
+from src.utils.compaction import compact_clarifier_history
+from src.utils.http_pool import pool_stats
+from src.utils.model_router import router_stats
+from src.utils.model_tiering import tier_telemetry
+from src.utils.max_tokens_tuner import max_tokens_tuner
+from src.utils.fingerprint import fingerprint_registry
+from src.utils.tokenizer import tokenizer
 from src.config.model_config import get_model
+from src.config.model_limits import get_agent_limit
 
 app = FastAPI(title="Product Conversation API")
 
@@ -19,14 +33,23 @@ app = FastAPI(title="Product Conversation API")
 class ClarifierRequest(BaseModel):
     messages: List[Dict[str, str]]
     model_provider: Optional[str] = "openai"
+    # Resume a saved conversation: messages then holds only the new turns
+    thread_id: Optional[str] = None
+
+class ClarifierBatchRequest(BaseModel):
+    idea: str
+    answers: Optional[Dict[str, str]] = None
+    auto_answer: bool = True
+    model_provider: Optional[str] = "openai"
 
 class ClassifierRequest(BaseModel):
     idea: str
     model_provider: Optional[str] = "openai"
 
 class ProductRequest(BaseModel):
-    requirements: str
+    requirements: str = ""  # Defaults to the saved clarifier conversation of thread_id
     model_provider: Optional[str] = "openai"
+    thread_id: Optional[str] = None
 
 class CustomerRequest(BaseModel):
     product_data: Dict[str, Any]
@@ -34,16 +57,22 @@ class CustomerRequest(BaseModel):
 
 class EngineerRequest(BaseModel):
     customer_data: Dict[str, Any]
+    parallel_sections: bool = False  # Generate analysis sections as concurrent completions
     model_provider: Optional[str] = "openai"
 
 class RiskRequest(BaseModel):
     engineer_data: Dict[str, Any]
+    product_data: Optional[Dict[str, Any]] = None
+    fanout: bool = False  # Assess product features in parallel micro-batches
     model_provider: Optional[str] = "openai"
 
 class SummaryRequest(BaseModel):
     final_data: Dict[str, Any]
     model_provider: Optional[str] = "openai"
 
+class AnalyticsRequest(BaseModel):
+    final_data: Dict[str, Any]
+
 class DiagramRequest(BaseModel):
     project_summary: Dict[str, Any]  # Can be product data or full project summary
 
@@ -78,12 +107,26 @@ def process_agent_response(response: str, response_model):
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/stats")
+async def token_stats():
+    """Token usage, per-stage prompt token savings, checkpointer memory, HTTP connection reuse, endpoint health,
+    model tier telemetry, adaptive max_tokens limits, the latest model fingerprints and tokenizer cache"""
+    return {**token_tracker.get_stats(), "checkpointer": get_checkpointer().stats(), "http_pool": pool_stats.summary(),
+            "endpoints": router_stats(), "model_tiers": tier_telemetry.summary(), "max_tokens": max_tokens_tuner.summary(),
+            "fingerprints": fingerprint_registry.summary(), "tokenizer": tokenizer.stats()}
+
 @app.post("/clarify")
 async def clarify(request: ClarifierRequest):
-    """Run Clarifier agent step"""
+    """
+    Run Clarifier agent step.
+
+    Without a thread_id the request carries the whole conversation and nothing is
+    saved. With one, the conversation is kept in the shared checkpointer (persistent
+    with CHECKPOINT_BACKEND=sqlite) and each request only sends the new turns.
+    """
     try:
         model = get_model(provider=request.model_provider)
-        clarifier = get_clarifier_agent(model)
+        clarifier = get_clarifier_agent(model, stateless=not request.thread_id)
         
         # Convert dict messages to LangChain messages
         lc_messages = []
@@ -97,7 +140,7 @@ async def clarify(request: ClarifierRequest):
         if not lc_messages:
              return {"error": "No messages provided"}
 
-        config = {"configurable": {"thread_id": str(uuid.uuid4())}} # Dummy thread ID for LangGraph
+        config = {"configurable": {"thread_id": request.thread_id or str(uuid.uuid4())}}
         clarifier_result = clarifier.invoke({"messages": lc_messages}, config)
         clarifier_messages = clarifier_result["messages"]
         clarifier_response = clarifier_messages[-1].content
@@ -110,19 +153,48 @@ async def clarify(request: ClarifierRequest):
         response_data = {
             "response": clarifier_response,
             "parsed": clarifier_obj.model_dump() if clarifier_obj else None,
-            "done": clarifier_obj.done if clarifier_obj else False
+            "done": clarifier_obj.done if clarifier_obj else False,
+            "thread_id": request.thread_id
         }
         
         return response_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in clarifier: {str(e)}")
 
+@app.post("/clarify_batch")
+async def clarify_batch(request: ClarifierBatchRequest):
+    """Run the Clarifier non-interactively with pre-supplied answers in one batched turn"""
+    try:
+        model = get_model(provider=request.model_provider, agent_type="clarifier")
+        clarifier = get_clarifier_agent(model, stateless=True)
+
+        initial_message = HumanMessage(
+            content=f"Start gathering requirements for a new mobile app based on this: {request.idea}."
+        )
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        coverage = ClarifierCoverage(request.idea)
+        clarifier_obj, clarifier_messages, qa_pairs = run_batched_clarifier(
+            clarifier, initial_message, config,
+            idea=request.idea, answers=request.answers, auto_answer=request.auto_answer,
+            coverage=coverage
+        )
+
+        return {
+            "coverage": coverage.report(),
+            "response": clarifier_messages[-1].content if clarifier_messages else None,
+            "parsed": clarifier_obj.model_dump() if clarifier_obj else None,
+            "done": clarifier_obj.done if clarifier_obj else False,
+            "answers": qa_pairs
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in clarifier: {str(e)}")
+
 @app.post("/classify")
 async def classify(request: ClassifierRequest):
     """Run Classifier agent step"""
     try:
-        model = get_model(provider=request.model_provider)
-        classifier = get_classifier_agent(model)
+        model = get_model(provider=request.model_provider, agent_type="classifier")
+        classifier = get_classifier_agent(model, stateless=True)
         
         config = {"configurable": {"thread_id": str(uuid.uuid4())}}
         
@@ -142,30 +214,75 @@ async def classify(request: ClassifierRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in classifier: {str(e)}")
 
+@app.post("/classify_clarify")
+async def classify_clarify(request: ClassifierRequest):
+    """Classify the idea and ask the first clarifier questions in one LLM call"""
+    try:
+        model = get_model(provider=request.model_provider, agent_type="clarifier")
+        intake = get_intake_agent(model, stateless=True)
+
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        intake_result = intake.invoke(
+            {"messages": [HumanMessage(content=f"Start gathering requirements for a new mobile app based on this: {request.idea}.")]},
+            config
+        )
+        intake_response = intake_result["messages"][-1].content
+        intake_obj = process_agent_response(intake_response, IntakeResp)
+
+        return {
+            "classification": {
+                "idea": intake_obj.idea,
+                "domain": intake_obj.domain,
+                "complexity": intake_obj.complexity
+            } if intake_obj else safe_parse(intake_response),
+            "parsed": ClarifierResp(done=intake_obj.done, resp=intake_obj.resp).model_dump() if intake_obj else None,
+            "done": intake_obj.done if intake_obj else False,
+            "raw_response": intake_response
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in intake: {str(e)}")
+
 from src.services.diagram.diagram import generate_mermaid_link
 
 @app.post("/generate_product")
 async def generate_product(request: ProductRequest):
-    """Generate product data from requirements"""
+    """
+    Generate product data from requirements.
+
+    With a thread_id the requirements default to the compacted clarifier conversation
+    saved under that thread, and the product turn is saved under "<thread_id>:product".
+    """
+    requirements = request.requirements
+    if not requirements.strip() and request.thread_id:
+        saved = get_checkpointer().get_tuple({"configurable": {"thread_id": request.thread_id, "checkpoint_ns": ""}})
+        messages = saved.checkpoint["channel_values"].get("messages", []) if saved else []
+        if messages:
+            requirements_message, _ = compact_clarifier_history(messages, get_agent_limit("product", "context_tokens", None))
+            requirements = requirements_message.content
+    if not requirements.strip():
+        raise HTTPException(status_code=400, detail="No requirements given and no saved conversation for thread_id")
+
     try:
         model = get_model(provider=request.model_provider)
-        product_agent = get_product_agent(model)
+        product_agent = get_product_agent(model, stateless=not request.thread_id)
         
-        trigger_message = HumanMessage(content=f"Requirements: {request.requirements}\\n\\nBased on the above requirements, please generate the full product specification.")
-        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        trigger_message = HumanMessage(content=f"Requirements: {requirements}\\n\\nBased on the above requirements, please generate the full product specification.")
+        config = {"configurable": {"thread_id": f"{request.thread_id}:product" if request.thread_id else str(uuid.uuid4())}}
         
         product_result = product_agent.invoke({"messages": [trigger_message]}, config)
         product_response = product_result["messages"][-1].content
         product_obj = process_agent_response(product_response, ProductResp)
 
-        if product_obj:
-            # Ensure at least 5 features
-            if len(product_obj.features) < 5:
-                retry_message = HumanMessage(content="Generate a product response with at least 5 features based on our conversation.")
-                product_result = product_agent.invoke({"messages": [trigger_message, AIMessage(content=product_response), retry_message]}, config)
-                product_response = product_result["messages"][-1].content
-                product_obj = process_agent_response(product_response, ProductResp)
+        # Ensure at least 5 features; on a short or invalid response ask only for the missing part
+        if not product_obj or len(product_obj.features) < 5:
+            parsed = safe_parse(product_response)
+            product_obj, repair_report = repair_response(
+                product_agent, {} if "raw_content" in parsed else parsed, ProductResp,
+                thread_id=config["configurable"]["thread_id"], min_items={"features": 5},
+                context=f"Requirements: {requirements}"
+            )
 
+        if product_obj:
             # Generate diagram
             try:
                 diagram_url = generate_mermaid_link(product_obj.model_dump_json())
@@ -190,9 +307,11 @@ async def generate_customer(request: CustomerRequest):
     """Generate customer analysis from product data"""
     try:
         model = get_model(provider=request.model_provider)
-        customer_agent = get_customer_agent(model)
+        customer_agent = get_customer_agent(model, stateless=True)
         
-        product_str = toon.dumps(request.product_data)
+        product_str, report = project_payload("customer", {"product": request.product_data},
+                                              baseline=toon.dumps(request.product_data))
+        token_tracker.track_context("customer", report["original_tokens"], report["sent_tokens"])
         config = {"configurable": {"thread_id": str(uuid.uuid4())}}
         
         customer_result = customer_agent.invoke(
@@ -202,13 +321,14 @@ async def generate_customer(request: CustomerRequest):
         customer_response = customer_result["messages"][-1].content
         
         # Track tokens
-        from src.utils.token_tracker import token_tracker
         usage_metadata = customer_result["messages"][-1].response_metadata.get("token_usage") if hasattr(customer_result["messages"][-1], "response_metadata") else None
         if usage_metadata:
             token_tracker.track_usage(usage_metadata)
 
         customer_data = safe_parse(customer_response)
-        
+        if "raw_content" not in customer_data:
+            attach_customer_graph(customer_data, request.product_data)
+
         return {
             "customer_data": customer_data,
             "raw_response": customer_response
@@ -223,10 +343,19 @@ async def generate_engineer(request: EngineerRequest):
     """Generate engineer analysis from customer data"""
     try:
         model = get_model(provider=request.model_provider)
-        engineer_agent = get_engineer_agent(model)
+        engineer_agent = get_engineer_agent(model, stateless=True)
         
-        customer_str = toon.dumps(request.customer_data)
+        customer_str, report = project_payload("engineer", {"customer": request.customer_data},
+                                               baseline=toon.dumps(request.customer_data))
+        token_tracker.track_context("engineer", report["original_tokens"], report["sent_tokens"])
         config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+
+        if request.parallel_sections:
+            section_agent = get_engineer_section_agent(model, stateless=True)
+            return {
+                "engineer_data": run_engineer_sections(section_agent, customer_str, thread_id=config["configurable"]["thread_id"]),
+                "raw_response": None
+            }
         
         engineer_result = engineer_agent.invoke(
             {"messages": [HumanMessage(content=customer_str)]},
@@ -235,7 +364,6 @@ async def generate_engineer(request: EngineerRequest):
         engineer_response = engineer_result["messages"][-1].content
         
         # Track tokens
-        from src.utils.token_tracker import token_tracker
         usage_metadata = engineer_result["messages"][-1].response_metadata.get("token_usage") if hasattr(engineer_result["messages"][-1], "response_metadata") else None
         if usage_metadata:
             token_tracker.track_usage(usage_metadata)
@@ -260,13 +388,31 @@ async def generate_risk(request: RiskRequest):
     """Generate risk assessment from engineer data"""
     try:
         model = get_model(provider=request.model_provider)
-        risk_agent = get_risk_agent(model)
+        risk_agent = get_risk_agent(model, stateless=True)
         
         engineer_data = request.engineer_data
         engineer_analysis = engineer_data.get("analysis", engineer_data)
-        engineer_str = toon.dumps(engineer_analysis)
+        pipeline_data = {"product": request.product_data, "engineer": {"analysis": engineer_analysis}}
         config = {"configurable": {"thread_id": str(uuid.uuid4())}}
 
+        features = (request.product_data or {}).get("features") or []
+        prescreen = get_agent_limit("risk", "prescreen", False)
+        if features and (request.fanout or prescreen):
+            context, report = project_payload("risk_context", pipeline_data, baseline=toon.dumps(engineer_analysis))
+            token_tracker.track_context("risk", report["original_tokens"], report["sent_tokens"])
+            thread_id = config["configurable"]["thread_id"]
+            if prescreen:
+                assessment = assess_risk_prescreened(risk_agent, features, context, thread_id=thread_id, fanout=request.fanout)
+            else:
+                assessment = assess_risk_fanout(risk_agent, features, context, thread_id=thread_id)
+            return {
+                "risk_data": {"assessment": assessment.model_dump()},
+                "raw_response": None
+            }
+
+        engineer_str, report = project_payload("risk", pipeline_data, baseline=toon.dumps(engineer_analysis))
+        token_tracker.track_context("risk", report["original_tokens"], report["sent_tokens"])
+
         risk_result = risk_agent.invoke(
             {"messages": [HumanMessage(content=engineer_str)]},
             config
@@ -274,7 +420,6 @@ async def generate_risk(request: RiskRequest):
         risk_response = risk_result["messages"][-1].content
         
         # Track tokens
-        from src.utils.token_tracker import token_tracker
         usage_metadata = risk_result["messages"][-1].response_metadata.get("token_usage") if hasattr(risk_result["messages"][-1], "response_metadata") else None
         if usage_metadata:
             token_tracker.track_usage(usage_metadata)
@@ -293,12 +438,16 @@ async def generate_summary(request: SummaryRequest):
     """Generate final summary from all data"""
     try:
         model = get_model(provider=request.model_provider)
-        summarizer = get_summarizer_agent(model)
+        summarizer = get_summarizer_agent(model, stateless=True)
         
         config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        analytics = compute_analytics(request.final_data)
+        summary_str, report = project_payload("summarizer", {**request.final_data, "analytics": analytics},
+                                              baseline=toon.dumps(request.final_data, indent=2))
+        token_tracker.track_context("summarizer", report["original_tokens"], report["sent_tokens"])
         
         summary_result = summarizer.invoke(
-            {"messages": [HumanMessage(content=toon.dumps(request.final_data, indent=2))]},
+            {"messages": [HumanMessage(content=summary_str)]},
             config
         )
         summary_response = summary_result["messages"][-1].content
@@ -317,12 +466,21 @@ async def generate_summary(request: SummaryRequest):
         
         return {
             "summary": summary,
+            "analytics": analytics,
             "tts_file": tts_file,
             "raw_response": summary_response
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
 
+@app.post("/analytics")
+async def analytics(request: AnalyticsRequest):
+    """Compute exact numeric figures (cost, timeline, goal scores, risk levels) from pipeline data"""
+    try:
+        return {"analytics": compute_analytics(request.final_data)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing analytics: {str(e)}")
+
 @app.post("/generate_diagram")
 async def generate_diagram(request: DiagramRequest):
     """Generate a Mermaid diagram from project summary"""
@@ -9,6 +9,10 @@ print("Environment variables loaded successfully.")
 # access the value
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")  # Optional custom OpenAI base URL
+# Optional comma-separated list of OpenAI-compatible endpoints to route between.
+# Each entry is "base_url", "base_url|model" or "base_url|model|api_key"; the model
+# and key default to the agent's model and OPENAI_API_KEY
+OPENAI_API_BASES = os.getenv("OPENAI_API_BASES", "")
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default_secret_key_change_me_in_production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -33,3 +37,78 @@ PROMPT_GENERATOR_MODEL = os.getenv("PROMPT_GENERATOR_MODEL", DEFAULT_MODEL)
 DIAGRAM_MODEL = os.getenv("DIAGRAM_MODEL", DEFAULT_MODEL)
 TTS_CONVERTER_MODEL = os.getenv("TTS_CONVERTER_MODEL", DEFAULT_MODEL)
 
+# HTTP transport
+# All model clients share one keep-alive connection pool; HTTP/2 is used when
+# HTTP2=true and the optional h2 package is installed
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "120"))
+HTTP2 = os.getenv("HTTP2", "true").lower() == "true"
+
+# Local CPU model
+# OpenAI-compatible local inference server (llama.cpp server, Ollama, ...) running a
+# small quantized model. provider="local" uses it; agent types listed in
+# LOCAL_AGENT_TYPES (e.g. "classifier,tts_converter,prompt_generator") use it by default
+LOCAL_MODEL_BASE = os.getenv("LOCAL_MODEL_BASE", "http://127.0.0.1:8080/v1")
+LOCAL_MODEL = os.getenv("LOCAL_MODEL", "qwen2.5-1.5b-instruct-q4_k_m")
+LOCAL_API_KEY = os.getenv("LOCAL_API_KEY", "local")
+LOCAL_AGENT_TYPES = {t.strip() for t in os.getenv("LOCAL_AGENT_TYPES", "").split(",") if t.strip()}
+
+# Deterministic generation
+# Agent types listed in DETERMINISTIC_AGENTS ("all" for every agent) run with
+# temperature 0 and DETERMINISTIC_SEED, so their outputs can be cached and reused;
+# each result records the model's system_fingerprint to invalidate on model changes
+DETERMINISTIC_AGENTS = {t.strip() for t in os.getenv("DETERMINISTIC_AGENTS", "").split(",") if t.strip()}
+# Empty DETERMINISTIC_SEED only pins temperature 0 (for providers that reject a seed)
+DETERMINISTIC_SEED = int(os.getenv("DETERMINISTIC_SEED", "42")) if os.getenv("DETERMINISTIC_SEED", "42") else None
+
+# Model limits
+# Optional JSON file overriding AGENT_LIMITS / MAX_TOKENS_TUNING, re-read when it changes
+MODEL_LIMITS_FILE = os.getenv("MODEL_LIMITS_FILE", "")
+
+# Model tiering
+# MODEL_TIERING=true picks a model tier per agent type from recorded latency, cost and
+# parse success, escalating to a stronger tier when the output fails validation.
+# MODEL_TIERS lists the enabled tiers (see src/config/model_tiers.py)
+MODEL_TIERING = os.getenv("MODEL_TIERING", "false").lower() == "true"
+MODEL_TIERS = [t.strip() for t in os.getenv("MODEL_TIERS", "fast,strong").split(",") if t.strip()]
+TIER_FAST_MODEL = os.getenv("TIER_FAST_MODEL", DEFAULT_MODEL)
+TIER_STRONG_MODEL = os.getenv("TIER_STRONG_MODEL", DEFAULT_MODEL)
+
+# Endpoint routing (only used when OPENAI_API_BASES is set)
+# An endpoint failing ROUTER_FAILURE_THRESHOLD times in a row is skipped for ROUTER_COOLDOWN_SECONDS
+ROUTER_FAILURE_THRESHOLD = int(os.getenv("ROUTER_FAILURE_THRESHOLD", "3"))
+ROUTER_COOLDOWN_SECONDS = float(os.getenv("ROUTER_COOLDOWN_SECONDS", "30"))
+# Client-side retries per endpoint before failing over to the next one
+ROUTER_ENDPOINT_RETRIES = int(os.getenv("ROUTER_ENDPOINT_RETRIES", "0"))
+
+# Checkpointer
+# CHECKPOINT_BACKEND=memory keeps conversation checkpoints in memory with LRU + TTL
+# eviction and a size cap; CHECKPOINT_BACKEND=sqlite persists them to CHECKPOINT_DB
+# so conversations can be resumed after a restart or from another worker. The API
+# only saves conversations whose /clarify and /generate_product requests pass a
+# thread_id; every other endpoint runs stateless
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "checkpoints.sqlite")
+CHECKPOINT_DB_TTL_SECONDS = int(os.getenv("CHECKPOINT_DB_TTL_SECONDS", str(7 * 24 * 3600)))
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "2"))
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))
+CHECKPOINT_TTL_SECONDS = int(os.getenv("CHECKPOINT_TTL_SECONDS", "3600"))
+CHECKPOINT_MAX_MB = float(os.getenv("CHECKPOINT_MAX_MB", "64"))
+
+# Structured output
+# Set STRUCTURED_OUTPUT=true to have agents answer through the provider's JSON-schema
+# response format instead of free-text TOON (falls back to TOON when unsupported)
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "false").lower() == "true"
+
+
+# Provider batch API
+# Offline runs (batch_runner --provider-batch) submit agent requests through an
+# OpenAI-compatible batch interface instead of interactive calls. BATCH_API_BASE
+# defaults to OPENAI_API_BASE; batches are polled every BATCH_POLL_SECONDS
+BATCH_API_BASE = os.getenv("BATCH_API_BASE") or OPENAI_API_BASE
+BATCH_COMPLETION_WINDOW = os.getenv("BATCH_COMPLETION_WINDOW", "24h")
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+BATCH_TIMEOUT_SECONDS = float(os.getenv("BATCH_TIMEOUT_SECONDS", str(24 * 3600)))
@@ -1,7 +1,16 @@
+from typing import List, Tuple
 from langchain_openai import ChatOpenAI
 from src.config.env import (
     OPENAI_API_KEY, 
     OPENAI_API_BASE,
+    OPENAI_API_BASES,
+    ROUTER_ENDPOINT_RETRIES,
+    LOCAL_MODEL_BASE,
+    LOCAL_MODEL,
+    LOCAL_API_KEY,
+    LOCAL_AGENT_TYPES,
+    DETERMINISTIC_AGENTS,
+    DETERMINISTIC_SEED,
     USE_SINGLE_MODEL,
     DEFAULT_MODEL,
     CLARIFIER_MODEL,
@@ -14,58 +23,132 @@ from src.config.env import (
     DIAGRAM_MODEL,
     TTS_CONVERTER_MODEL
 )
+from src.utils.http_pool import get_http_client, get_async_http_client, request_timeout
+from src.utils.model_router import RoutedChatModel
 
-def get_model(temperature: float = 0.1, model_name: str = None, provider: str = "openai", base_url: str = None, agent_type: str = None):
+# Sampling temperature used when get_model() is not given one
+DEFAULT_TEMPERATURE = 0.1
+
+def parse_endpoints(spec: str) -> List[Tuple[str, str, str]]:
+    """
+    Parse an OPENAI_API_BASES value into (base_url, model, api_key) entries.
+
+    Missing model / api_key parts are returned as empty strings.
+    """
+    endpoints = []
+    for entry in spec.split(","):
+        parts = [part.strip() for part in entry.split("|")]
+        if not parts[0]:
+            continue
+        parts += [""] * (3 - len(parts))
+        endpoints.append((parts[0], parts[1], parts[2]))
+    return endpoints
+
+def _chat_openai(model: str, api_key: str, base_url: str = None, **kwargs) -> ChatOpenAI:
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url=base_url,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        timeout=request_timeout(),
+        **kwargs,
+    )
+
+def select_model(agent_type: str = None) -> str:
+    """
+    Hosted model name for an agent type.
+
+    Args:
+        agent_type: Type of agent (e.g., "clarifier", "product", "customer", etc.)
+                   Used to select agent-specific model when USE_SINGLE_MODEL=false
+    """
+    if USE_SINGLE_MODEL:
+        # Use single model for all agents
+        return DEFAULT_MODEL
+    if agent_type:
+        # Use agent-specific model
+        agent_models = {
+            "clarifier": CLARIFIER_MODEL,
+            "product": PRODUCT_MODEL,
+            "customer": CUSTOMER_MODEL,
+            "engineer": ENGINEER_MODEL,
+            "risk": RISK_MODEL,
+            "summarizer": SUMMARIZER_MODEL,
+            "prompt_generator": PROMPT_GENERATOR_MODEL,
+            "diagram": DIAGRAM_MODEL,
+            "tts_converter": TTS_CONVERTER_MODEL,
+        }
+        return agent_models.get(agent_type, DEFAULT_MODEL)
+    # Fallback to default
+    return DEFAULT_MODEL
+
+def is_deterministic_agent(agent_type: str = None) -> bool:
+    """Whether an agent type runs in deterministic mode (see DETERMINISTIC_AGENTS)"""
+    return "all" in DETERMINISTIC_AGENTS or (agent_type or "") in DETERMINISTIC_AGENTS
+
+def sampling_settings(agent_type: str = None, deterministic: bool = None) -> dict:
+    """Sampling overrides for an agent type: temperature 0 and the seed in deterministic mode"""
+    if deterministic is None:
+        deterministic = is_deterministic_agent(agent_type)
+    return {"temperature": 0, "seed": DETERMINISTIC_SEED} if deterministic else {}
+
+def get_model(temperature: float = DEFAULT_TEMPERATURE, model_name: str = None, provider: str = "openai", base_url: str = None, agent_type: str = None,
+              deterministic: bool = None):
     """
     Returns a configured Chat model instance based on provider.
     
     Args:
         temperature: Model temperature (0.0-1.0)
         model_name: Specific model name to use (overrides agent-specific config)
-        provider: Provider to use ("openai")
-        base_url: Optional custom OpenAI API base URL
+        provider: Provider to use ("openai" or "local"); agent types listed in
+                  LOCAL_AGENT_TYPES are sent to "local" unless a model_name or
+                  base_url is given
+        base_url: Optional custom OpenAI API base URL (bypasses OPENAI_API_BASES routing)
         agent_type: Type of agent (e.g., "clarifier", "product", "customer", etc.)
                    Used to select agent-specific model when USE_SINGLE_MODEL=false
+        deterministic: Pin temperature 0 and DETERMINISTIC_SEED (defaults to whether
+                       agent_type is listed in DETERMINISTIC_AGENTS)
     """
-    if provider == "openai":
-        if not OPENAI_API_KEY:
+    # Seeded sampling is best effort on the provider side; system_fingerprint tells
+    # whether two responses came from the same backend configuration
+    sampling = {"temperature": temperature, **sampling_settings(agent_type, deterministic)}
+
+    if provider == "openai" and agent_type in LOCAL_AGENT_TYPES and not (model_name or base_url):
+        provider = "local"
+
+    if provider == "local":
+        # Small quantized model on a local OpenAI-compatible server: no API cost,
+        # no network round trip, so client-side retries only add latency
+        return _chat_openai(model_name or LOCAL_MODEL, LOCAL_API_KEY, base_url or LOCAL_MODEL_BASE,
+                            max_retries=0, **sampling)
+    elif provider == "openai":
+        endpoints = [] if base_url else parse_endpoints(OPENAI_API_BASES)
+        if not OPENAI_API_KEY and not (endpoints and all(key for _, _, key in endpoints)):
             raise ValueError("OPENAI_API_KEY not found in environment variables.")
         
         # Use provided base_url, or fall back to environment variable
         api_base = base_url or OPENAI_API_BASE
         
-        # Determine which model to use
-        if model_name:
-            # Explicitly provided model takes precedence
-            selected_model = model_name
-        elif USE_SINGLE_MODEL:
-            # Use single model for all agents
-            selected_model = DEFAULT_MODEL
-        elif agent_type:
-            # Use agent-specific model
-            agent_models = {
-                "clarifier": CLARIFIER_MODEL,
-                "product": PRODUCT_MODEL,
-                "customer": CUSTOMER_MODEL,
-                "engineer": ENGINEER_MODEL,
-                "risk": RISK_MODEL,
-                "summarizer": SUMMARIZER_MODEL,
-                "prompt_generator": PROMPT_GENERATOR_MODEL,
-                "diagram": DIAGRAM_MODEL,
-                "tts_converter": TTS_CONVERTER_MODEL,
-            }
-            selected_model = agent_models.get(agent_type, DEFAULT_MODEL)
-        else:
-            # Fallback to default
-            selected_model = DEFAULT_MODEL
+        selected_model = model_name or select_model(agent_type)
+        
+        if len(endpoints) > 1:
+            # Route between several endpoints; failover replaces client-side retries
+            return RoutedChatModel(
+                endpoints=[
+                    _chat_openai(endpoint_model or selected_model, key or OPENAI_API_KEY, url,
+                                 max_retries=ROUTER_ENDPOINT_RETRIES, **sampling)
+                    for url, endpoint_model, key in endpoints
+                ],
+                model_name=selected_model,
+            )
+        if endpoints:
+            url, endpoint_model, key = endpoints[0]
+            return _chat_openai(endpoint_model or selected_model, key or OPENAI_API_KEY, url, **sampling)
         
-        return ChatOpenAI(
-            model=selected_model,
-            api_key=OPENAI_API_KEY,
-            base_url=api_base,
-        )
+        return _chat_openai(selected_model, OPENAI_API_KEY, api_base, **sampling)
     else:
-        raise ValueError(f"Provider '{provider}' is not supported. Use 'openai'.")
+        raise ValueError(f"Provider '{provider}' is not supported. Use 'openai' or 'local'.")
 
 # Default model instance for general use (defaults to OpenAI)
 try:
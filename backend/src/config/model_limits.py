@@ -1,14 +1,22 @@
+import json
+import os
+import threading
+import time
 from typing import Dict, Any
 
+from src.config.env import MODEL_LIMITS_FILE
+
 # Default limits for agents
 AGENT_LIMITS: Dict[str, Any] = {
     "clarifier": {
         "max_questions": 2,
-        "max_tokens": 5000
+        "max_tokens": 5000,
+        "coverage_threshold": 0.8  # Share of requirement slots covered before the loop stops early
     },
     "product": {
         "max_features": 2,
-        "max_tokens": 5000
+        "max_tokens": 5000,
+        "context_tokens": 1500  # Budget for the compacted clarifier history
     },
     "customer": {
         "max_results": 2,
@@ -16,24 +24,81 @@ AGENT_LIMITS: Dict[str, Any] = {
         "min_features": 2
     },
     "engineer": {
-        "max_tokens": 5000
+        "max_tokens": 5000,
+        "section_max_tokens": 1500  # Section-parallel mode: per-section completion
     },
     "risk": {
-        "max_tokens": 5000
+        "max_tokens": 5000,
+        "batch_size": 2,   # Fan-out mode: features per LLM call
+        "max_workers": 4,  # Fan-out mode: concurrent LLM calls
+        "prescreen": False  # Opt-in: only send features touching regulated data to the LLM
     },
     "summarizer": {
-        "max_tokens": 3000
+        "max_tokens": 3000,
+        "section_max_tokens": 600,  # Map-reduce mode: per-section drafts
+        "merge_max_tokens": 800     # Map-reduce mode: executive summary + conclusion
     }
 }
 
+# Fallback max_tokens for agents without a configured limit
+DEFAULT_MAX_TOKENS = 2000
+
+# Adaptive max_tokens (see src/utils/max_tokens_tuner.py)
+MAX_TOKENS_TUNING: Dict[str, Any] = {
+    "enabled": True,
+    "percentile": 95,         # Completion length percentile the limit is based on
+    "headroom": 0.25,         # Extra share on top of the percentile
+    "min_samples": 20,        # Completions observed before the configured limit is replaced
+    "window": 200,            # Most recent completions kept per agent and model
+    "min_tokens": 256,
+    "max_tokens": 8192,
+    "truncation_boost": 1.5,  # Limit multiplier after a finish_reason=length completion
+}
+
 # Global toggle for token limits
 ENABLE_TOKEN_LIMITS = True
 
+# --- Hot reload ---
+# MODEL_LIMITS_FILE may point at a JSON file shaped like
+#   {"clarifier": {"max_tokens": 1200}, "max_tokens_tuning": {"headroom": 0.3}}
+# It is re-read when it changes, so limits can be adjusted without a restart.
+_overrides: Dict[str, Any] = {}
+_overrides_mtime = 0.0
+_overrides_checked = 0.0
+_overrides_lock = threading.Lock()
+
+def _limit_overrides() -> Dict[str, Any]:
+    global _overrides, _overrides_mtime, _overrides_checked
+    if not MODEL_LIMITS_FILE:
+        return _overrides
+    with _overrides_lock:
+        now = time.monotonic()
+        if now - _overrides_checked < 1.0:
+            return _overrides
+        _overrides_checked = now
+        try:
+            mtime = os.path.getmtime(MODEL_LIMITS_FILE)
+        except OSError:
+            return _overrides
+        if mtime != _overrides_mtime:
+            try:
+                with open(MODEL_LIMITS_FILE) as f:
+                    _overrides = json.load(f)
+                _overrides_mtime = mtime
+                print(f"Reloaded model limits from {MODEL_LIMITS_FILE}")
+            except (OSError, ValueError) as e:
+                print(f"Keeping previous model limits, could not load {MODEL_LIMITS_FILE}: {e}")
+        return _overrides
+
+def get_tuning(setting: str) -> Any:
+    """Get an adaptive max_tokens setting, including hot-reloaded overrides."""
+    return {**MAX_TOKENS_TUNING, **_limit_overrides().get("max_tokens_tuning", {})}[setting]
+
 def get_agent_limit(agent_name: str, limit_name: str, default_value: Any = None) -> Any:
     """Get a specific limit for an agent."""
     # If token limits are disabled, return None for max_tokens
     if limit_name == "max_tokens" and not ENABLE_TOKEN_LIMITS:
         return None
         
-    agent_config = AGENT_LIMITS.get(agent_name.lower(), {})
+    agent_config = {**AGENT_LIMITS.get(agent_name.lower(), {}), **_limit_overrides().get(agent_name.lower(), {})}
     return agent_config.get(limit_name, default_value)
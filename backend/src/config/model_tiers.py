@@ -0,0 +1,27 @@
+from typing import Any, Dict, List
+
+from src.config.env import MODEL_TIERS as ENABLED_TIERS, TIER_FAST_MODEL, TIER_STRONG_MODEL
+
+# Model tiers, cheapest first. "model": None means the agent's configured model
+# (see select_model); costs are per 1k tokens and only used to rank tiers.
+MODEL_TIERS: List[Dict[str, Any]] = [
+    {"name": "local", "provider": "local", "model": None, "input_cost": 0.0, "output_cost": 0.0},
+    {"name": "fast", "provider": "openai", "model": TIER_FAST_MODEL, "input_cost": 0.00015, "output_cost": 0.0006},
+    {"name": "strong", "provider": "openai", "model": TIER_STRONG_MODEL, "input_cost": 0.0025, "output_cost": 0.01},
+]
+
+# Policy guardrails
+TIER_POLICY: Dict[str, Any] = {
+    "min_samples": 5,             # Runs on a tier before its telemetry is trusted
+    "min_parse_rate": 0.9,        # Tiers below this parse-success rate are skipped
+    "max_latency_seconds": 60.0,  # Tiers slower than this are skipped
+    "reprobe_every": 25,          # Calls between retries of a skipped cheaper tier
+    # Agent types that never run below the given tier
+    "floors": {
+        "risk": "fast",
+    },
+}
+
+def enabled_tiers() -> List[Dict[str, Any]]:
+    """Tiers enabled by the MODEL_TIERS env setting, cheapest first"""
+    return [tier for tier in MODEL_TIERS if tier["name"] in ENABLED_TIERS]
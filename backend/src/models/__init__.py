@@ -3,6 +3,7 @@ from .agentComp import (
     ProductResp,
     ClarifierReq,
     ClarifierResp,
+    IntakeResp,
     EngineerFeature,
     EngineerAnalysis,
     RiskFeature,
@@ -11,5 +12,14 @@ from .agentComp import (
     OnlineResource,
     GraphData,
     CustomerAnalysis,
-    SummarizerOutput
+    SummarizerOutput,
+    Competitor,
+    MarketVerdict,
+    MarketAnalysis,
+    CustomerResp,
+    TechStack,
+    TechnicalChallenge,
+    ImplementationPhase,
+    TechAnalysis,
+    EngineerResp
 )
@@ -21,6 +21,12 @@ class ClarifierResp(BaseModel):
     done: bool
     resp: List[ClarifierReq]
 
+class IntakeResp(ClarifierResp):
+    """Classification plus the first round of clarifier questions"""
+    idea: str
+    domain: str
+    complexity: str
+
 # --- Engineer Agent Models ---
 class EngineerFeature(BaseModel):
     feature: str
@@ -82,3 +88,51 @@ class CustomerAnalysis(BaseModel):
 class SummarizerOutput(BaseModel):
     summary: str
 
+# --- Pipeline output envelopes ---
+# Shapes the customer and engineer prompts actually produce; used as
+# response schemas in structured-output mode.
+class Competitor(BaseModel):
+    name: str
+    pros: str
+    cons: str
+    pricing: str
+
+class MarketVerdict(BaseModel):
+    viability_score: float
+    reasoning: str
+
+class MarketAnalysis(BaseModel):
+    target_audience: str
+    competitors: List[Competitor]
+    market_gaps: List[str]
+    verdict: MarketVerdict
+
+class CustomerResp(BaseModel):
+    market_analysis: MarketAnalysis
+
+class TechStack(BaseModel):
+    frontend: List[str]
+    backend: List[str]
+    database: List[str]
+    infrastructure: List[str]
+
+class TechnicalChallenge(BaseModel):
+    title: str
+    severity: str
+    description: str
+    mitigation: str
+
+class ImplementationPhase(BaseModel):
+    phase: str
+    duration: str
+    description: str
+
+class TechAnalysis(BaseModel):
+    feasibility_score: float
+    tech_stack: TechStack
+    technical_challenges: List[TechnicalChallenge]
+    implementation_plan: List[ImplementationPhase]
+
+class EngineerResp(BaseModel):
+    analysis: TechAnalysis
+
@@ -0,0 +1 @@
+from .batch_runner import run_batch
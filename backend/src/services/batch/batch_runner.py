@@ -0,0 +1,228 @@
+"""
+Batch runner for offline pipeline evaluation.
+
+Runs archived ideas through the full ProductConversationManager pipeline
+in a process pool and streams one JSON result per line as pipelines finish.
+
+Input JSONL (one idea per line):
+    {"id": "idea-1", "idea": "A habit tracker for remote teams", "answers": {"What is the target audience?": "Remote teams"}}
+
+Usage:
+    python -m src.services.batch.batch_runner ideas.jsonl -o results.jsonl --workers 4
+
+With --provider-batch the product, engineer and risk stages are submitted
+through the provider's batch API instead (see provider_batch.py).
+"""
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Set
+
+def load_ideas(input_path: str) -> List[Dict[str, Any]]:
+    """
+    Load idea records from a JSONL file.
+
+    Args:
+        input_path: Path to the JSONL file
+    Returns:
+        List of job dictionaries with 'id', 'idea' and 'answers' keys
+    """
+    jobs = []
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_num, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping invalid JSON on line {line_num}: {e}")
+                continue
+
+            idea = record.get("idea") or record.get("text")
+            if not idea:
+                print(f"Skipping line {line_num}: no 'idea' field")
+                continue
+
+            jobs.append({
+                "id": str(record.get("id", line_num)),
+                "idea": idea,
+                "answers": record.get("answers") or {},
+            })
+    return jobs
+
+def load_completed_ids(output_path: str, retry_errors: bool = False) -> Set[str]:
+    """
+    Read ids already present in a (possibly partial) output file.
+
+    A pipeline killed mid-write can leave a truncated last line, and
+    --retry-errors appends a rerun's record after the failed one, so the file
+    is rewritten with only its valid lines, keeping the latest record per id,
+    before new results are appended.
+
+    Args:
+        output_path: Path to the JSONL results file
+        retry_errors: If True, ids whose previous run failed are not treated as done
+    Returns:
+        Set of completed job ids
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    latest: Dict[str, Dict[str, Any]] = {}
+    latest_lines: Dict[str, str] = {}
+    rewrite = False
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                rewrite = True
+                continue
+            job_id = str(record.get("id"))
+            if job_id in latest:
+                # Re-insert so the surviving record keeps its newer position
+                rewrite = True
+                del latest_lines[job_id]
+            latest[job_id] = record
+            latest_lines[job_id] = line if line.endswith("\n") else line + "\n"
+
+    if rewrite:
+        print(f"Dropping corrupt and superseded lines from output file: {output_path}")
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.writelines(latest_lines.values())
+
+    return {
+        job_id for job_id, record in latest.items()
+        if not (retry_errors and record.get("status") != "ok")
+    }
+
+def run_pipeline(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one idea through the full pipeline. Executed inside a worker process.
+
+    Args:
+        job: Job dictionary from load_ideas
+    Returns:
+        Result record ready to be written as a JSONL line
+    """
+    # Imported here so each worker process builds its own agents and tracker
+    from src.ui.controller import ProductConversationManager
+    from src.utils.token_tracker import token_tracker
+    from src.config.env import DEFAULT_MODEL, USE_SINGLE_MODEL
+
+    token_tracker.reset()
+    start_time = time.time()
+    manager = None
+
+    record = {
+        "id": job["id"],
+        "idea": job["idea"],
+        "model": DEFAULT_MODEL if USE_SINGLE_MODEL else "per-agent",
+    }
+    try:
+        manager = ProductConversationManager(
+            thread_id=f"batch_{job['id']}",
+            text_input=job["idea"],
+        )
+        # Non-interactive clarifier: pre-supplied answers first, then the idea text
+        result = manager.run_full_workflow(
+            generate_audio=False,
+            clarifier_answers=job["answers"],
+            auto_answer=True,
+        )
+        record["status"] = "error" if "error" in result else "ok"
+        record["result"] = result
+    except Exception as e:
+        record["status"] = "error"
+        record["result"] = {"error": str(e), "traceback": traceback.format_exc()}
+
+    record["clarifier_answers"] = manager.clarifier_qa if manager else []
+    record["tokens"] = token_tracker.get_stats()
+    record["elapsed_seconds"] = round(time.time() - start_time, 3)
+    return record
+
+def run_batch(input_path: str, output_path: str, workers: int = 4,
+              retry_errors: bool = False, limit: Optional[int] = None,
+              provider_batch: bool = False) -> Dict[str, Any]:
+    """
+    Run every pending idea from input_path and append results to output_path.
+
+    Args:
+        input_path: JSONL file of ideas and pre-supplied clarifier answers
+        output_path: JSONL file results are streamed to (resumed if it exists)
+        workers: Maximum number of pipelines running at once
+        retry_errors: Re-run ideas whose previous result was an error
+        limit: Optional cap on the number of ideas to run
+        provider_batch: Run offline through the provider's batch API (product, engineer
+                        and risk stages only) instead of the interactive pipeline
+    Returns:
+        Summary dictionary with counts and elapsed time
+    """
+    jobs = load_ideas(input_path)
+    completed = load_completed_ids(output_path, retry_errors=retry_errors)
+    pending = [job for job in jobs if job["id"] not in completed]
+    if limit is not None:
+        pending = pending[:limit]
+
+    print(f"Batch: {len(jobs)} ideas, {len(completed)} already done, {len(pending)} to run with {workers} workers")
+
+    summary = {"total": len(pending), "ok": 0, "error": 0, "skipped": len(completed)}
+    start_time = time.time()
+
+    if pending and provider_batch:
+        from src.services.batch.provider_batch import run_offline
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            def write(record: Dict[str, Any]) -> None:
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+                summary[record["status"]] += 1
+            run_offline(pending, on_record=write)
+    elif pending:
+        with open(output_path, "a", encoding="utf-8") as out, \
+                ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(run_pipeline, job): job for job in pending}
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                job = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. OOM); keep the batch going
+                    record = {"id": job["id"], "idea": job["idea"], "status": "error",
+                              "result": {"error": f"Worker failed: {e}"}}
+
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+
+                summary[record["status"]] += 1
+                print(f"[{done_count}/{len(pending)}] {job['id']}: {record['status']}")
+
+    summary["elapsed_seconds"] = round(time.time() - start_time, 3)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Run archived ideas through the full product pipeline")
+    parser.add_argument("input", help="JSONL file with 'id', 'idea' and optional 'answers' per line")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl",
+                        help="JSONL file to stream results to (resumed if it already exists)")
+    parser.add_argument("-w", "--workers", type=int, default=4,
+                        help="Maximum number of pipelines running concurrently")
+    parser.add_argument("--retry-errors", action="store_true",
+                        help="Re-run ideas whose previous result was an error")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N pending ideas")
+    parser.add_argument("--provider-batch", action="store_true",
+                        help="Submit the product, engineer and risk stages through the provider's batch API")
+    args = parser.parse_args()
+
+    summary = run_batch(args.input, args.output, workers=args.workers,
+                        retry_errors=args.retry_errors, limit=args.limit, provider_batch=args.provider_batch)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Offline pipeline execution through a provider-side batch API.
+
+For nightly re-analysis of archived ideas, where interactive latency doesn't
+matter, agent requests are submitted through an OpenAI-compatible batch
+interface (JSONL upload, poll, download) instead of one call each.
+
+The agents are built by the regular factories on an OfflineChatModel. Each
+stage runs twice: the first pass records the exact chat completion request
+every agent would send, the recorded requests are submitted as one batch, and
+the second pass replays the downloaded responses through the same agents, so
+outputs are parsed into ProductResp / EngineerResp / RiskAssessment exactly
+as in the interactive pipeline.
+
+Usage:
+    python -m src.services.batch.batch_runner ideas.jsonl -o results.jsonl --provider-batch
+"""
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+import openai
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, convert_to_openai_messages
+from langchain_core.output_parsers.openai_tools import parse_tool_call
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel
+
+from src.agents.agent import get_product_agent
+from src.agents.engineer import get_engineer_agent
+from src.agents.risk import get_risk_agent
+from src.config.env import (
+    BATCH_API_BASE,
+    BATCH_COMPLETION_WINDOW,
+    BATCH_POLL_SECONDS,
+    BATCH_TIMEOUT_SECONDS,
+    OPENAI_API_KEY,
+)
+from src.config.model_config import DEFAULT_TEMPERATURE, sampling_settings, select_model
+from src.config.model_limits import get_agent_limit
+from src.models.agentComp import EngineerResp, ProductResp, RiskAssessment
+from src.utils.helper import process_agent_response
+from src.utils.http_pool import get_http_client, request_timeout
+from src.utils.projections import project_payload
+
+CHAT_COMPLETIONS = "/v1/chat/completions"
+
+# Request fields that don't change the answer; left out of the request key so a
+# max_tokens limit retuned between the two passes still finds its response
+_UNKEYED_FIELDS = {"max_tokens", "max_completion_tokens", "stream"}
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """Stable custom_id for a chat completion request body"""
+    keyed = {key: value for key, value in payload.items() if key not in _UNKEYED_FIELDS}
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+def request_body(model: str, messages: List[BaseMessage], sampling: Dict[str, Any],
+                 stop: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+    """
+    /v1/chat/completions request body for a model call.
+
+    Args:
+        model: Model name
+        messages: Chat messages
+        sampling: temperature / seed (None values are left out)
+        stop: Stop sequences
+        **kwargs: Call parameters bound on the model (max_tokens, response_format, tools, ...)
+    """
+    body = {"model": model, "messages": convert_to_openai_messages(messages)}
+    body.update({key: value for key, value in sampling.items() if value is not None})
+    body.update({key: value for key, value in kwargs.items() if value is not None})
+    if stop:
+        body["stop"] = stop
+    return body
+
+def response_message(response: Dict[str, Any]) -> AIMessage:
+    """AIMessage for a /v1/chat/completions response body, with the same metadata as ChatOpenAI"""
+    choice = (response.get("choices") or [{}])[0]
+    message = choice.get("message") or {}
+    usage = response.get("usage") or {}
+    tool_calls = [parse_tool_call(call, return_id=True) for call in message.get("tool_calls") or []]
+    return AIMessage(
+        content=message.get("content") or "",
+        tool_calls=[call for call in tool_calls if call],
+        response_metadata={
+            "token_usage": usage,
+            "model_name": response.get("model"),
+            "system_fingerprint": response.get("system_fingerprint"),
+            "finish_reason": choice.get("finish_reason"),
+        },
+        usage_metadata={
+            "input_tokens": usage.get("prompt_tokens", 0),
+            "output_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+        } if usage else None,
+    )
+
+class BatchClient:
+    """Upload, poll and download for an OpenAI-compatible batch API"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 poll_seconds: float = BATCH_POLL_SECONDS, timeout_seconds: float = BATCH_TIMEOUT_SECONDS,
+                 completion_window: str = BATCH_COMPLETION_WINDOW):
+        self.client = openai.OpenAI(api_key=api_key or OPENAI_API_KEY, base_url=base_url or BATCH_API_BASE,
+                                    http_client=get_http_client(), timeout=request_timeout())
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_seconds
+        self.completion_window = completion_window
+
+    def submit(self, requests: Dict[str, Dict[str, Any]]) -> str:
+        """
+        Upload requests as a JSONL file and create a batch.
+
+        Args:
+            requests: custom_id -> chat completion request body
+        Returns:
+            Batch id
+        """
+        lines = [json.dumps({"custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS, "body": body})
+                 for custom_id, body in requests.items()]
+        upload = self.client.files.create(file=("requests.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+                                          purpose="batch")
+        batch = self.client.batches.create(input_file_id=upload.id, endpoint=CHAT_COMPLETIONS,
+                                           completion_window=self.completion_window)
+        print(f"Submitted batch {batch.id} with {len(requests)} requests")
+        return batch.id
+
+    def wait(self, batch_id: str):
+        """Poll a batch until it reaches a final status"""
+        deadline = time.time() + self.timeout_seconds
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                print(f"Batch {batch_id}: {batch.status}")
+                return batch
+            if time.time() > deadline:
+                raise TimeoutError(f"Batch {batch_id} still '{batch.status}' after {self.timeout_seconds}s")
+            time.sleep(self.poll_seconds)
+
+    def results(self, batch) -> Dict[str, Dict[str, Any]]:
+        """
+        Download a finished batch's responses.
+
+        Returns:
+            custom_id -> chat completion response body (failed requests are left out)
+        """
+        responses = {}
+        if batch.output_file_id:
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    responses[record["custom_id"]] = response["body"]
+                else:
+                    print(f"Batch request {record['custom_id']} failed: {record.get('error') or response}")
+        if batch.error_file_id:
+            errors = self.client.files.content(batch.error_file_id).text.splitlines()
+            print(f"Batch {batch.id}: {len([e for e in errors if e.strip()])} requests failed")
+        return responses
+
+    def run(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Submit requests, wait for the batch and return its responses"""
+        return self.results(self.wait(self.submit(requests)))
+
+class BatchSession:
+    """Requests recorded by OfflineChatModels and the responses downloaded for them"""
+
+    def __init__(self, client: Optional[BatchClient] = None):
+        self.client = client or BatchClient()
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self.batches = 0
+
+    def model(self, agent_type: str) -> "OfflineChatModel":
+        """Offline chat model for an agent type (same model and sampling as get_model)"""
+        sampling = {"temperature": DEFAULT_TEMPERATURE, **sampling_settings(agent_type)}
+        return OfflineChatModel(session=self, model_name=select_model(agent_type), **sampling)
+
+    def flush(self) -> int:
+        """Submit every pending request as one batch; returns the number submitted"""
+        if not self.pending:
+            return 0
+        requests, self.pending = self.pending, {}
+        self.responses.update(self.client.run(requests))
+        self.batches += 1
+        return len(requests)
+
+class OfflineChatModel(BaseChatModel):
+    """
+    Chat model that answers from batch results instead of calling the API.
+
+    A request without a downloaded response is recorded in the session and
+    answered with an empty placeholder message (response_metadata batch_pending).
+    """
+
+    session: Any
+    model_name: str
+    temperature: Optional[float] = None
+    seed: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline-batch"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        payload = request_body(self.model_name, messages, {"temperature": self.temperature, "seed": self.seed},
+                               stop=stop, **kwargs)
+        custom_id = request_key(payload)
+        response = self.session.responses.get(custom_id)
+        if response is not None:
+            message = response_message(response)
+            return ChatResult(generations=[ChatGeneration(message=message)],
+                              llm_output={"token_usage": message.response_metadata["token_usage"],
+                                          "model_name": message.response_metadata["model_name"]})
+        self.session.pending[custom_id] = payload
+        placeholder = AIMessage(content="", response_metadata={"batch_pending": True, "custom_id": custom_id})
+        return ChatResult(generations=[ChatGeneration(message=placeholder)])
+
+def _content(result: Dict[str, Any]) -> str:
+    messages = result.get("messages") or []
+    return messages[-1].content if messages else ""
+
+def run_stage(session: BatchSession, agent, inputs: Dict[str, List[BaseMessage]],
+              schema: Type[BaseModel]) -> Dict[str, Optional[BaseModel]]:
+    """
+    Run one agent over many inputs through a single batch.
+
+    Args:
+        session: Batch session the agent's OfflineChatModel records into
+        agent: Agent built by a factory on session.model(...)
+        inputs: job id -> input messages
+        schema: Pydantic model the output is parsed into
+    Returns:
+        job id -> parsed response (None when the request failed or didn't validate)
+    """
+    for messages in inputs.values():
+        agent.invoke({"messages": messages})
+    session.flush()
+
+    from src.utils.token_tracker import token_tracker
+    parsed = {}
+    for job_id, messages in inputs.items():
+        result = agent.invoke({"messages": messages})
+        last = (result.get("messages") or [None])[-1]
+        metadata = getattr(last, "response_metadata", {}) or {}
+        if metadata.get("batch_pending"):
+            parsed[job_id] = None
+            continue
+        token_tracker.track_usage(metadata.get("token_usage"))
+        parsed[job_id] = process_agent_response(_content(result), schema)
+    return parsed
+
+def product_messages(job: Dict[str, Any], max_features: int) -> List[BaseMessage]:
+    """Product agent input for an archived idea and its pre-supplied answers"""
+    lines = [f"Product idea: {job['idea']}"]
+    if job.get("answers"):
+        lines += ["", "Requirements:"] + [f"- {question}: {answer}" for question, answer in job["answers"].items()]
+    trigger = f"Based on the gathered requirements, please generate the full product specification with at least {max_features} features."
+    return [HumanMessage(content="\n".join(lines)), HumanMessage(content=trigger)]
+
+def run_offline(jobs: List[Dict[str, Any]], session: Optional[BatchSession] = None,
+                on_record: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Run the product, engineer and risk stages for many ideas, one batch per stage.
+
+    Args:
+        jobs: Job dictionaries from batch_runner.load_ideas
+        session: Batch session (defaults to one on BATCH_API_BASE)
+        on_record: Called with each finished result record
+    Returns:
+        Result records shaped like batch_runner.run_pipeline's
+    """
+    session = session or BatchSession()
+    start_time = time.time()
+    max_features = get_agent_limit("product", "max_features", 5)
+
+    product_agent = get_product_agent(session.model("product"), max_features=max_features, stateless=True)
+    engineer_agent = get_engineer_agent(session.model("engineer"), stateless=True)
+    risk_agent = get_risk_agent(session.model("risk"), stateless=True)
+
+    products = run_stage(session, product_agent,
+                         {job["id"]: product_messages(job, max_features) for job in jobs}, ProductResp)
+    data = {job_id: {"product": product.model_dump()} for job_id, product in products.items() if product}
+
+    engineers = run_stage(session, engineer_agent,
+                          {job_id: [HumanMessage(content=project_payload("engineer", item)[0])]
+                           for job_id, item in data.items()}, EngineerResp)
+    for job_id, engineer in engineers.items():
+        if engineer:
+            data[job_id]["engineer"] = engineer.model_dump()
+
+    risks = run_stage(session, risk_agent,
+                      {job_id: [HumanMessage(content=project_payload("risk", item)[0])]
+                       for job_id, item in data.items() if "engineer" in item}, RiskAssessment)
+
+    records = []
+    for job in jobs:
+        item = data.get(job["id"], {})
+        risk = risks.get(job["id"])
+        result = {
+            "product": item.get("product"),
+            "engineer": item.get("engineer"),
+            "risk": {"assessment": risk.model_dump()} if risk else None,
+        }
+        failed = [stage for stage, value in result.items() if value is None]
+        if failed:
+            result["error"] = f"No valid batch response for: {', '.join(failed)}"
+        record = {
+            "id": job["id"],
+            "idea": job["idea"],
+            "status": "error" if failed else "ok",
+            "result": result,
+            "mode": "provider_batch",
+            "elapsed_seconds": round(time.time() - start_time, 3),
+        }
+        records.append(record)
+        if on_record:
+            on_record(record)
+    print(f"Offline run: {len(jobs)} ideas in {session.batches} batches")
+    return records
@@ -3,12 +3,12 @@ import base64
 import uuid
 import webbrowser
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpoint import get_checkpointer
 from langchain_core.tools import tool
 from src.config.env import OPENAI_API_KEY
 
 # --- Create memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 
 # --- Define visualization tool ---
 @tool
@@ -4,12 +4,13 @@ import time
 import tempfile
 import subprocess
 import shutil
-import math
 from typing import List
 from pathlib import Path
 import requests
 import pygame
 
+from src.utils.tokenizer import count_tokens, heuristic_tokens
+
 # TTS Configuration
 SINGLE_VOICE = "Fritz-PlayAI"
 TTS_MODEL = "playai-tts"
@@ -24,12 +25,12 @@ SECONDS_WINDOW = 60              # window length for TPM
 # ----------------- helpers -----------------
 def estimate_tokens(text: str) -> int:
     """
-    More conservative token estimator: ~1 token per 3 characters.
-    This is more conservative to avoid exceeding limits.
+    Conservative token estimate for the TTS provider's limits.
+
+    playai-tts has its own token accounting, so the shared tokenizer's count is
+    only a lower bound; the larger of it and ~1 token per 3 characters is used.
     """
-    if not text:
-        return 0
-    return max(1, math.ceil(len(text) / 3.0))  # Changed from 4.0 to 3.0
+    return max(heuristic_tokens(text), count_tokens(text, TTS_MODEL))
 
 def chunk_text_by_tokens(text: str, max_tokens: int) -> List[str]:
     """
@@ -5,12 +5,13 @@ import time
 import tempfile
 import subprocess
 import shutil
-import math
 from typing import List
 from pathlib import Path
 import requests
 import pygame
 
+from src.utils.tokenizer import count_tokens, heuristic_tokens
+
 # TTS Configuration
 SINGLE_VOICE = "Fritz-PlayAI"
 TTS_MODEL = "playai-tts"
@@ -23,10 +24,13 @@ SAFETY_MARGIN = 0.85             # safety margin
 SECONDS_WINDOW = 60              # window length for TPM
 
 def estimate_tokens(text: str) -> int:
-    """Conservative token estimator: ~1 token per 3 characters"""
-    if not text:
-        return 0
-    return max(1, math.ceil(len(text) / 3.0))
+    """
+    Conservative token estimate for the TTS provider's limits.
+
+    playai-tts has its own token accounting, so the shared tokenizer's count is
+    only a lower bound; the larger of it and ~1 token per 3 characters is used.
+    """
+    return max(heuristic_tokens(text), count_tokens(text, TTS_MODEL))
 
 def chunk_text_by_tokens(text: str, max_tokens: int) -> List[str]:
     """Split text into chunks so each chunk estimates <= max_tokens"""
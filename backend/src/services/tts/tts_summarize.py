@@ -1,11 +1,11 @@
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpoint import get_checkpointer
 from langchain_core.tools import tool
 from src.config.env import OPENAI_API_KEY
 import json
 
 # --- Create memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 
 # --- Create TTS text converter agent ---
 # --- Create TTS text converter agent ---
@@ -55,11 +55,8 @@ Important:
 
 # Backward compatibility
 try:
-    from src.config.model_config import default_model
-    if default_model:
-        tts_converter = get_tts_converter_agent(default_model)
-    else:
-        tts_converter = None
+    from src.config.model_config import get_model
+    tts_converter = get_tts_converter_agent(get_model(agent_type="tts_converter"))
 except Exception:
     tts_converter = None
 
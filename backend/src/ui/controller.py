@@ -5,19 +5,25 @@ from typing import Dict, Any, Optional, List
 from langchain_core.messages import HumanMessage, BaseMessage
 
 # Import agents and utilities
-from src.agents.agent import get_clarifier_agent, get_product_agent
-from src.models.agentComp import ClarifierResp, ProductResp
-from src.utils.helper import get_user_input, process_agent_response
-from src.agents.engineer import get_engineer_agent
+from src.agents.agent import get_clarifier_agent, get_product_agent, get_intake_agent
+from src.models.agentComp import ClarifierResp, ProductResp, IntakeResp, CustomerResp, EngineerResp, RiskAssessment, SummarizerOutput
+from src.utils.helper import get_user_input, process_agent_response, run_batched_clarifier, ClarifierCoverage
+from src.utils.compaction import compact_clarifier_history
+from src.utils.projections import project_payload
+from src.utils.repair import repair_response
+from src.utils.analytics import compute_analytics, attach_customer_graph
+from src.agents.engineer import get_engineer_agent, get_engineer_section_agent, run_engineer_sections
 from src.agents.customer import get_customer_agent
-from src.agents.risk import get_risk_agent
-from src.agents.summarizer import get_summarizer_agent
+from src.agents.risk import get_risk_agent, assess_risk_fanout, assess_risk_prescreened
+from src.agents.summarizer import get_summarizer_agent, SectionSummarizer
 from src.utils.prompt import get_prompt_generator_agent
 from src.services.diagram.diagramAgent import generate_mermaid_link
 from src.services.tts.tts_summarize import get_tts_converter_agent
 from src.services.tts.tts import TextToSpeech, synthesize_text_with_rate_limit
 from src.config.model_config import get_model
 from src.config.model_limits import get_agent_limit
+from src.utils.model_tiering import tiered_agent
+from src.utils.fingerprint import generation_settings, model_fingerprint, fingerprint_registry
 
 class ProductConversationManager:
     def __init__(self, thread_id: str = "product_conversation",
@@ -26,7 +32,14 @@ class ProductConversationManager:
                  audio_input: Optional[str] = None,
                  model_provider: str = "openai",
                  max_questions: Optional[int] = None,
-                 max_features: Optional[int] = None):
+                 max_features: Optional[int] = None,
+                 summary_mode: str = "single",
+                 fused_intake: bool = False,
+                 risk_mode: str = "single",
+                 engineer_mode: str = "single",
+                 structured_output: Optional[bool] = None,
+                 model_tiering: Optional[bool] = None):
+        self.thread_id = thread_id
         self.config = {"configurable": {"thread_id": thread_id}}
         self.text_input = text_input
         self.image_input = image_input
@@ -43,26 +56,67 @@ class ProductConversationManager:
         self.max_features = max_features
         
         # Initialize model and agents with agent-specific models
-        self.clarifier_agent = get_clarifier_agent(get_model(provider=model_provider, agent_type="clarifier"), max_questions=max_questions)
-        self.product_agent = get_product_agent(get_model(provider=model_provider, agent_type="product"), max_features=max_features)
-        self.customer_runner = get_customer_agent(get_model(provider=model_provider, agent_type="customer"))
-        self.engineer_agent = get_engineer_agent(get_model(provider=model_provider, agent_type="engineer"))
-        self.risk_agent = get_risk_agent(get_model(provider=model_provider, agent_type="risk"))
-        self.summarizer_agent = get_summarizer_agent(get_model(provider=model_provider, agent_type="summarizer"))
+        # structured_output=None follows the STRUCTURED_OUTPUT env setting
+        # model_tiering=None follows the MODEL_TIERING env setting
+        # stage -> generation_settings() of the model the stage's agent was built on
+        self.stage_settings: Dict[str, Dict[str, Any]] = {}
+        tiered = lambda name, schema, build, agent_type=None: tiered_agent(
+            name, schema, self._capture_settings(agent_type or name, build), agent_type=agent_type,
+            provider=model_provider, enabled=model_tiering)
+        self.clarifier_agent = tiered("clarifier", ClarifierResp, lambda m: get_clarifier_agent(m, max_questions=max_questions, structured=structured_output))
+        # Fused intake: classification + first clarifier round in one completion
+        self.fused_intake = fused_intake
+        self.intake_agent = tiered("intake", IntakeResp, lambda m: get_intake_agent(m, max_questions=max_questions, structured=structured_output),
+                                   agent_type="clarifier") if fused_intake else None
+        self.product_agent = tiered("product", ProductResp, lambda m: get_product_agent(m, max_features=max_features, structured=structured_output))
+        self.customer_runner = tiered("customer", CustomerResp, lambda m: get_customer_agent(m, structured=structured_output))
+        self.engineer_agent = tiered("engineer", EngineerResp, lambda m: get_engineer_agent(m, structured=structured_output))
+        self.risk_agent = tiered("risk", RiskAssessment, lambda m: get_risk_agent(m, structured=structured_output))
+        self.summarizer_agent = tiered("summarizer", SummarizerOutput, lambda m: get_summarizer_agent(m, structured=structured_output))
         self.prompt_generator = get_prompt_generator_agent(get_model(provider=model_provider, agent_type="prompt_generator"))
         self.tts_converter = get_tts_converter_agent(get_model(provider=model_provider, agent_type="tts_converter"))
 
+        # "sections" generates the engineer analysis sections concurrently
+        self.engineer_mode = engineer_mode
+        self.engineer_section_agent = self._capture_settings("engineer", get_engineer_section_agent)(
+            get_model(provider=model_provider, agent_type="engineer")) if engineer_mode == "sections" else None
+
+        # "fanout" assesses product features in parallel micro-batches
+        self.risk_mode = risk_mode
+
+        # "map_reduce" drafts summary sections while later stages are still running
+        self.summary_mode = summary_mode
+        self.section_summarizer = None
+        if summary_mode == "map_reduce":
+            self.section_summarizer = SectionSummarizer(
+                get_model(provider=model_provider, agent_type="summarizer"),
+                thread_id=f"{thread_id}:summary"
+            )
+
         self.final_data: Dict[str, Any] = {
+            "classification": None,
             "clarifier": None,
             "product": None,
             "customer": None,
             "engineer": None,
             "risk": None,
+            "analytics": None,
             "diagram_url": None,
             "tts_file": None
         }
         self.clarifier_messages: List[BaseMessage] = []
         self.product_messages: List[BaseMessage] = []
+        self.clarifier_qa: List[Dict[str, str]] = []
+        self.context_report: Dict[str, Dict[str, int]] = {}
+        # stage -> "structured" or "toon"
+        self.output_modes: Dict[str, str] = {}
+        # stage -> {"tier", "escalations"} when model tiering is on
+        self.model_tiers: Dict[str, Dict[str, Any]] = {}
+        # stage -> model, system_fingerprint, temperature, seed of the answering call
+        self.fingerprints: Dict[str, Dict[str, Any]] = {}
+        self.clarifier_coverage: Optional[ClarifierCoverage] = None
+        # stage -> number of validation repair calls
+        self.repairs: Dict[str, int] = {}
         self._clear_intermediate_data()
 
     def _clear_intermediate_data(self) -> None:
@@ -70,6 +124,42 @@ class ProductConversationManager:
         self.clarifier_messages.clear()
         self.product_messages.clear()
 
+    def _stage_config(self, stage: str) -> Dict[str, Any]:
+        """Config with a per-stage thread_id, isolating a stage from earlier checkpoints"""
+        return {"configurable": {"thread_id": f"{self.thread_id}:{stage}"}}
+
+    def _track_context(self, stage: str, original_tokens: int, sent_tokens: int) -> None:
+        """Record prompt tokens saved for a stage in the run report and the token tracker"""
+        from src.utils.token_tracker import token_tracker
+        token_tracker.track_context(stage, original_tokens, sent_tokens)
+        self.context_report[stage] = {
+            "original_tokens": original_tokens,
+            "sent_tokens": sent_tokens,
+            "saved_tokens": original_tokens - sent_tokens,
+        }
+        print(f"Context for {stage}: {original_tokens} -> {sent_tokens} estimated prompt tokens")
+
+    def _capture_settings(self, stage: str, build):
+        """Wrap an agent builder so the settings of the model it is built on are remembered"""
+        def build_and_capture(model):
+            self.stage_settings[stage] = generation_settings(model)
+            return build(model)
+        return build_and_capture
+
+    def _record_output_mode(self, stage: str, result: Dict[str, Any]) -> None:
+        """Remember which output mode (structured/toon), model tier and model fingerprint answered a stage"""
+        if isinstance(result, dict):
+            self.output_modes[stage] = result.get("output_mode", "toon")
+            if "model_tier" in result:
+                self.model_tiers[stage] = {"tier": result["model_tier"], "escalations": result.get("escalations", 0)}
+            messages = result.get("messages") or []
+            if messages:
+                # A tiered agent reports the tier that answered; otherwise the stage's only model
+                settings = result.get("model_settings") or self.stage_settings.get(stage)
+                fingerprint = model_fingerprint(messages[-1], settings)
+                fingerprint_registry.observe(fingerprint)
+                self.fingerprints[stage] = fingerprint
+
     def generate_enhanced_prompt(self) -> str:
         """Generate an enhanced prompt using multiple input modalities"""
         print("DEBUG: Entering generate_enhanced_prompt")
@@ -96,13 +186,25 @@ class ProductConversationManager:
             raise e
 
     def run_clarifier_conversation(self, max_rounds: int = 3, max_user_inputs: int = 4,
-                                  user_input_callback=None, clarifier_callback=None) -> bool:
-        """Run the clarifier conversation loop with enhanced prompt"""
+                                  user_input_callback=None, clarifier_callback=None,
+                                  answers=None, auto_answer: bool = False) -> bool:
+        """Run the clarifier conversation loop with enhanced prompt.
+
+        If answers (question -> answer map or ordered list) or auto_answer is given,
+        the clarifier runs non-interactively and all answers go out in one batched turn.
+        """
         print("Starting Clarifier conversation...")
 
+        # Text-only input with fused intake skips the prompt generator round trip
+        use_fused = self.intake_agent is not None and not (self.image_input or self.audio_input)
+        first_agent = self.intake_agent if use_fused else self.clarifier_agent
+
         # Generate enhanced prompt if inputs are provided
-        print("DEBUG: Calling generate_enhanced_prompt")
-        initial_prompt = self.generate_enhanced_prompt()
+        if use_fused and self.text_input:
+            initial_prompt = self.text_input
+        else:
+            print("DEBUG: Calling generate_enhanced_prompt")
+            initial_prompt = self.generate_enhanced_prompt()
         print(f"DEBUG: Enhanced prompt generated: {initial_prompt[:50]}...")
         
         initial_message = HumanMessage(
@@ -110,9 +212,17 @@ class ProductConversationManager:
                    f"Only ask {self.max_questions} critical questions that require user input."
         )
 
+        idea_text = "\n".join(dict.fromkeys(filter(None, [self.text_input, initial_prompt])))
+        self.clarifier_coverage = coverage = ClarifierCoverage(idea_text)
+        print(f"Clarifier coverage from the idea: {coverage.report()}")
+
+        if answers is not None or auto_answer:
+            return self._run_batched_clarifier(initial_message, idea_text, answers, auto_answer, first_agent)
+
         # Initial invocation
         print("DEBUG: Invoking clarifier_agent (Round 1)")
-        clarifier_result = self.clarifier_agent.invoke({"messages": [initial_message]}, self.config)
+        clarifier_result = first_agent.invoke({"messages": [initial_message]}, self.config)
+        self._record_output_mode("clarifier", clarifier_result)
         print("DEBUG: clarifier_agent invoked successfully")
         
         self.clarifier_messages = clarifier_result.get("messages", [])
@@ -126,6 +236,8 @@ class ProductConversationManager:
 
         # Process the response
         clarifier_obj = process_agent_response(clarifier_response, ClarifierResp, usage_metadata)
+        if use_fused:
+            self._record_classification(clarifier_response)
         if clarifier_obj:
             self.final_data["clarifier"] = clarifier_obj.model_dump()
             print(json.dumps(self.final_data["clarifier"], indent=2))
@@ -140,6 +252,15 @@ class ProductConversationManager:
             user_inputs_needed = False
             if clarifier_obj:
                 for req in clarifier_obj.resp:
+                    if not req.answer and coverage.answered_by_idea(req.question):
+                        # The idea already answers this; don't make the user wait on it
+                        req.answer = coverage.skip(req.question)
+                        self.clarifier_qa.append({"question": req.question, "answer": req.answer})
+                        self.clarifier_messages.append(
+                            HumanMessage(content=f"User answered: '{req.question}' -> '{req.answer}'")
+                        )
+                        print(f"Skipped (answered by the idea): {req.question}")
+                        continue
                     if not req.answer and user_inputs_collected < max_user_inputs:
                         # Get user answer using the appropriate callback
                         if clarifier_callback:
@@ -150,13 +271,26 @@ class ProductConversationManager:
                             user_answer = get_user_input(req.question)
 
                         req.answer = user_answer
+                        coverage.record(req.question, user_answer)
                         user_inputs_collected += 1
                         user_inputs_needed = True
+                        self.clarifier_qa.append({"question": req.question, "answer": user_answer})
                         self.clarifier_messages.append(
                             HumanMessage(content=f"User answered: '{req.question}' -> '{user_answer}'")
                         )
                         print(f"\nUser inputs collected: {user_inputs_collected}/{max_user_inputs}")
 
+            if coverage.sufficient():
+                print(f"Clarifier coverage {coverage.coverage:.0%} is sufficient, stopping after {round_num} rounds")
+                if clarifier_obj:
+                    clarifier_obj.done = True
+                    self.final_data["clarifier"] = clarifier_obj.model_dump()
+                break
+            if coverage.missing:
+                self.clarifier_messages.append(
+                    HumanMessage(content=f"Still uncovered: {', '.join(coverage.missing)}. Ask only about these, otherwise set \"done\" to true.")
+                )
+
             # Continue conversation
             clarifier_result = self.clarifier_agent.invoke({"messages": self.clarifier_messages}, self.config)
             self.clarifier_messages = clarifier_result.get("messages", [])
@@ -175,6 +309,38 @@ class ProductConversationManager:
 
         return True
 
+    def _record_classification(self, response: str) -> None:
+        """Store the classification part of a fused intake response"""
+        intake_obj = process_agent_response(response, IntakeResp)
+        if intake_obj:
+            self.final_data["classification"] = {
+                "idea": intake_obj.idea,
+                "domain": intake_obj.domain,
+                "complexity": intake_obj.complexity,
+            }
+            print(f"Classification: {self.final_data['classification']}")
+
+    def _run_batched_clarifier(self, initial_message: HumanMessage, idea: str, answers, auto_answer: bool,
+                               first_agent=None) -> bool:
+        """Run the clarifier with pre-supplied answers in at most two LLM calls"""
+        clarifier_obj, self.clarifier_messages, qa_pairs = run_batched_clarifier(
+            self.clarifier_agent, initial_message, self.config,
+            idea=idea, answers=answers, auto_answer=auto_answer, first_agent=first_agent,
+            coverage=self.clarifier_coverage,
+            on_result=lambda result: self._record_output_mode("clarifier", result)
+        )
+        if not self.clarifier_messages:
+            return False
+
+        if first_agent is not None and first_agent is self.intake_agent and len(self.clarifier_messages) > 1:
+            self._record_classification(self.clarifier_messages[1].content)
+
+        self.clarifier_qa.extend(qa_pairs)
+        if clarifier_obj:
+            self.final_data["clarifier"] = clarifier_obj.model_dump()
+            print(json.dumps(self.final_data["clarifier"], indent=2))
+        return True
+
     def run_product_agent(self) -> bool:
         """Run the product agent with retry logic and diagram generation"""
         print("\nGenerating Product response...")
@@ -182,9 +348,16 @@ class ProductConversationManager:
             print("Error: No clarifier messages available for product agent")
             return False
 
+        # Fold the clarifier history into a compact requirements record
+        budget = get_agent_limit("product", "context_tokens", None)
+        requirements_message, report = compact_clarifier_history(self.clarifier_messages, budget)
+        self._track_context("product", report["original_tokens"], report["compacted_tokens"])
+
         # Initial invocation
         trigger_message = HumanMessage(content=f"Based on the gathered requirements, please generate the full product specification with at least {self.max_features} features.")
-        product_result = self.product_agent.invoke({"messages": self.clarifier_messages + [trigger_message]}, self.config)
+        # Own thread so the checkpointer doesn't replay the full clarifier history
+        product_result = self.product_agent.invoke({"messages": [requirements_message, trigger_message]}, self._stage_config("product"))
+        self._record_output_mode("product", product_result)
         self.product_messages = product_result.get("messages", [])
         if not self.product_messages:
             print("Error: Product agent returned no messages")
@@ -207,62 +380,39 @@ class ProductConversationManager:
             if not parsed:
                 # Fallback to JSON
                 parsed = json.loads(product_response)
-            
-            # Convert to ProductResp object
-            product_obj = ProductResp(
-                name=parsed.get("name", "Unknown Product"),
-                description=parsed.get("description", "No description available"),
-                features=parsed.get("features", [])
-            )
         except Exception as e:
             print(f"Error processing response: {e}")
+            parsed = {}
+
+        # Repair only what is missing or invalid instead of regenerating the spec
+        product_obj, repair_report = repair_response(
+            self.product_agent, parsed, ProductResp, thread_id=f"{self.thread_id}:product",
+            min_items={"features": max(5, self.max_features)}, context=requirements_message.content
+        )
+        if repair_report["rounds"]:
+            self.repairs["product"] = repair_report["rounds"]
+        if product_obj is None:
             print("\nError: Could not parse product response.")
             return False
 
-        if product_obj:
-            self.final_data["product"] = product_obj.model_dump()
-            print(json.dumps(self.final_data["product"], indent=2))
+        self.final_data["product"] = product_obj.model_dump()
+        print(json.dumps(self.final_data["product"], indent=2))
 
-            # Generate diagram from product data with error handling
-            try:
-                product_json = json.dumps(self.final_data["product"], indent=2)
-                # Use the new generate_mermaid_link function with open_in_browser=False
-                diagram_url = generate_mermaid_link(product_json, open_in_browser=False)
-                if diagram_url:
-                    self.final_data["diagram_url"] = diagram_url
-                    print(f"\nGenerated diagram URL: {diagram_url}")
-                else:
-                    print("\nWarning: Could not generate diagram URL")
-                    self.final_data["diagram_url"] = None
-            except Exception as e:
-                print(f"\nError generating diagram: {e}")
+        # Generate diagram from product data with error handling
+        try:
+            product_json = json.dumps(self.final_data["product"], indent=2)
+            # Use the new generate_mermaid_link function with open_in_browser=False
+            diagram_url = generate_mermaid_link(product_json, open_in_browser=False)
+            if diagram_url:
+                self.final_data["diagram_url"] = diagram_url
+                print(f"\nGenerated diagram URL: {diagram_url}")
+            else:
+                print("\nWarning: Could not generate diagram URL")
                 self.final_data["diagram_url"] = None
-                print("Continuing without diagram...")
-
-            # Ensure we have at least 5 features
-            if len(product_obj.features) < 5:
-                print("\nAdding more features to meet the minimum requirement...")
-                # Create a new features list with at least 5 features
-                base_features = product_obj.features.copy()
-                additional_features = [
-                    {"name": "User Profiles", "reason": "Personalization", "goal_oriented": 0.7, "development_time": "1 week", "cost_estimate": 2000.0},
-                    {"name": "Social Sharing", "reason": "Engagement", "goal_oriented": 0.6, "development_time": "1 week", "cost_estimate": 1500.0},
-                    {"name": "Progress Tracking", "reason": "Motivation", "goal_oriented": 0.9, "development_time": "2 weeks", "cost_estimate": 3000.0},
-                    {"name": "Goal Setting", "reason": "User retention", "goal_oriented": 0.8, "development_time": "1 week", "cost_estimate": 2500.0},
-                    {"name": "Health Insights", "reason": "Value addition", "goal_oriented": 0.7, "development_time": "2 weeks", "cost_estimate": 4000.0}
-                ]
-
-                # Add additional features until we have at least 5
-                while len(base_features) < 5 and additional_features:
-                    base_features.append(additional_features.pop(0))
-
-                # Update the product object
-                product_obj.features = base_features
-                self.final_data["product"] = product_obj.model_dump()
-                print(json.dumps(self.final_data["product"], indent=2))
-        else:
-            print("\nError: Could not parse product response.")
-            return False
+        except Exception as e:
+            print(f"\nError generating diagram: {e}")
+            self.final_data["diagram_url"] = None
+            print("Continuing without diagram...")
 
         return True
 
@@ -274,10 +424,16 @@ class ProductConversationManager:
             return False
 
         product_response = self.product_messages[-1].content
+        if self.final_data.get("product"):
+            customer_input, report = project_payload("customer", self.final_data, baseline=product_response)
+            self._track_context("customer", report["original_tokens"], report["sent_tokens"])
+        else:
+            customer_input = product_response
         customer_result = self.customer_runner.invoke(
-            {"messages": [HumanMessage(content=product_response)]},
+            {"messages": [HumanMessage(content=customer_input)]},
             self.config
         )
+        self._record_output_mode("customer", customer_result)
         if not customer_result or not customer_result.get("messages"):
             print("Error: Customer agent returned no result")
             return False
@@ -296,8 +452,8 @@ class ProductConversationManager:
             if not parsed:
                 # Fallback to JSON
                 parsed = json.loads(customer_response)
-                
-            self.final_data["customer"] = parsed
+
+            self.final_data["customer"] = attach_customer_graph(parsed, self.final_data.get("product"))
             print(json.dumps(parsed, indent=2))
             return True
         except Exception as e:
@@ -311,10 +467,24 @@ class ProductConversationManager:
             print("Error: No customer data available for engineer agent")
             return False
 
+        engineer_input, report = project_payload("engineer", self.final_data, baseline=json.dumps(self.final_data["customer"]))
+        self._track_context("engineer", report["original_tokens"], report["sent_tokens"])
+
+        if self.engineer_section_agent:
+            engineer_data = run_engineer_sections(self.engineer_section_agent, engineer_input, thread_id=f"{self.thread_id}:engineer",
+                                                  on_result=lambda result: self._record_output_mode("engineer", result))
+            if not engineer_data["analysis"]:
+                print("Error: No engineer sections could be generated")
+                return False
+            self.final_data["engineer"] = engineer_data
+            print(json.dumps(engineer_data, indent=2))
+            return True
+
         engineer_result = self.engineer_agent.invoke(
-            {"messages": [HumanMessage(content=json.dumps(self.final_data["customer"]))]},
+            {"messages": [HumanMessage(content=engineer_input)]},
             self.config
         )
+        self._record_output_mode("engineer", engineer_result)
         if not engineer_result.get("messages"):
             print("Error: Engineer agent returned no messages")
             return False
@@ -356,10 +526,29 @@ class ProductConversationManager:
             print("Error: No engineer data available for risk agent")
             return False
 
+        features = (self.final_data.get("product") or {}).get("features") or []
+        prescreen = get_agent_limit("risk", "prescreen", False)
+        if features and (self.risk_mode == "fanout" or prescreen):
+            record = lambda result: self._record_output_mode("risk", result)
+            context, report = project_payload("risk_context", self.final_data, baseline=json.dumps(self.final_data["engineer"]))
+            self._track_context("risk", report["original_tokens"], report["sent_tokens"])
+            if prescreen:
+                assessment = assess_risk_prescreened(self.risk_agent, features, context, thread_id=f"{self.thread_id}:risk",
+                                                     fanout=self.risk_mode == "fanout", on_result=record)
+            else:
+                assessment = assess_risk_fanout(self.risk_agent, features, context, thread_id=f"{self.thread_id}:risk",
+                                                on_result=record)
+            self.final_data["risk"] = {"assessment": assessment.model_dump()}
+            print(json.dumps(self.final_data["risk"], indent=2))
+            return True
+
+        risk_input, report = project_payload("risk", self.final_data, baseline=json.dumps(self.final_data["engineer"]))
+        self._track_context("risk", report["original_tokens"], report["sent_tokens"])
         risk_result = self.risk_agent.invoke(
-            {"messages": [HumanMessage(content=json.dumps(self.final_data["engineer"]))]},
+            {"messages": [HumanMessage(content=risk_input)]},
             self.config
         )
+        self._record_output_mode("risk", risk_result)
         if not risk_result.get("messages"):
             print("Error: Risk agent returned no messages")
             return False
@@ -384,13 +573,33 @@ class ProductConversationManager:
             print(f"Error: Failed to parse risk response: {e}")
             return False
 
+    def _refresh_analytics(self) -> None:
+        """Recompute the deterministic numeric figures from the data collected so far"""
+        self.final_data["analytics"] = compute_analytics(self.final_data) or None
+
+    def _draft_summary_section(self, section: str) -> None:
+        """In map_reduce mode, start drafting a summary section in the background"""
+        if self.section_summarizer:
+            self._refresh_analytics()
+            print(f"Drafting summary section '{section}' in the background...")
+            self.section_summarizer.submit(section, self.final_data)
+
     def run_summarizer_agent(self) -> str:
         """Run the summarizer agent and return summary"""
+        self._refresh_analytics()
         print("\nGenerating Final Summary...")
+        if self.section_summarizer:
+            summary = self.section_summarizer.merge(self.final_data)
+            print(f"\n📌 Final Summary:\n{summary}")
+            return summary
+
+        summary_input, report = project_payload("summarizer", self.final_data, baseline=json.dumps(self.final_data, indent=2))
+        self._track_context("summarizer", report["original_tokens"], report["sent_tokens"])
         summary_result = self.summarizer_agent.invoke(
-            {"messages": [HumanMessage(content=json.dumps(self.final_data, indent=2))]},
+            {"messages": [HumanMessage(content=summary_input)]},
             self.config
         )
+        self._record_output_mode("summarizer", summary_result)
         if not summary_result.get("messages"):
             print("Error: Summarizer agent returned no messages")
             return ""
@@ -454,7 +663,8 @@ class ProductConversationManager:
 
     # refinedModelClass.py - Update the run_full_workflow method
 
-    def run_full_workflow(self, user_input_callback=None, clarifier_callback=None, generate_audio: bool = True, progress_callback=None) -> Dict[str, Any]:
+    def run_full_workflow(self, user_input_callback=None, clarifier_callback=None, generate_audio: bool = True, progress_callback=None,
+                          clarifier_answers=None, auto_answer: bool = False) -> Dict[str, Any]:
         """Execute the entire conversation workflow"""
         try:
             # Step 1: Run clarifier conversation
@@ -462,7 +672,9 @@ class ProductConversationManager:
                 progress_callback("Running clarifier conversation...")
             if not self.run_clarifier_conversation(
                 user_input_callback=user_input_callback,
-                clarifier_callback=clarifier_callback
+                clarifier_callback=clarifier_callback,
+                answers=clarifier_answers,
+                auto_answer=auto_answer
             ):
                 print("Clarifier conversation failed. Aborting workflow.")
                 return {"error": "Clarifier conversation failed"}
@@ -480,6 +692,7 @@ class ProductConversationManager:
             if not self.run_customer_agent():
                 print("Customer agent failed. Aborting workflow.")
                 return {"error": "Customer agent failed"}
+            self._draft_summary_section("market")
 
             # Step 4: Run engineer agent
             if progress_callback:
@@ -487,6 +700,7 @@ class ProductConversationManager:
             if not self.run_engineer_agent():
                 print("Engineer agent failed. Aborting workflow.")
                 return {"error": "Engineer agent failed"}
+            self._draft_summary_section("technical")
 
             # Step 5: Run risk agent
             if progress_callback:
@@ -494,6 +708,7 @@ class ProductConversationManager:
             if not self.run_risk_agent():
                 print("Risk agent failed. Aborting workflow.")
                 return {"error": "Risk agent failed"}
+            self._draft_summary_section("risk")
 
             # Step 6: Generate final summary
             if progress_callback:
@@ -510,7 +725,13 @@ class ProductConversationManager:
             # Create result dictionary
             result = {
                 **self.final_data,
-                "summary": summary
+                "summary": summary,
+                "context_report": self.context_report,
+                "output_modes": self.output_modes,
+                "model_tiers": self.model_tiers,
+                "fingerprints": self.fingerprints,
+                "repairs": self.repairs,
+                "clarifier_coverage": self.clarifier_coverage.report() if self.clarifier_coverage else None
             }
 
             if progress_callback:
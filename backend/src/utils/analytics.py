@@ -0,0 +1,283 @@
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.utils.projections import normalize_pipeline_data, select_path
+
+# --- Unit tables ---
+# Working-calendar conversion of duration units into weeks
+_WEEKS_PER_UNIT = {
+    "hour": 1 / 40, "hr": 1 / 40,
+    "day": 1 / 5,
+    "week": 1.0, "wk": 1.0,
+    "sprint": 2.0,
+    "month": 52 / 12, "mo": 52 / 12,
+    "quarter": 13.0,
+    "year": 52.0, "yr": 52.0,
+}
+_DURATION_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(?:(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*"
+    r"(hours?|hrs?|days?|weeks?|wks?|sprints?|months?|mos?|quarters?|years?|yrs?)\b",
+    re.IGNORECASE,
+)
+_COST_PATTERN = re.compile(
+    r"([$€£]\s*)?(\d+(?:\.\d+)?)\s*([km])?\b(?:\s*(?:-|–|to)\s*[$€£]?\s*(\d+(?:\.\d+)?)\s*([km])?\b)?"
+    r"(\s*(?:usd|eur|gbp|dollars?|euros?)\b)?",
+    re.IGNORECASE,
+)
+_COST_MULTIPLIER = {None: 1.0, "k": 1e3, "m": 1e6}
+_SCORE_WORDS = {"very high": 0.9, "high": 0.8, "medium": 0.5, "moderate": 0.5, "low": 0.2, "very low": 0.1}
+
+RISK_LEVELS = ["low", "medium", "high", "critical"]
+
+_FREE_PATTERN = re.compile(r"\bfree\b", re.IGNORECASE)
+_YEARLY_PATTERN = re.compile(r"/\s*(?:yr|year)|\bper year\b|\byearly\b|\bannual", re.IGNORECASE)
+_LIST_SPLIT = re.compile(r"[;,/]|\band\b")
+
+# --- Field parsers ---
+def parse_duration_weeks(value: Any) -> float:
+    """
+    Parse a free-form duration ("2 weeks", "1-2 months", "10 days") into weeks.
+
+    Ranges use their midpoint; a bare number is taken as weeks.
+    Returns NaN when nothing can be parsed.
+    """
+    if isinstance(value, bool) or value is None:
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value)
+    match = _DURATION_PATTERN.search(text)
+    if match:
+        low, high, unit = match.groups()
+        amount = (float(low) + float(high)) / 2 if high else float(low)
+        return amount * _WEEKS_PER_UNIT.get(unit.lower().rstrip("s"), 1.0)
+    number = re.search(r"\d+(?:\.\d+)?", text)
+    return float(number.group()) if number else float("nan")
+
+def parse_cost(value: Any) -> float:
+    """
+    Parse a free-form cost ("$5,000", "5k USD", "$10-20k") into a float.
+
+    Amounts marked with a currency symbol or code win over other numbers
+    ("2 developers, $8000" is 8000). Ranges use their midpoint. Returns NaN
+    when nothing can be parsed.
+    """
+    if isinstance(value, bool) or value is None:
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value)
+    matches = list(_COST_PATTERN.finditer(str(value).replace(",", "")))
+    if not matches:
+        return float("nan")
+    match = next((m for m in matches if m.group(1) or m.group(6)), matches[0])
+    _, low, low_suffix, high, high_suffix, _ = match.groups()
+    low_multiplier = _COST_MULTIPLIER[(low_suffix or "").lower() or None]
+    if not high:
+        return float(low) * low_multiplier
+    high_amount = float(high) * _COST_MULTIPLIER[(high_suffix or low_suffix or "").lower() or None]
+    # "$10-20k": the upper bound's suffix also applies to the lower bound, unless
+    # that would put it above the upper bound ("$500 - 2k" is 500 to 2000)
+    if not low_suffix and high_suffix and float(low) * _COST_MULTIPLIER[high_suffix.lower()] <= high_amount:
+        low_multiplier = _COST_MULTIPLIER[high_suffix.lower()]
+    return (float(low) * low_multiplier + high_amount) / 2
+
+def parse_score(value: Any) -> float:
+    """
+    Parse a 0-1 score from a float, a percentage, a 0-10 rating or a word ("high").
+
+    Returns NaN when nothing can be parsed.
+    """
+    if isinstance(value, bool) or value is None:
+        return float("nan")
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in _SCORE_WORDS:
+            return _SCORE_WORDS[text]
+        number = re.search(r"\d+(?:\.\d+)?", text)
+        if not number:
+            return float("nan")
+        score = float(number.group())
+        if "%" in text:
+            return min(score / 100, 1.0)
+    elif isinstance(value, (int, float)):
+        score = float(value)
+    else:
+        return float("nan")
+    if score > 10:
+        score /= 100
+    elif score > 1:
+        score /= 10
+    return min(max(score, 0.0), 1.0)
+
+def parse_monthly_price(value: Any) -> float:
+    """
+    Parse competitor pricing ("$10/mo", "$99/year", "Free", "Freemium, $5/mo") into a monthly price.
+
+    The first amount wins; yearly prices are divided by 12. Returns NaN when unknown.
+    """
+    if value is None or isinstance(value, bool):
+        return float("nan")
+    text = str(value)
+    price = parse_cost(text)
+    if np.isnan(price):
+        return 0.0 if _FREE_PATTERN.search(text) else float("nan")
+    return price / 12 if _YEARLY_PATTERN.search(text) else price
+
+def _count_items(value: Any) -> int:
+    """Number of items in a list or a comma/semicolon separated string"""
+    if isinstance(value, list):
+        return len([v for v in value if v not in (None, "")])
+    if value in (None, ""):
+        return 0
+    return len([part for part in _LIST_SPLIT.split(str(value)) if part.strip()])
+
+def _as_rows(value: Any) -> List[Dict[str, Any]]:
+    if isinstance(value, dict):
+        value = [value]
+    return [row for row in value or [] if isinstance(row, dict)]
+
+def _round(value: float, digits: int = 2) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+# --- Analytics ---
+def feature_metrics(features: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals and weighted goal scores over product features"""
+    features = _as_rows(features)
+    costs = np.array([parse_cost(f.get("cost_estimate")) for f in features], dtype=float)
+    weeks = np.array([parse_duration_weeks(f.get("development_time")) for f in features], dtype=float)
+    goals = np.array([parse_score(f.get("goal_oriented")) for f in features], dtype=float)
+
+    weighted = ~np.isnan(costs) & ~np.isnan(goals) & (costs > 0)
+    cost_weighted_goal = np.sum(goals[weighted] * costs[weighted]) / np.sum(costs[weighted]) if weighted.any() else float("nan")
+
+    return {
+        "count": len(features),
+        "total_cost": _round(np.nansum(costs)) if features else None,
+        "total_dev_weeks": _round(np.nansum(weeks), 1) if features else None,
+        "longest_feature_weeks": _round(np.nanmax(weeks), 1) if (~np.isnan(weeks)).any() else None,
+        "avg_goal_score": _round(np.nanmean(goals)) if (~np.isnan(goals)).any() else None,
+        "cost_weighted_goal_score": _round(cost_weighted_goal),
+        "unparsed": int(np.isnan(costs).sum() + np.isnan(weeks).sum() + np.isnan(goals).sum()),
+    }
+
+def timeline_metrics(plan: Iterable[Dict[str, Any]], features: Iterable[Dict[str, Any]] = ()) -> Dict[str, Any]:
+    """
+    Critical-path timeline in weeks.
+
+    Implementation plan phases run back to back, so the critical path is their sum.
+    Without a plan, features are assumed to be built one after another.
+    """
+    phases = _as_rows(plan)
+    weeks = np.array([parse_duration_weeks(p.get("duration")) for p in phases], dtype=float)
+    ends = np.cumsum(np.nan_to_num(weeks))
+    starts = ends - np.nan_to_num(weeks)
+
+    if phases:
+        critical_path = float(ends[-1])
+        source = "implementation_plan"
+    else:
+        critical_path = float(np.nansum([parse_duration_weeks(f.get("development_time")) for f in _as_rows(features)] or [0.0]))
+        source = "features"
+
+    return {
+        "critical_path_weeks": round(critical_path, 1),
+        "critical_path_months": round(critical_path * 12 / 52, 1),
+        "source": source,
+        "phases": [
+            {"phase": str(p.get("phase", "")), "start_week": round(float(s), 1), "end_week": round(float(e), 1)}
+            for p, s, e in zip(phases, starts, ends)
+        ],
+    }
+
+def risk_histogram(risk_features: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Count of assessed features per risk level"""
+    rows = _as_rows(risk_features)
+    counts = Counter(str(row.get("risk_level", "")).strip().lower() or "unknown" for row in rows)
+    histogram = {level: counts.pop(level, 0) for level in RISK_LEVELS}
+    histogram.update(counts)
+    return {
+        "levels": histogram,
+        "potential_risks": sum(1 for row in rows if str(row.get("is_potential_risk", "")).lower() in ("true", "yes", "1")),
+        "assessed": len(rows),
+    }
+
+def customer_graph(market_analysis: Dict[str, Any], features: Iterable[Dict[str, Any]] = (),
+                   product_name: str = "") -> Dict[str, Any]:
+    """
+    Build CustomerAnalysis.graph data from the competitor table and product features.
+
+    One row per competitor with its monthly price and pros/cons counts, plus a row
+    for the product itself with its number of planned features under "features"
+    (its pros/cons are not assessed, so they are left empty).
+
+    Args:
+        market_analysis: Customer agent market_analysis block
+        features: Product features
+        product_name: Product name for the product row
+    Returns:
+        Dict matching GraphData ('type' and 'data_in_table')
+    """
+    competitors = _as_rows((market_analysis or {}).get("competitors"))
+    prices = np.array([parse_monthly_price(c.get("pricing")) for c in competitors], dtype=float)
+
+    rows = [
+        {
+            "name": str(competitor.get("name", "")),
+            "monthly_price": _round(price),
+            "pros": _count_items(competitor.get("pros")),
+            "cons": _count_items(competitor.get("cons")),
+        }
+        for competitor, price in zip(competitors, prices)
+    ]
+    features = _as_rows(features)
+    if product_name or features:
+        rows.append({
+            "name": product_name or "This product",
+            "monthly_price": None,
+            "pros": None,
+            "cons": None,
+            "features": len(features),
+            "is_product": True,
+        })
+    return {"type": "bar", "data_in_table": rows}
+
+def attach_customer_graph(customer_data: Dict[str, Any], product: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Replace any model-written graph in parsed customer output with the locally computed one"""
+    if not isinstance(customer_data, dict):
+        return customer_data
+    analysis = customer_data.get("market_analysis")
+    target = analysis if isinstance(analysis, dict) else customer_data
+    product = product if isinstance(product, dict) else {}
+    target["graph"] = customer_graph(target, product.get("features") or [], str(product.get("name", "")))
+    return customer_data
+
+def compute_analytics(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute exact numeric figures from the collected pipeline data.
+
+    Args:
+        data: Collected pipeline data (same shape as ProductConversationManager.final_data)
+    Returns:
+        Dict with 'features', 'timeline', 'risk' and 'viability_score' blocks;
+        blocks whose source stage has not run yet are omitted
+    """
+    data = normalize_pipeline_data(data)
+    features = select_path(data, "product.features") or []
+    plan = select_path(data, "engineer.analysis.implementation_plan")
+    risk_features = select_path(data, "risk.assessment.features")
+
+    analytics: Dict[str, Any] = {}
+    if features:
+        analytics["features"] = feature_metrics(features)
+    if features or plan:
+        analytics["timeline"] = timeline_metrics(plan or [], features)
+    if risk_features:
+        analytics["risk"] = risk_histogram(risk_features)
+
+    viability = parse_score(select_path(data, "customer.market_analysis.verdict.viability_score"))
+    if not np.isnan(viability):
+        analytics["viability_score"] = round(viability, 2)
+    return analytics
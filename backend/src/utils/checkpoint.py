@@ -0,0 +1,527 @@
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.config.env import (
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_DB,
+    CHECKPOINT_DB_TTL_SECONDS,
+    CHECKPOINT_KEEP_LAST,
+    CHECKPOINT_MAX_MB,
+    CHECKPOINT_MAX_THREADS,
+    CHECKPOINT_TTL_SECONDS,
+)
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    In-memory checkpointer with LRU + TTL eviction and a max-bytes cap.
+
+    Threads are tracked in least-recently-used order together with the size of
+    their serialized checkpoints, blobs and writes. After every write the oldest
+    threads are evicted while the saver holds more than max_threads threads or
+    max_bytes bytes, and any thread idle for longer than ttl_seconds is dropped.
+    """
+
+    def __init__(self, max_threads: int = CHECKPOINT_MAX_THREADS, ttl_seconds: float = CHECKPOINT_TTL_SECONDS,
+                 max_bytes: int = int(CHECKPOINT_MAX_MB * 1024 * 1024), **kwargs: Any):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._guard = threading.RLock()
+        # thread_id -> {"last_access", "bytes", "blob_keys", "write_keys"}
+        self._threads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def _entry(self, thread_id: str) -> Dict[str, Any]:
+        entry = self._threads.get(thread_id)
+        if entry is None:
+            entry = self._threads[thread_id] = {"last_access": 0.0, "bytes": 0, "blob_keys": set(), "write_keys": {}}
+        entry["last_access"] = time.monotonic()
+        self._threads.move_to_end(thread_id)
+        return entry
+
+    def _add_bytes(self, entry: Dict[str, Any], size: int) -> None:
+        entry["bytes"] += size
+        self._bytes += size
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        now = time.monotonic()
+        while self._threads:
+            thread_id, entry = next(iter(self._threads.items()))
+            over_limit = len(self._threads) > self.max_threads or self._bytes > self.max_bytes
+            expired = self.ttl_seconds and now - entry["last_access"] > self.ttl_seconds
+            if not (over_limit or expired) or thread_id == keep:
+                break
+            self._delete(thread_id)
+            self.evictions += 1
+
+    def _delete(self, thread_id: str) -> None:
+        entry = self._threads.pop(thread_id, None)
+        self.storage.pop(thread_id, None)
+        if entry is None:
+            return
+        for key in entry["blob_keys"]:
+            self.blobs.pop(key, None)
+        for key in entry["write_keys"]:
+            self.writes.pop(key, None)
+        self._bytes -= entry["bytes"]
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._guard:
+            result = super().get_tuple(config)
+            thread_id = config["configurable"]["thread_id"]
+            if result is not None or thread_id in self.storage:
+                self._entry(thread_id)
+            return result
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        with self._guard:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            entry = self._entry(thread_id)
+
+            size = 0
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                if key not in entry["blob_keys"]:
+                    entry["blob_keys"].add(key)
+                    size += len(self.blobs[key][1])
+            saved_checkpoint, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            size += len(saved_checkpoint[1]) + len(saved_metadata[1])
+            self._add_bytes(entry, size)
+            self._evict(keep=thread_id)
+            return next_config
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        with self._guard:
+            super().put_writes(config, writes, task_id, task_path)
+            thread_id = config["configurable"]["thread_id"]
+            outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+            entry = self._entry(thread_id)
+            size = sum(len(value[2][1]) for value in self.writes.get(outer_key, {}).values())
+            self._add_bytes(entry, size - entry["write_keys"].get(outer_key, 0))
+            entry["write_keys"][outer_key] = size
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._guard:
+            if thread_id in self._threads:
+                self._delete(thread_id)
+            else:
+                super().delete_thread(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._guard:
+            return {
+                "backend": "memory",
+                "threads": len(self._threads),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+# Serialized values above this size are zlib-compressed before hitting disk
+_COMPRESS_MIN_BYTES = 512
+_ZLIB_SUFFIX = "+zlib"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """
+    SQLite-backed checkpointer so conversations survive restarts and can be
+    resumed by any worker pointing at the same database file.
+
+    The database runs in WAL mode so readers in other processes don't block
+    writers. Values are serialized with the saver's serde (msgpack) and
+    zlib-compressed when large. Channel values are stored once per version,
+    only the newest keep_last checkpoints of each thread are kept, threads
+    idle for longer than ttl_seconds are deleted, and the least recently
+    updated threads are evicted while the live data exceeds max_bytes.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DB, ttl_seconds: float = CHECKPOINT_DB_TTL_SECONDS,
+                 max_bytes: int = int(CHECKPOINT_MAX_MB * 1024 * 1024), keep_last: int = CHECKPOINT_KEEP_LAST,
+                 cleanup_interval: float = 60.0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.keep_last = max(1, keep_last)
+        self.cleanup_interval = cleanup_interval
+        self.evictions = 0
+        self._last_cleanup = 0.0
+        self._guard = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        # auto_vacuum only takes effect on a fresh database, before any table exists
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.executescript(_SCHEMA)
+
+    # --- serialization ---
+
+    def _dump(self, value: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= _COMPRESS_MIN_BYTES:
+            return type_ + _ZLIB_SUFFIX, zlib.compress(data)
+        return type_, data
+
+    def _load(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(_ZLIB_SUFFIX):
+            type_, data = type_[:-len(_ZLIB_SUFFIX)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # --- reads ---
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            row = self.conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is not None and row[0] != "empty":
+                values[channel] = self._load(row[0], row[1])
+        return values
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list:
+        rows = self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self._load(type_, value)) for task_id, channel, type_, value in rows]
+
+    def _to_tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        saved: Checkpoint = self._load(type_, checkpoint)
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint={**saved, "channel_values": self._load_blobs(thread_id, checkpoint_ns,
+                                                                    saved["channel_versions"])},
+            metadata=self._load(metadata_type, metadata),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                  "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                 "metadata_type, metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?")
+        params: tuple = (thread_id, checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._guard:
+            row = self.conn.execute(query, params).fetchone()
+            return self._to_tuple(row) if row is not None else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                 "metadata_type, metadata FROM checkpoints")
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._guard:
+            rows = self.conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self._load(row[6], row[7])
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                results.append(self._to_tuple(row))
+        yield from results
+
+    # --- writes ---
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        saved = checkpoint.copy()
+        values: Dict[str, Any] = saved.pop("channel_values")  # type: ignore[misc]
+        blob_rows = [
+            (thread_id, checkpoint_ns, channel, str(version),
+             *(self._dump(values[channel]) if channel in values else ("empty", b"")))
+            for channel, version in new_versions.items()
+        ]
+        checkpoint_type, checkpoint_blob = self._dump(saved)
+        metadata_type, metadata_blob = self._dump(get_checkpoint_metadata(config, metadata))
+
+        with self._guard:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                     checkpoint_type, checkpoint_blob, metadata_type, metadata_blob),
+                )
+                self._touch(thread_id)
+                self._prune_history(thread_id, checkpoint_ns)
+            self._maybe_cleanup(keep=thread_id)
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special channels (errors, interrupts, ...) overwrite; regular writes are kept from the first attempt
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel,
+             *self._dump(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._guard:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._touch(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._guard:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self._delete(thread_id)
+
+    # --- bounds ---
+
+    def _touch(self, thread_id: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+
+    def _delete(self, thread_id: str) -> None:
+        for table in ("checkpoints", "blobs", "writes", "threads"):
+            self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def _prune_history(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Keep the newest keep_last checkpoints of a thread and the blobs they reference"""
+        stale = [row[0] for row in self.conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last),
+        )]
+        if not stale:
+            return
+        for checkpoint_id in stale:
+            for table in ("checkpoints", "writes"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+
+        live = set()
+        for type_, data in self.conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns),
+        ):
+            live.update((channel, str(version)) for channel, version in self._load(type_, data)["channel_versions"].items())
+        for channel, version in self.conn.execute(
+            "SELECT channel, version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns),
+        ).fetchall():
+            if (channel, version) not in live:
+                self.conn.execute(
+                    "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (thread_id, checkpoint_ns, channel, version),
+                )
+
+    def _live_bytes(self) -> int:
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _maybe_cleanup(self, keep: Optional[str] = None) -> None:
+        now = time.time()
+        if now - self._last_cleanup >= self.cleanup_interval:
+            self.cleanup(keep=keep)
+
+    def cleanup(self, keep: Optional[str] = None) -> int:
+        """
+        Delete expired threads, then evict the least recently updated threads until
+        the live data fits in max_bytes.
+
+        Args:
+            keep: Thread that must survive the size-based eviction (the one being written)
+        Returns:
+            Number of threads deleted
+        """
+        with self._guard:
+            self._last_cleanup = time.time()
+            deleted = 0
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                if self.ttl_seconds:
+                    expired = [row[0] for row in self.conn.execute(
+                        "SELECT thread_id FROM threads WHERE updated_at < ? AND thread_id IS NOT ?",
+                        (self._last_cleanup - self.ttl_seconds, keep),
+                    )]
+                    for thread_id in expired:
+                        self._delete(thread_id)
+                    deleted += len(expired)
+
+                while self.max_bytes and self._live_bytes() > self.max_bytes:
+                    row = self.conn.execute(
+                        "SELECT thread_id FROM threads WHERE thread_id IS NOT ? ORDER BY updated_at LIMIT 1", (keep,),
+                    ).fetchone()
+                    if row is None:
+                        break
+                    self._delete(row[0])
+                    deleted += 1
+            if deleted:
+                self.evictions += deleted
+                self.conn.execute("PRAGMA incremental_vacuum")
+            return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._guard:
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "threads": self.conn.execute("SELECT COUNT(*) FROM threads").fetchone()[0],
+                "bytes": self._live_bytes(),
+                "evictions": self.evictions,
+                "keep_last": self.keep_last,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def close(self) -> None:
+        with self._guard:
+            self.conn.close()
+
+    # --- async wrappers (the agents only run synchronously) ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        return InMemorySaver.get_next_version(self, current, channel)
+
+_shared_checkpointer: Optional[BaseCheckpointSaver] = None
+_shared_lock = threading.Lock()
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """
+    Process-wide checkpointer shared by all agent factories.
+
+    CHECKPOINT_BACKEND=sqlite persists conversations to CHECKPOINT_DB so they
+    can be resumed after a restart or from another worker; the default keeps
+    them in a bounded in-memory saver.
+    """
+    global _shared_checkpointer
+    if _shared_checkpointer is None:
+        with _shared_lock:
+            if _shared_checkpointer is None:
+                if CHECKPOINT_BACKEND == "sqlite":
+                    _shared_checkpointer = SqliteCheckpointSaver()
+                else:
+                    _shared_checkpointer = BoundedMemorySaver()
+    return _shared_checkpointer
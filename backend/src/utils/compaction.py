@@ -0,0 +1,123 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from src.utils import toon
+from src.utils.tokenizer import count_tokens_batch, truncate_to_tokens
+from src.utils.token_tracker import estimate_tokens
+
+# Per-answer message written by the interactive clarifier loop
+_ANSWER_PATTERN = re.compile(r"^User answered: '(.*)' -> '(.*)'$", re.DOTALL)
+# Initial clarifier message written by ProductConversationManager
+_IDEA_PATTERN = re.compile(r"based on this: (.*?)\.?\s*Only ask \d+ critical questions", re.DOTALL)
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    # Multi-part content: keep only the text parts
+    return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+def extract_requirements(messages: List[BaseMessage]) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Pull the original idea and every answered question out of a clarifier history.
+
+    Understands both the per-answer messages of the interactive loop and the
+    batched TOON answer table of the non-interactive mode.
+
+    Args:
+        messages: Clarifier message history
+    Returns:
+        Tuple of (idea text, list of question/answer pairs)
+    """
+    idea = ""
+    qa_pairs: List[Dict[str, str]] = []
+
+    for message in messages:
+        if not isinstance(message, HumanMessage):
+            continue
+        text = _message_text(message).strip()
+
+        answer_match = _ANSWER_PATTERN.match(text)
+        if answer_match:
+            qa_pairs.append({"question": answer_match.group(1), "answer": answer_match.group(2)})
+            continue
+
+        if "answers:" in text:
+            parsed = toon.parse_response(text[text.find("```toon"):] if "```toon" in text else text)
+            answers = parsed.get("answers") if isinstance(parsed, dict) else None
+            if isinstance(answers, list):
+                for row in answers:
+                    if isinstance(row, dict) and row.get("question"):
+                        qa_pairs.append({"question": str(row["question"]), "answer": str(row.get("answer", ""))})
+                continue
+
+        if not idea:
+            idea_match = _IDEA_PATTERN.search(text)
+            idea = idea_match.group(1).strip() if idea_match else text
+
+    return idea, qa_pairs
+
+def build_requirements_record(idea: str, qa_pairs: List[Dict[str, str]], max_answer_chars: Optional[int] = None) -> str:
+    """
+    Render the idea and answered questions as a compact TOON requirements record.
+
+    Args:
+        idea: Original product idea
+        qa_pairs: Question/answer pairs
+        max_answer_chars: Optional cap on the length of each answer
+    Returns:
+        TOON string with an idea field and a question | answer table
+    """
+    lines = ["requirements:", f"  idea: {' '.join(idea.split())}"]
+    rows = [pair for pair in qa_pairs if pair.get("answer", "").strip()]
+    if rows:
+        lines.append("  answers:")
+        lines.append("    question | answer")
+        for pair in rows:
+            question = " ".join(pair["question"].split()).replace("|", "/")
+            answer = " ".join(pair["answer"].split()).replace("|", "/")
+            if max_answer_chars and len(answer) > max_answer_chars:
+                answer = answer[:max_answer_chars].rstrip() + "..."
+            lines.append(f"    {question} | {answer}")
+    return "\n".join(lines)
+
+def compact_clarifier_history(messages: List[BaseMessage], budget_tokens: Optional[int] = None) -> Tuple[HumanMessage, Dict[str, Any]]:
+    """
+    Fold a clarifier history into a single requirements message within a token budget.
+
+    Answers are shortened first and the idea text last, so the question -> answer
+    table survives even under a tight budget.
+
+    Args:
+        messages: Clarifier message history
+        budget_tokens: Maximum estimated tokens for the compacted message (None = no cap)
+    Returns:
+        Tuple of (compacted HumanMessage, report with original/compacted token counts)
+    """
+    idea, qa_pairs = extract_requirements(messages)
+    record = build_requirements_record(idea, qa_pairs)
+
+    if budget_tokens:
+        max_answer_chars = 400
+        while estimate_tokens(record) > budget_tokens and max_answer_chars > 40:
+            max_answer_chars //= 2
+            record = build_requirements_record(idea, qa_pairs, max_answer_chars)
+
+        overflow_tokens = estimate_tokens(record) - budget_tokens
+        if overflow_tokens > 0:
+            idea_tokens = max(20, estimate_tokens(idea) - overflow_tokens)
+            shortened = truncate_to_tokens(idea, idea_tokens)
+            if len(shortened) < len(idea):
+                idea = shortened.rstrip() + "..."
+                record = build_requirements_record(idea, qa_pairs, max_answer_chars)
+
+    original_tokens = sum(count_tokens_batch([_message_text(m) for m in messages]))
+    compacted_tokens = estimate_tokens(record)
+    report = {
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "saved_tokens": original_tokens - compacted_tokens,
+        "answers": len(qa_pairs),
+    }
+    return HumanMessage(content=record), report
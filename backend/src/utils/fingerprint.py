@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Dict, Optional
+
+def generation_settings(model) -> Dict[str, Any]:
+    """
+    Model name, temperature and seed of a (possibly wrapped) chat model.
+
+    Unwraps runnable bindings, AdaptiveMaxTokensModel and RoutedChatModel.
+    """
+    while True:
+        if hasattr(model, "bound"):
+            model = model.bound
+        elif hasattr(model, "endpoints"):
+            model = model.endpoints[0]
+        elif hasattr(model, "model") and not isinstance(model.model, str):
+            model = model.model
+        else:
+            break
+    return {
+        "model": getattr(model, "model_name", None),
+        "temperature": getattr(model, "temperature", None),
+        "seed": getattr(model, "seed", None),
+    }
+
+def is_deterministic(settings: Dict[str, Any]) -> bool:
+    """Whether outputs generated with these settings are reproducible (temperature 0 and a seed)"""
+    return settings.get("temperature") == 0 and settings.get("seed") is not None
+
+def model_fingerprint(message, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Fingerprint of the model that produced a response message.
+
+    Args:
+        message: AIMessage returned by the agent
+        settings: generation_settings() of the model, if known
+    Returns:
+        Dict with model, system_fingerprint, temperature, seed and deterministic
+    """
+    metadata = getattr(message, "response_metadata", {}) or {}
+    settings = settings or {}
+    fingerprint = {
+        "model": metadata.get("model_name") or settings.get("model"),
+        "system_fingerprint": metadata.get("system_fingerprint") or None,
+        "temperature": settings.get("temperature"),
+        "seed": settings.get("seed"),
+    }
+    fingerprint["deterministic"] = is_deterministic(fingerprint)
+    return fingerprint
+
+class FingerprintRegistry:
+    """
+    Latest system_fingerprint seen per model.
+
+    A new fingerprint means the provider changed the backend, so results stored
+    with the old one may no longer be reproducible; changes are counted and logged.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latest: Dict[str, str] = {}
+        self.changes = 0
+
+    def observe(self, fingerprint: Dict[str, Any]) -> None:
+        model, system_fingerprint = fingerprint.get("model"), fingerprint.get("system_fingerprint")
+        if not model or not system_fingerprint:
+            return
+        with self._lock:
+            previous = self.latest.get(model)
+            if previous and previous != system_fingerprint:
+                self.changes += 1
+                print(f"Model '{model}' fingerprint changed: {previous} -> {system_fingerprint}")
+            self.latest[model] = system_fingerprint
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"models": dict(self.latest), "changes": self.changes}
+
+fingerprint_registry = FingerprintRegistry()
@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import Any, Callable, Optional, List, Dict, Tuple
 import json
 import re
 from pydantic import BaseModel
+from langchain_core.messages import HumanMessage, BaseMessage
 
 from src.utils import toon
 from src.utils.token_tracker import token_tracker
@@ -39,3 +40,295 @@ def get_user_input(question: str) -> str:
     print(f"Question: {question}")
     user_answer = input("Your answer: ")
     return user_answer
+
+DEFAULT_ANSWER = "No specific preference, use reasonable assumptions."
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "be", "do", "does", "what", "which", "who",
+    "how", "why", "when", "where", "will", "would", "should", "could", "can", "you",
+    "your", "of", "for", "to", "in", "on", "with", "and", "or", "any", "there", "it",
+    "this", "that", "app", "product", "have", "has", "need", "want", "about",
+}
+
+def _content_words(text: str) -> set:
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in _STOPWORDS and len(w) > 2}
+
+# Question topics -> (words that mark a question as being about the topic,
+# pattern that marks an idea sentence as answering it)
+_TOPIC_HINTS = {
+    "audience": ({"audience", "users", "user", "customers", "customer", "target", "demographic", "persona"},
+                 r"\bfor\s+\w+|\b(users?|customers?|students?|teams?|people|parents|kids|businesses|professionals)\b"),
+    "platform": ({"platform", "platforms", "device", "devices", "mobile", "web", "desktop", "ios", "android"},
+                 r"\b(ios|android|iphone|web|browser|mobile|desktop|mac|windows|tablet)\b"),
+    "monetization": ({"monetize", "monetization", "money", "revenue", "pricing", "price", "business", "subscription", "pay"},
+                     r"\b(subscriptions?|freemium|ads|advertis\w*|paid|pricing|price|revenue|commission|\$\d+)"),
+    "features": ({"features", "feature", "functionality", "functionalities", "capabilities", "core"},
+                 r"\b(track\w*|features?|allows?|lets?|supports?|includ\w*|with)\b"),
+    "constraints": ({"constraints", "constraint", "budget", "timeline", "deadline", "compliance", "limitations"},
+                    r"\b(budget|deadline|weeks?|months?|gdpr|hipaa|offline|privacy|secure)\b"),
+}
+
+# Markers that appear in questions about any topic ("How will users pay?")
+_GENERIC_MARKERS = {"users", "user", "customers", "customer"}
+
+def question_topic(question: str) -> Optional[str]:
+    """
+    The single requirement slot a question asks about.
+
+    "Who ..." questions are about the audience; otherwise the first topic marker in
+    the question wins, so "What features do users need?" is about features, not audience.
+    Words like "users" only make it an audience question when no other topic is named.
+    """
+    words = re.findall(r"[a-z0-9]+", question.lower())
+    if words and words[0] == "who":
+        return "audience"
+    generic = None
+    for word in words:
+        for topic, (markers, _) in _TOPIC_HINTS.items():
+            if word in markers:
+                if word not in _GENERIC_MARKERS:
+                    return topic
+                generic = generic or topic
+    return generic
+
+# Requirement slots the clarifier must cover before the product stage
+REQUIRED_SLOTS = ["audience", "features", "platform", "monetization", "constraints"]
+
+_AUDIENCE_NOUNS = (r"(users?|customers?|students?|teams?|people|parents|kids|children|families|businesses|"
+                   r"professionals|owners|developers|freelancers|creators|patients|seniors|"
+                   r"companies|startups|agencies|clinics|schools|teachers|nurses|doctors|athletes|gamers)")
+# Capabilities counted towards the features slot (matched on the word stem)
+_FEATURE_TERMS = (
+    "track", "log", "schedul", "remind", "notif", "alert", "report", "dashboard", "chart", "analytic",
+    "shar", "chat", "messag", "comment", "calendar", "book", "pay", "checkout", "search",
+    "filter", "sync", "export", "import", "scan", "recommend", "leaderboard", "streak", "badge",
+    "map", "upload", "stream", "record", "rating", "review", "vote", "translat", "invoice",
+)
+# A slot only counts as covered by the idea when the idea states it with real
+# content; otherwise the user still gets asked
+_IDEA_SLOT_PATTERNS = {
+    # A qualified audience ("for remote software teams", "aimed at parents of toddlers"),
+    # not just a bare "for teams" / "users"
+    "audience": r"\b(aimed at|designed for|built for|targeting|target (audience|users|market) (is|are))\s+\w+"
+                r"|\bfor\s+(?!(a|an|the|their|your|its)\b)[a-z-]+\s+([a-z-]+\s+){0,2}" + _AUDIENCE_NOUNS + r"\b",
+    "platform": _TOPIC_HINTS["platform"][1],
+    # A concrete pricing model or price, not just "paid"
+    "monetization": r"\b(subscriptions?|freemium|ad-supported|advertis\w*|commission|in-app purchases?|"
+                    r"one-time (fee|purchase)|licens(e|ing) fees?|per (month|year|user|seat))\b|\$\d+",
+    "constraints": r"\b(budget|deadline|launch (in|by)|within \d+ (weeks?|months?)|gdpr|hipaa|coppa|compliance|offline)\b",
+}
+# Distinct capabilities the idea has to name before the features slot counts as covered
+MIN_IDEA_FEATURES = 3
+
+def idea_features(idea: str) -> List[str]:
+    """Distinct capability terms named in the idea text"""
+    found = []
+    for word in re.findall(r"[a-z]+", (idea or "").lower()):
+        for term in _FEATURE_TERMS:
+            if word.startswith(term) and term not in found:
+                found.append(term)
+    return found
+
+# Answers that do not fill a slot
+_NON_ANSWERS = re.compile(r"^\s*(n/?a|none|no idea|not sure|don'?t know|idk|skip|-)?\s*$", re.IGNORECASE)
+
+class ClarifierCoverage:
+    """
+    Local tracker of which requirement slots the idea and answers already cover.
+
+    Lets the clarifier loop skip questions the idea already answers and stop
+    once enough slots are covered, instead of waiting for the model's "done".
+    """
+
+    def __init__(self, idea: str = "", required: Optional[List[str]] = None, threshold: Optional[float] = None):
+        from src.config.model_limits import get_agent_limit
+
+        self.idea = idea or ""
+        self.required = required or REQUIRED_SLOTS
+        self.threshold = threshold if threshold is not None else get_agent_limit("clarifier", "coverage_threshold", 0.8)
+        # slot -> where it was covered ("idea" or the answered question)
+        self.filled: Dict[str, str] = {}
+        for topic, pattern in _IDEA_SLOT_PATTERNS.items():
+            if topic in self.required and re.search(pattern, self.idea, re.IGNORECASE):
+                self.filled[topic] = "idea"
+        if "features" in self.required and len(idea_features(self.idea)) >= MIN_IDEA_FEATURES:
+            self.filled["features"] = "idea"
+        self.skipped: List[str] = []
+
+    def answered_by_idea(self, question: str) -> bool:
+        """True if the slot the question asks about is already covered by the idea"""
+        topic = question_topic(question)
+        return topic is not None and self.filled.get(topic) == "idea"
+
+    def record(self, question: str, answer: str) -> None:
+        """Mark the question's slot as covered if the answer is substantive"""
+        if not answer or answer == DEFAULT_ANSWER or _NON_ANSWERS.match(answer):
+            return
+        topic = question_topic(question)
+        if topic:
+            self.filled.setdefault(topic, question)
+
+    def skip(self, question: str) -> str:
+        """Answer a question from the idea instead of asking the user"""
+        self.skipped.append(question)
+        return auto_answer_from_idea(question, self.idea) or DEFAULT_ANSWER
+
+    @property
+    def coverage(self) -> float:
+        return sum(1 for slot in self.required if slot in self.filled) / len(self.required)
+
+    @property
+    def missing(self) -> List[str]:
+        return [slot for slot in self.required if slot not in self.filled]
+
+    def sufficient(self) -> bool:
+        return self.coverage >= self.threshold
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "coverage": round(self.coverage, 2),
+            "missing": self.missing,
+            "skipped_questions": len(self.skipped),
+        }
+
+def match_answer(question: str, answers, index: int = 0) -> Optional[str]:
+    """
+    Find a pre-supplied answer for a clarifier question.
+
+    Args:
+        question: Question asked by the clarifier
+        answers: Dict of question -> answer, or a list of answers in question order
+        index: Position of the question among those asked so far (used for list answers)
+    Returns:
+        The matching answer, or None if nothing matches
+    """
+    if not answers:
+        return None
+    if isinstance(answers, list):
+        return str(answers[index]) if index < len(answers) else None
+
+    normalized = question.strip().lower()
+    for key, value in answers.items():
+        if key.strip().lower() == normalized:
+            return str(value)
+
+    # Fall back to the answer whose question shares the most content words
+    question_words = _content_words(question)
+    best_answer, best_overlap = None, 0
+    for key, value in answers.items():
+        overlap = len(question_words & _content_words(key))
+        if overlap > best_overlap:
+            best_answer, best_overlap = value, overlap
+    return str(best_answer) if best_answer is not None else None
+
+def auto_answer_from_idea(question: str, idea: str) -> Optional[str]:
+    """
+    Answer a clarifier question from the original idea text without an LLM call.
+
+    Picks the idea sentence sharing the most content words with the question,
+    weighting sentences that mention the question's topic (audience, platform, ...).
+    """
+    if not idea:
+        return None
+    question_words = _content_words(question)
+    topic = question_topic(question)
+    topic_patterns = [_TOPIC_HINTS[topic][1]] if topic else []
+    best_sentence, best_overlap = None, 0
+    for sentence in re.split(r"(?<=[.!?])\s+|\n+", idea):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        overlap = len(question_words & _content_words(sentence))
+        overlap += 2 * sum(1 for pattern in topic_patterns if re.search(pattern, sentence, re.IGNORECASE))
+        if overlap > best_overlap:
+            best_sentence, best_overlap = sentence, overlap
+    return best_sentence
+
+def format_batched_answers(qa_pairs: List[Dict[str, str]], missing: Optional[List[str]] = None) -> str:
+    """Format answered questions as a single TOON message for the clarifier."""
+    lines = ["User answered all questions:", "", "```toon", "answers:", "  question | answer"]
+    for pair in qa_pairs:
+        question = pair["question"].replace("|", "/").replace("\n", " ")
+        answer = pair["answer"].replace("|", "/").replace("\n", " ")
+        lines.append(f"  {question} | {answer}")
+    lines.append("```")
+    lines.append("")
+    if missing:
+        lines.append(f"Still uncovered: {', '.join(missing)}. Ask only about these, otherwise set \"done\" to true.")
+    else:
+        lines.append("Only ask further questions if something critical is still missing, otherwise set \"done\" to true.")
+    return "\n".join(lines)
+
+def run_batched_clarifier(clarifier_agent, initial_message: HumanMessage, config: dict,
+                          idea: str = "", answers=None, auto_answer: bool = False,
+                          max_rounds: int = 2, first_agent=None,
+                          coverage: Optional[ClarifierCoverage] = None,
+                          on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[Optional[BaseModel], List[BaseMessage], List[Dict[str, str]]]:
+    """
+    Run the clarifier without blocking on user input.
+
+    Every question of a round is answered up front (from the answers map, then
+    from the idea text when auto_answer is set) and sent back in one batched turn,
+    so the clarifier phase costs one or two LLM calls.
+
+    Args:
+        clarifier_agent: Clarifier agent from get_clarifier_agent
+        initial_message: Message that starts the requirements gathering
+        config: LangGraph config with thread_id
+        idea: Original idea text used for auto-answering
+        answers: Dict of question -> answer, or list of answers in question order
+        auto_answer: Answer unmatched questions from the idea text
+        max_rounds: Maximum number of clarifier LLM calls
+        first_agent: Optional agent for the first round (e.g. the fused intake agent)
+        coverage: Optional ClarifierCoverage; stops without another LLM round once coverage is sufficient
+        on_result: Optional callback receiving each agent result (e.g. to record its output mode)
+    Returns:
+        Tuple of (last parsed ClarifierResp or None, message history, answered question pairs)
+    """
+    from src.models.agentComp import ClarifierResp
+
+    messages: List[BaseMessage] = [initial_message]
+    qa_pairs: List[Dict[str, str]] = []
+    clarifier_obj = None
+
+    for round_num in range(max_rounds):
+        agent = first_agent if (first_agent is not None and round_num == 0) else clarifier_agent
+        result = agent.invoke({"messages": messages}, config)
+        if on_result:
+            on_result(result)
+        messages = result.get("messages", [])
+        if not messages:
+            print("Error: Clarifier agent returned no messages")
+            break
+
+        clarifier_response = messages[-1].content
+        usage_metadata = messages[-1].response_metadata.get("token_usage") if hasattr(messages[-1], "response_metadata") else None
+        print(f"Clarifier (Batched round {round_num + 1}): {clarifier_response}")
+        clarifier_obj = process_agent_response(clarifier_response, ClarifierResp, usage_metadata)
+
+        if not clarifier_obj or clarifier_obj.done or round_num == max_rounds - 1:
+            break
+
+        round_pairs = []
+        for req in clarifier_obj.resp:
+            if req.answer:
+                continue
+            answer = match_answer(req.question, answers, len(qa_pairs) + len(round_pairs))
+            if answer is None and auto_answer:
+                answer = auto_answer_from_idea(req.question, idea)
+            req.answer = answer or DEFAULT_ANSWER
+            round_pairs.append({"question": req.question, "answer": req.answer})
+            if coverage:
+                coverage.record(req.question, req.answer)
+
+        if not round_pairs:
+            break
+        qa_pairs.extend(round_pairs)
+        messages.append(HumanMessage(content=format_batched_answers(round_pairs, coverage.missing if coverage else None)))
+
+        if coverage and coverage.sufficient():
+            print(f"Clarifier coverage {coverage.coverage:.0%} is sufficient, skipping further rounds")
+            clarifier_obj.done = True
+            break
+
+    return clarifier_obj, messages, qa_pairs
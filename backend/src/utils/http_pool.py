@@ -0,0 +1,128 @@
+import importlib.util
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.config.env import (
+    HTTP2,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_READ_TIMEOUT,
+)
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class PoolStats:
+    """Counts requests and newly opened connections to measure keep-alive reuse"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.http_versions: Dict[str, int] = {}
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_response(self, http_version: str) -> None:
+        with self._lock:
+            self.http_versions[http_version] = self.http_versions.get(http_version, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "reused_requests": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+                "http_versions": dict(self.http_versions),
+                "http2_enabled": HTTP2 and HTTP2_AVAILABLE,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+            self.http_versions = {}
+
+pool_stats = PoolStats()
+
+# httpcore reports every new TCP connection through the "trace" request extension
+def _trace(event: str, info: Dict[str, Any]) -> None:
+    if event == "connection.connect_tcp.complete":
+        pool_stats.record_connection()
+
+async def _atrace(event: str, info: Dict[str, Any]) -> None:
+    _trace(event, info)
+
+def _on_request(request: httpx.Request) -> None:
+    request.extensions["trace"] = _trace
+    pool_stats.record_request()
+
+async def _aon_request(request: httpx.Request) -> None:
+    request.extensions["trace"] = _atrace
+    pool_stats.record_request()
+
+def _on_response(response: httpx.Response) -> None:
+    pool_stats.record_response(response.http_version)
+
+async def _aon_response(response: httpx.Response) -> None:
+    _on_response(response)
+
+def request_timeout() -> httpx.Timeout:
+    """
+    Timeout for model requests.
+
+    OpenAI clients send their own per-request timeout, which replaces the shared
+    client's default, so it has to be passed to every client built on the pool.
+    """
+    return httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+def _client_settings() -> Dict[str, Any]:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": request_timeout(),
+        "http2": HTTP2 and HTTP2_AVAILABLE,
+    }
+
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> httpx.Client:
+    """Process-wide keep-alive HTTP client shared by all sync model clients"""
+    global _http_client
+    if _http_client is None:
+        with _client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    **_client_settings(),
+                    event_hooks={"request": [_on_request], "response": [_on_response]},
+                )
+    return _http_client
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Process-wide keep-alive HTTP client shared by all async model clients"""
+    global _async_http_client
+    if _async_http_client is None:
+        with _client_lock:
+            if _async_http_client is None:
+                _async_http_client = httpx.AsyncClient(
+                    **_client_settings(),
+                    event_hooks={"request": [_aon_request], "response": [_aon_response]},
+                )
+    return _async_http_client
@@ -0,0 +1,169 @@
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+from src.config.model_limits import DEFAULT_MAX_TOKENS, ENABLE_TOKEN_LIMITS, get_agent_limit, get_tuning
+
+# Limits are rounded up to a multiple of this so they don't change on every call
+_ROUND_TO = 64
+
+def _round_up(value: float) -> int:
+    return int(math.ceil(value / _ROUND_TO) * _ROUND_TO)
+
+class MaxTokensTuner:
+    """
+    Sets max_tokens per agent and model from observed completion lengths.
+
+    Until min_samples completions have been seen the configured limit is used;
+    after that the limit is the given percentile of recent completion lengths
+    plus headroom. A truncated completion (finish_reason=length) raises the
+    limit to truncation_boost x the limit it hit, and it stays at least there.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (agent, limit name, model) -> recent completion token counts
+        self._samples: Dict[tuple, deque] = {}
+        # (agent, limit name, model) -> minimum limit after a truncation
+        self._floors: Dict[tuple, int] = {}
+        self._truncations: Dict[tuple, int] = {}
+
+    def limit(self, agent: str, limit_name: str, model: str) -> Optional[int]:
+        """
+        max_tokens for the next call, or None when token limits are disabled.
+
+        Args:
+            agent: Agent name in AGENT_LIMITS
+            limit_name: Limit key, e.g. "max_tokens" or "section_max_tokens"
+            model: Model name the completion runs on
+        """
+        if not ENABLE_TOKEN_LIMITS:
+            return None
+        configured = get_agent_limit(agent, limit_name, DEFAULT_MAX_TOKENS)
+        if not configured or not get_tuning("enabled"):
+            return configured
+
+        key = (agent, limit_name, model)
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+            floor = self._floors.get(key, 0)
+        limit = configured
+        if len(samples) >= get_tuning("min_samples"):
+            observed = float(np.percentile(samples, get_tuning("percentile")))
+            limit = _round_up(observed * (1 + get_tuning("headroom")))
+        limit = max(limit, floor, get_tuning("min_tokens"))
+        return min(limit, get_tuning("max_tokens"))
+
+    def record(self, agent: str, limit_name: str, model: str, completion_tokens: Optional[int],
+               finish_reason: Optional[str], limit: Optional[int]) -> None:
+        """Record one completion's length and whether it was cut off at the limit"""
+        key = (agent, limit_name, model)
+        with self._lock:
+            if completion_tokens:
+                samples = self._samples.get(key)
+                if samples is None or samples.maxlen != get_tuning("window"):
+                    samples = self._samples[key] = deque(samples or (), maxlen=get_tuning("window"))
+                samples.append(completion_tokens)
+            if finish_reason == "length" and limit:
+                boosted = min(_round_up(limit * get_tuning("truncation_boost")), get_tuning("max_tokens"))
+                self._floors[key] = max(self._floors.get(key, 0), boosted)
+                self._truncations[key] = self._truncations.get(key, 0) + 1
+                print(f"{agent}: completion truncated at {limit} tokens on {model}, raising limit to {boosted}")
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = set(self._samples) | set(self._floors)
+            snapshot = {key: (list(self._samples.get(key, ())), self._truncations.get(key, 0)) for key in keys}
+        report = {}
+        for (agent, limit_name, model), (samples, truncations) in sorted(snapshot.items()):
+            report.setdefault(f"{agent}.{limit_name}", {})[model] = {
+                "samples": len(samples),
+                "p50": int(np.percentile(samples, 50)) if samples else None,
+                "p95": int(np.percentile(samples, 95)) if samples else None,
+                "truncations": truncations,
+                "limit": self.limit(agent, limit_name, model),
+            }
+        return report
+
+max_tokens_tuner = MaxTokensTuner()
+
+def _model_name(model) -> str:
+    bound = getattr(model, "bound", model)
+    return str(getattr(bound, "model_name", None) or getattr(bound, "model", None) or type(bound).__name__)
+
+class AdaptiveMaxTokensModel(BaseChatModel):
+    """
+    Chat model wrapper that resolves max_tokens on every call.
+
+    The limit comes from max_tokens_tuner (and through it the hot-reloadable
+    AGENT_LIMITS), and each completion's length and finish_reason are fed back.
+    """
+
+    model: Any
+    agent: str
+    limit_name: str = "max_tokens"
+    model_name: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "adaptive-max-tokens"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "agent": self.agent, "limit_name": self.limit_name}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(**self.model.bind_tools(tools, **kwargs).kwargs)
+
+    def _call_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        limit = max_tokens_tuner.limit(self.agent, self.limit_name, self.model_name)
+        if limit and "max_tokens" not in kwargs:
+            return {**kwargs, "max_tokens": limit}
+        return kwargs
+
+    def _record(self, result: ChatResult, limit: Optional[int]) -> ChatResult:
+        for generation in result.generations:
+            metadata = getattr(generation.message, "response_metadata", {}) or {}
+            usage = metadata.get("token_usage") or {}
+            max_tokens_tuner.record(self.agent, self.limit_name, self.model_name,
+                                    usage.get("completion_tokens"), metadata.get("finish_reason"), limit)
+        return result
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        kwargs = self._call_kwargs(kwargs)
+        result = self.model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        return self._record(result, kwargs.get("max_tokens"))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        kwargs = self._call_kwargs(kwargs)
+        result = await self.model._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        return self._record(result, kwargs.get("max_tokens"))
+
+def with_max_tokens(model, agent: str, limit_name: str = "max_tokens"):
+    """
+    Wrap a chat model so max_tokens is tuned per call for an agent.
+
+    Args:
+        model: Chat model (ChatOpenAI, RoutedChatModel, ...)
+        agent: Agent name in AGENT_LIMITS
+        limit_name: Limit key, e.g. "max_tokens" or "section_max_tokens"
+    Returns:
+        AdaptiveMaxTokensModel around the model (or a max_tokens binding for runnables
+        that are not chat models)
+    """
+    if isinstance(model, AdaptiveMaxTokensModel):
+        model = model.model
+    if not isinstance(model, BaseChatModel):
+        # Already a runnable binding: fall back to the configured limit
+        limit = max_tokens_tuner.limit(agent, limit_name, _model_name(model))
+        return model.bind(max_tokens=limit) if limit else model
+    return AdaptiveMaxTokensModel(model=model, agent=agent, limit_name=limit_name, model_name=_model_name(model))
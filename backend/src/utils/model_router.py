@@ -0,0 +1,167 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import openai
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+from src.config.env import ROUTER_COOLDOWN_SECONDS, ROUTER_FAILURE_THRESHOLD
+
+# Weight of the newest observation in the latency / error-rate moving averages
+_EWMA_ALPHA = 0.3
+# How strongly the recent error rate inflates an endpoint's latency score
+_ERROR_PENALTY = 4.0
+# HTTP statuses worth retrying on another endpoint
+_RETRYABLE_STATUS = {408, 409, 429}
+
+class EndpointHealth:
+    """Moving averages of latency and error rate for one endpoint"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latency = latency if self.latency is None else _EWMA_ALPHA * latency + (1 - _EWMA_ALPHA) * self.latency
+        self.error_rate *= 1 - _EWMA_ALPHA
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.error_rate = _EWMA_ALPHA + (1 - _EWMA_ALPHA) * self.error_rate
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= ROUTER_FAILURE_THRESHOLD:
+            self.cooldown_until = time.monotonic() + ROUTER_COOLDOWN_SECONDS
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def score(self) -> float:
+        """Lower is better; untried endpoints score 0 so each one gets probed"""
+        if self.latency is None:
+            return float("inf") if self.failures else 0.0
+        return self.latency * (1 + _ERROR_PENALTY * self.error_rate)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "cooling_down": not self.available(),
+        }
+
+# Health is shared process-wide so every agent benefits from what the others observed
+_health: Dict[str, EndpointHealth] = {}
+_health_lock = threading.Lock()
+
+def endpoint_health(name: str) -> EndpointHealth:
+    with _health_lock:
+        if name not in _health:
+            _health[name] = EndpointHealth(name)
+        return _health[name]
+
+def router_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-endpoint latency, error rate and request counts"""
+    with _health_lock:
+        return {name: health.summary() for name, health in _health.items()}
+
+def is_retryable(error: Exception) -> bool:
+    """Whether another endpoint might succeed where this one failed"""
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+def _endpoint_name(model) -> str:
+    return f"{model.openai_api_base or 'https://api.openai.com/v1'}#{model.model_name}"
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that spreads calls over several OpenAI-compatible endpoints.
+
+    Endpoints are tried fastest-first by their moving-average latency, inflated
+    by their recent error rate. Connection errors, timeouts, rate limits and 5xx
+    responses fail over to the next endpoint; an endpoint failing
+    ROUTER_FAILURE_THRESHOLD times in a row sits out ROUTER_COOLDOWN_SECONDS
+    (it is still tried as a last resort). Request errors such as a 400 are
+    raised as-is, since every endpoint would reject them the same way.
+    """
+
+    endpoints: List[Any]
+    model_name: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-openai"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "endpoints": [_endpoint_name(e) for e in self.endpoints]}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # Every endpoint speaks the OpenAI API, so the first one formats the tools for all
+        return self.bind(**self.endpoints[0].bind_tools(tools, **kwargs).kwargs)
+
+    def ordered_endpoints(self) -> List[Any]:
+        """Endpoints in the order they should be tried"""
+        ranked = sorted(self.endpoints, key=lambda e: endpoint_health(_endpoint_name(e)).score())
+        ready = [e for e in ranked if endpoint_health(_endpoint_name(e)).available()]
+        cooling = [e for e in ranked if not endpoint_health(_endpoint_name(e)).available()]
+        return ready + cooling
+
+    def _finish(self, result: ChatResult, name: str) -> ChatResult:
+        result.llm_output = {**(result.llm_output or {}), "endpoint": name}
+        return result
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for endpoint in self.ordered_endpoints():
+            name = _endpoint_name(endpoint)
+            health = endpoint_health(name)
+            start = time.perf_counter()
+            try:
+                result = endpoint._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                health.record_failure()
+                print(f"Endpoint {name} failed ({type(e).__name__}), failing over")
+                last_error = e
+                continue
+            health.record_success(time.perf_counter() - start)
+            return self._finish(result, name)
+        raise last_error
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for endpoint in self.ordered_endpoints():
+            name = _endpoint_name(endpoint)
+            health = endpoint_health(name)
+            start = time.perf_counter()
+            try:
+                result = await endpoint._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                health.record_failure()
+                print(f"Endpoint {name} failed ({type(e).__name__}), failing over")
+                last_error = e
+                continue
+            health.record_success(time.perf_counter() - start)
+            return self._finish(result, name)
+        raise last_error
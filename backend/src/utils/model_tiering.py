@@ -0,0 +1,220 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from langchain_core.messages import RemoveMessage
+from pydantic import BaseModel
+
+from src.config.env import MODEL_TIERING
+from src.config.model_config import get_model
+from src.config.model_tiers import TIER_POLICY, enabled_tiers
+from src.utils.fingerprint import generation_settings
+from src.utils.helper import process_agent_response
+
+class TierTelemetry:
+    """Per agent type and tier: runs, parse failures, latency and token cost"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # agent -> tier -> {"runs", "parse_failures", "latency", "cost", "escalations"}
+        self.tiers: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.calls: Dict[str, int] = {}
+
+    def _entry(self, agent: str, tier: str) -> Dict[str, float]:
+        return self.tiers.setdefault(agent, {}).setdefault(
+            tier, {"runs": 0, "parse_failures": 0, "latency": 0.0, "cost": 0.0, "escalations": 0})
+
+    def record(self, agent: str, tier: Dict[str, Any], latency: float, usage: Optional[Dict[str, Any]],
+               parsed: bool) -> None:
+        usage = usage or {}
+        cost = usage.get("prompt_tokens", 0) / 1000 * tier["input_cost"] \
+            + usage.get("completion_tokens", 0) / 1000 * tier["output_cost"]
+        with self._lock:
+            entry = self._entry(agent, tier["name"])
+            entry["runs"] += 1
+            entry["latency"] += latency
+            entry["cost"] += cost
+            if not parsed:
+                entry["parse_failures"] += 1
+
+    def record_escalation(self, agent: str, tier: str) -> None:
+        with self._lock:
+            self._entry(agent, tier)["escalations"] += 1
+
+    def count_call(self, agent: str) -> int:
+        with self._lock:
+            self.calls[agent] = self.calls.get(agent, 0) + 1
+            return self.calls[agent]
+
+    def stats(self, agent: str, tier: str) -> Dict[str, float]:
+        """Runs, parse rate, mean latency and mean cost of a tier for an agent"""
+        with self._lock:
+            entry = self.tiers.get(agent, {}).get(tier)
+            if not entry or not entry["runs"]:
+                return {"runs": 0, "parse_rate": 0.0, "latency": 0.0, "cost": 0.0}
+            runs = entry["runs"]
+            return {
+                "runs": runs,
+                "parse_rate": (runs - entry["parse_failures"]) / runs,
+                "latency": entry["latency"] / runs,
+                "cost": entry["cost"] / runs,
+            }
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            agents = list(self.tiers.items())
+        return {
+            agent: {tier: {**self.stats(agent, tier), "escalations": entry["escalations"]}
+                    for tier, entry in tiers.items()}
+            for agent, tiers in agents
+        }
+
+tier_telemetry = TierTelemetry()
+
+def eligible_tiers(agent: str) -> List[Dict[str, Any]]:
+    """Enabled tiers at or above the agent's floor, cheapest first"""
+    tiers = enabled_tiers()
+    floor = TIER_POLICY["floors"].get(agent)
+    names = [tier["name"] for tier in tiers]
+    if floor in names:
+        tiers = tiers[names.index(floor):]
+    return tiers
+
+def choose_tier(agent: str) -> int:
+    """
+    Pick the tier an agent should start on.
+
+    Tiers are walked cheapest first; a tier with fewer than min_samples runs is
+    used until it has been measured, unless a cheaper tier already qualifies.
+    Among tiers that meet the parse-rate and latency guardrails, the one with the
+    lowest cost per valid output wins; if none qualifies, the strongest tier is
+    used. Every reprobe_every calls the cheapest skipped tier gets another chance.
+
+    Args:
+        agent: Agent type
+    Returns:
+        Index into eligible_tiers(agent)
+    """
+    tiers = eligible_tiers(agent)
+    call = tier_telemetry.count_call(agent)
+    best, best_cost, skipped = None, None, None
+    for index, tier in enumerate(tiers):
+        stats = tier_telemetry.stats(agent, tier["name"])
+        if stats["runs"] < TIER_POLICY["min_samples"]:
+            # Stronger tiers cost more, so they only need measuring while no cheaper tier qualifies
+            if best is None:
+                return index
+            continue
+        if stats["parse_rate"] < TIER_POLICY["min_parse_rate"] or stats["latency"] > TIER_POLICY["max_latency_seconds"]:
+            if skipped is None:
+                skipped = index
+            continue
+        cost_per_valid = stats["cost"] / stats["parse_rate"]
+        if best is None or cost_per_valid < best_cost:
+            best, best_cost = index, cost_per_valid
+    if skipped is not None and (best is None or skipped < best) and call % TIER_POLICY["reprobe_every"] == 0:
+        return skipped
+    return best if best is not None else len(tiers) - 1
+
+def _usage(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    messages = result.get("messages") or []
+    if not messages:
+        return None
+    return getattr(messages[-1], "response_metadata", {}).get("token_usage")
+
+class TieredAgent:
+    """
+    Agent that runs on the tier picked by choose_tier and escalates on invalid output.
+
+    Exposes the same invoke() as the wrapped LangGraph agents. When the response
+    does not validate against the schema, the failed exchange is removed from the
+    conversation thread and the same input is retried on the next stronger tier.
+    The returned state gets 'model_tier', 'escalations' and 'model_settings' keys.
+    """
+
+    def __init__(self, name: str, schema: Type[BaseModel], build_agent: Callable[[Any], Any],
+                 agent_type: Optional[str] = None, provider: str = "openai"):
+        self.name = name
+        self.schema = schema
+        self.build_agent = build_agent
+        self.agent_type = agent_type or name
+        self.provider = provider
+        self.tiers = eligible_tiers(name)
+        self._agents: Dict[str, Any] = {}
+        # tier -> generation_settings() of the tier's model
+        self.settings: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def agent_for(self, tier: Dict[str, Any]):
+        """Agent built on a tier's model (built on first use)"""
+        with self._lock:
+            if tier["name"] not in self._agents:
+                provider = tier.get("provider") or self.provider
+                model = get_model(provider=provider, model_name=tier.get("model"), agent_type=self.agent_type)
+                self.settings[tier["name"]] = generation_settings(model)
+                self._agents[tier["name"]] = self.build_agent(model)
+            return self._agents[tier["name"]]
+
+    def _rollback(self, agent, config, before: int, result: Dict[str, Any]) -> None:
+        """Remove the messages a failed call appended to the thread"""
+        if not config or getattr(agent, "checkpointer", None) is None:
+            return
+        added = (result.get("messages") or [])[before:]
+        if added:
+            agent.update_state(config, {"messages": [RemoveMessage(id=m.id) for m in added]}, as_node="agent")
+
+    def _history_length(self, agent, config) -> int:
+        if not config or getattr(agent, "checkpointer", None) is None:
+            return 0
+        return len(agent.get_state(config).values.get("messages", []))
+
+    def invoke(self, inputs, config=None, **kwargs):
+        start_index = choose_tier(self.name)
+        escalations = 0
+        for index in range(start_index, len(self.tiers)):
+            tier = self.tiers[index]
+            agent = self.agent_for(tier)
+            before = self._history_length(agent, config)
+
+            start = time.perf_counter()
+            result = agent.invoke(inputs, config, **kwargs)
+            elapsed = time.perf_counter() - start
+
+            messages = result.get("messages") or []
+            content = messages[-1].content if messages else ""
+            parsed = process_agent_response(content, self.schema) is not None
+            tier_telemetry.record(self.name, tier, elapsed, _usage(result), parsed)
+
+            if parsed or index == len(self.tiers) - 1:
+                return {**result, "model_tier": tier["name"], "escalations": escalations,
+                        "model_settings": self.settings.get(tier["name"], {})}
+
+            next_tier = self.tiers[index + 1]["name"]
+            print(f"{self.name}: '{tier['name']}' tier output failed validation, escalating to '{next_tier}'")
+            tier_telemetry.record_escalation(self.name, tier["name"])
+            self._rollback(agent, config, before, result)
+            escalations += 1
+
+    def __getattr__(self, attr):
+        return getattr(self.agent_for(self.tiers[-1]), attr)
+
+def tiered_agent(name: str, schema: Type[BaseModel], build_agent: Callable[[Any], Any],
+                 agent_type: Optional[str] = None, provider: str = "openai", enabled: Optional[bool] = None):
+    """
+    Build an agent on a fixed model, or a TieredAgent when model tiering is on.
+
+    Args:
+        name: Agent name, used for telemetry, floors and tier selection
+        schema: Pydantic model the output must validate against
+        build_agent: Callable (model) -> agent
+        agent_type: Model config agent type (defaults to name)
+        provider: Provider for the non-tiered model and for tiers without one
+        enabled: Use tiering (defaults to the MODEL_TIERING env setting)
+    Returns:
+        The agent on the configured model, or a TieredAgent
+    """
+    if enabled is None:
+        enabled = MODEL_TIERING
+    if not enabled or not eligible_tiers(name):
+        return build_agent(get_model(provider=provider, agent_type=agent_type or name))
+    return TieredAgent(name, schema, build_agent, agent_type=agent_type, provider=provider)
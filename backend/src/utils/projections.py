@@ -0,0 +1,168 @@
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils import toon
+from src.utils.token_tracker import estimate_tokens
+
+# --- Input projections ---
+# Fields each downstream agent needs from the collected pipeline data.
+# Keys are the names the agent sees, values are dotted paths into final_data:
+#   "a.b"           -> nested value
+#   "a.list[]"      -> every item of a list
+#   "a.list[].x"    -> field x of every item
+#   "a.list[].{x,y}" -> only fields x and y of every item
+AGENT_INPUT_PROJECTIONS: Dict[str, Dict[str, str]] = {
+    "customer": {
+        "name": "product.name",
+        "description": "product.description",
+        "features": "product.features[].{name,reason}",
+    },
+    "engineer": {
+        "product": "product.name",
+        "description": "product.description",
+        "features": "product.features[].{name,reason,development_time}",
+        "target_audience": "customer.market_analysis.target_audience",
+        "market_gaps": "customer.market_analysis.market_gaps",
+        "viability_score": "customer.market_analysis.verdict.viability_score",
+    },
+    "risk": {
+        "product": "product.name",
+        "description": "product.description",
+        "features": "product.features[].{name,reason}",
+        "target_audience": "customer.market_analysis.target_audience",
+        "tech_stack": "engineer.analysis.tech_stack",
+        "technical_challenges": "engineer.analysis.technical_challenges[].{title,severity,description}",
+    },
+    # Shared context for fan-out risk batches (features are sent per batch)
+    "risk_context": {
+        "product": "product.name",
+        "description": "product.description",
+        "target_audience": "customer.market_analysis.target_audience",
+        "tech_stack": "engineer.analysis.tech_stack",
+    },
+    "summarizer": {
+        "product": "product",
+        "market": "customer.market_analysis",
+        "engineering": "engineer.analysis",
+        "risk": "risk.assessment",
+        "figures": "analytics",
+    },
+    # Map-reduce summarizer sections
+    "summary_market": {
+        "product": "product.name",
+        "features": "product.features[].{name,reason}",
+        "market": "customer.market_analysis",
+    },
+    "summary_technical": {
+        "product": "product.name",
+        "features": "product.features[].{name,development_time,cost_estimate}",
+        "engineering": "engineer.analysis",
+        "figures": "analytics.{features,timeline}",
+    },
+    "summary_risk": {
+        "product": "product.name",
+        "technical_challenges": "engineer.analysis.technical_challenges[].{title,severity}",
+        "risk": "risk.assessment",
+        "risk_levels": "analytics.risk",
+    },
+}
+
+# Keys that only matter to the UI, never to an agent
+_DROPPED_KEYS = {"diagram_url", "tts_file", "url", "raw_content", "raw_response", "error", "graph"}
+_URL_PATTERN = re.compile(r"^https?://\S+$")
+_PATH_TOKEN = re.compile(r"([^.\[\]{}]+)(\[\])?|\{([^}]*)\}")
+
+def _unwrap(value: Any, key: str) -> Any:
+    """Collapse accidental double wrapping like {"analysis": {"analysis": {...}}}"""
+    while isinstance(value, dict) and list(value.keys()) == [key] and isinstance(value[key], dict) \
+            and list(value[key].keys()) == [key]:
+        value = value[key]
+    return value
+
+def _resolve(data: Any, tokens: list) -> Any:
+    if not tokens:
+        return data
+    name, is_list, fields = tokens[0]
+
+    if fields is not None:
+        if not isinstance(data, dict):
+            return None
+        return {f: data.get(f) for f in fields if f in data}
+
+    if not isinstance(data, dict) or name not in data:
+        return None
+    value = data[name]
+    if is_list:
+        if not isinstance(value, list):
+            return None
+        return [_resolve(item, tokens[1:]) for item in value]
+    return _resolve(value, tokens[1:])
+
+def _parse_path(path: str) -> list:
+    tokens = []
+    for match in _PATH_TOKEN.finditer(path):
+        name, list_marker, fields = match.groups()
+        if fields is not None:
+            tokens.append((None, False, [f.strip() for f in fields.split(",") if f.strip()]))
+        else:
+            tokens.append((name, bool(list_marker), None))
+    return tokens
+
+def select_path(data: Dict[str, Any], path: str) -> Any:
+    """Select the value at a projection path, or None if any part is missing."""
+    return _resolve(data, _parse_path(path))
+
+def prune(value: Any) -> Any:
+    """Drop nulls, empty containers, URLs and UI-only keys."""
+    if isinstance(value, dict):
+        pruned = {k: prune(v) for k, v in value.items() if k not in _DROPPED_KEYS}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [prune(v) for v in value]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return None if _URL_PATTERN.match(value) else value
+    return value
+
+def encode_compact(data: Dict[str, Any]) -> str:
+    """Encode data as TOON or compact JSON, whichever is estimated to be fewer tokens."""
+    toon_text = toon.dumps(data, delimiter="|")
+    json_text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return toon_text if estimate_tokens(toon_text) <= estimate_tokens(json_text) else json_text
+
+def normalize_pipeline_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of pipeline data with double-wrapped engineer/risk blocks collapsed."""
+    data = dict(data)
+    if data.get("engineer") is not None:
+        data["engineer"] = _unwrap(data["engineer"], "analysis")
+    if data.get("risk") is not None:
+        data["risk"] = _unwrap(data["risk"], "assessment")
+    return data
+
+def project_payload(agent: str, data: Dict[str, Any], baseline: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+    """
+    Build the input message for an agent from the collected pipeline data.
+
+    Args:
+        agent: Consumer agent name, a key of AGENT_INPUT_PROJECTIONS
+        data: Collected pipeline data (same shape as ProductConversationManager.final_data)
+        baseline: The payload the agent used to receive, for the token report
+                  (defaults to the full data as JSON)
+    Returns:
+        Tuple of (encoded payload, report with original/sent token estimates)
+    """
+    data = normalize_pipeline_data(data)
+
+    projection = AGENT_INPUT_PROJECTIONS[agent]
+    projected = prune({key: select_path(data, path) for key, path in projection.items()}) or {}
+    payload = encode_compact(projected)
+
+    if baseline is None:
+        baseline = json.dumps(data, default=str)
+    report = {
+        "original_tokens": estimate_tokens(baseline),
+        "sent_tokens": estimate_tokens(payload),
+    }
+    return payload, report
@@ -9,7 +9,7 @@ import numpy as np
 from openai import OpenAI
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from src.utils.checkpoint import get_checkpointer
 from langchain_core.tools import tool
 from src.config.env import OPENAI_API_KEY, OPENAI_API_BASE
 
@@ -17,7 +17,7 @@ from src.config.env import OPENAI_API_KEY, OPENAI_API_BASE
 openai_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE)
 
 # --- Create memory ---
-memory = MemorySaver()
+memory = get_checkpointer()
 
 # --- Audio recording functionality ---
 def record_audio(duration=5, samplerate=16000):
@@ -0,0 +1,20 @@
+from typing import Any
+
+def build_prompt(static_prefix: str, **run_settings: Any) -> str:
+    """
+    Lay out a system prompt as a byte-stable static prefix plus a dynamic suffix.
+
+    Provider prompt caching matches on the longest identical prefix, so every
+    run-specific value (limits, counts) goes into a short settings block at the
+    very end instead of being interpolated into the instructions.
+
+    Args:
+        static_prefix: Instructions that never change between runs or configurations
+        **run_settings: Run-specific values, rendered as "name: value" lines
+    Returns:
+        The full system prompt
+    """
+    if not run_settings:
+        return static_prefix
+    settings = "\n".join(f"- {name}: {value}" for name, value in run_settings.items())
+    return f"{static_prefix.rstrip()}\n\nRun settings:\n{settings}\n"
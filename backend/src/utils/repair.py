@@ -0,0 +1,202 @@
+import typing
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from langchain_core.messages import HumanMessage
+
+from src.utils import toon
+from src.utils.token_tracker import token_tracker
+
+def _list_item_models(schema: Type[BaseModel]) -> Dict[str, Type[BaseModel]]:
+    """Fields of the schema that are lists of models, mapped to the item model"""
+    items = {}
+    for name, field in schema.model_fields.items():
+        args = typing.get_args(field.annotation)
+        if typing.get_origin(field.annotation) in (list, List) and args \
+                and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            items[name] = args[0]
+    return items
+
+def _header(item_model: Type[BaseModel]) -> str:
+    return " | ".join(item_model.model_fields)
+
+def _row(item: Dict[str, Any], item_model: Type[BaseModel]) -> str:
+    return " | ".join(" ".join(str(item.get(f, "")).split()).replace("|", "/") for f in item_model.model_fields)
+
+def find_issues(data: Dict[str, Any], schema: Type[BaseModel],
+                min_items: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Locate what is wrong with a parsed response, field by field.
+
+    Args:
+        data: Parsed (TOON/JSON) response
+        schema: Pydantic model the response should validate against
+        min_items: Minimum number of rows per list field
+    Returns:
+        Dict with 'missing' top-level fields, invalid 'rows' per list field
+        (index -> error messages) and 'short' list fields (rows still needed)
+    """
+    issues = {"missing": [], "rows": {}, "short": {}}
+    list_fields = _list_item_models(schema)
+    try:
+        schema(**data)
+    except ValidationError as e:
+        for error in e.errors():
+            loc = error["loc"]
+            field = loc[0] if loc else None
+            if field in list_fields and len(loc) >= 3 and isinstance(loc[1], int):
+                issues["rows"].setdefault(field, {}).setdefault(loc[1], []).append(f"{loc[2]}: {error['msg']}")
+            elif field in list_fields:
+                issues["short"][field] = max(issues["short"].get(field, 0), (min_items or {}).get(field, 1))
+            elif field is not None and field not in issues["missing"]:
+                issues["missing"].append(field)
+    except TypeError:
+        issues["missing"] = list(schema.model_fields)
+
+    for field, minimum in (min_items or {}).items():
+        rows = data.get(field)
+        valid = len(rows) - len(issues["rows"].get(field, {})) if isinstance(rows, list) else 0
+        if isinstance(rows, list) and valid < minimum:
+            issues["short"][field] = max(issues["short"].get(field, 0), minimum - valid)
+    return issues
+
+def _known_fields(data: Dict[str, Any], schema: Type[BaseModel], issues: Dict[str, Any]) -> str:
+    """Valid top-level scalar fields of a response (name, description, ...) as TOON"""
+    list_fields = _list_item_models(schema)
+    known = {
+        field: " ".join(str(data[field]).split())
+        for field in schema.model_fields
+        if field not in list_fields and field not in issues["missing"]
+        and data.get(field) not in (None, "") and not isinstance(data.get(field), (dict, list))
+    }
+    return toon.dumps(known) if known else ""
+
+def build_repair_request(data: Dict[str, Any], schema: Type[BaseModel], issues: Dict[str, Any],
+                         context: str = "") -> str:
+    """
+    Ask only for the missing or invalid parts of a response, in the agent's TOON layout.
+
+    The request starts with what the response is about (the caller's context, e.g.
+    the requirements record, and the valid scalar fields already returned), since
+    the repair call does not replay the original conversation.
+    """
+    list_fields = _list_item_models(schema)
+    parts = []
+    if context.strip():
+        parts.append(f"Context:\n{context.strip()}\n")
+    known = _known_fields(data, schema, issues)
+    if known:
+        parts.append(f"Your previous response so far:\n{known}\n")
+    parts.append("Your previous response failed validation. Do NOT regenerate it; return ONLY the parts requested below as TOON.")
+    layout = []
+
+    if issues["missing"]:
+        scalars = [f for f in issues["missing"] if f not in list_fields]
+        if scalars:
+            parts.append(f"Missing fields: {', '.join(scalars)}.")
+            layout.extend(f"{f}: ..." for f in scalars)
+
+    for field, bad_rows in issues["rows"].items():
+        item_model = list_fields[field]
+        rows = data.get(field) or []
+        errors = "; ".join(f"row {i + 1}: {', '.join(msgs)}" for i, msgs in sorted(bad_rows.items()))
+        parts.append(f"Invalid {field} rows ({errors}). Return them corrected, in the same order, under fixed_{field}:")
+        layout.append(f"fixed_{field}:\n  {_header(item_model)}")
+        layout.extend(f"  {_row(rows[i], item_model)}" for i in sorted(bad_rows) if i < len(rows) and isinstance(rows[i], dict))
+
+    for field, needed in issues["short"].items():
+        item_model = list_fields[field]
+        first_field = next(iter(item_model.model_fields))
+        existing = [str(r.get(first_field)) for r in data.get(field) or [] if isinstance(r, dict) and r.get(first_field)]
+        avoid = f", different from: {', '.join(existing)}" if existing else ""
+        parts.append(f"Add {needed} more {field} rows{avoid}. Put them under new_{field}:")
+        layout.append(f"new_{field}:\n  {_header(item_model)}")
+
+    return "\n".join(parts) + "\n\n```toon\n" + "\n".join(layout) + "\n```"
+
+def merge_repair(data: Dict[str, Any], delta: Dict[str, Any], schema: Type[BaseModel], issues: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge a repair delta into the original parsed response"""
+    merged = dict(data)
+    for field in issues["missing"]:
+        if field in delta:
+            merged[field] = delta[field]
+
+    for field, item_model in _list_item_models(schema).items():
+        rows = list(merged.get(field) or []) if isinstance(merged.get(field), list) else []
+        fixed = delta.get(f"fixed_{field}") or []
+        for index, row in zip(sorted(issues["rows"].get(field, {})), fixed if isinstance(fixed, list) else []):
+            if index < len(rows) and isinstance(row, dict):
+                rows[index] = row
+
+        first_field = next(iter(item_model.model_fields))
+        seen = {str(r.get(first_field, "")).lower() for r in rows if isinstance(r, dict)}
+        added = delta.get(f"new_{field}") or delta.get(field) or []
+        for row in added if isinstance(added, list) else []:
+            key = str(row.get(first_field, "")).lower() if isinstance(row, dict) else ""
+            if key and key not in seen:
+                rows.append(row)
+                seen.add(key)
+        if rows or field in merged:
+            merged[field] = rows
+    return merged
+
+def _drop_invalid_rows(data: Dict[str, Any], schema: Type[BaseModel], issues: Dict[str, Any]) -> Dict[str, Any]:
+    cleaned = dict(data)
+    for field, bad_rows in issues["rows"].items():
+        cleaned[field] = [row for i, row in enumerate(data.get(field) or []) if i not in bad_rows]
+    return cleaned
+
+def repair_response(agent, data: Dict[str, Any], schema: Type[BaseModel], thread_id: str,
+                    min_items: Optional[Dict[str, int]] = None, max_rounds: int = 2,
+                    context: str = "") -> Tuple[Optional[BaseModel], Dict[str, Any]]:
+    """
+    Repair a parsed agent response by asking only for what failed validation.
+
+    Each round sends the validation errors and the missing/invalid parts to the
+    agent on a fresh thread (no conversation replay) and merges the returned
+    delta into the existing data. The request is prefixed with context and the
+    fields already known, so added rows stay on topic.
+
+    Args:
+        agent: The agent that produced the response
+        data: Parsed response (may be empty if parsing failed entirely)
+        schema: Pydantic model the response must validate against
+        thread_id: Base thread id for the repair calls
+        min_items: Minimum number of rows per list field (e.g. {"features": 5})
+        max_rounds: Maximum repair calls
+        context: What the response was generated from (e.g. the requirements record)
+    Returns:
+        Tuple of (validated model or None, report with rounds and issues)
+    """
+    data = data if isinstance(data, dict) else {}
+    report = {"rounds": 0, "issues": []}
+
+    for round_index in range(max_rounds + 1):
+        issues = find_issues(data, schema, min_items)
+        if not any(issues.values()):
+            return schema(**data), report
+        if round_index == max_rounds:
+            break
+
+        report["rounds"] += 1
+        report["issues"].append(issues)
+        request = build_repair_request(data, schema, issues, context)
+        print(f"Repairing {schema.__name__} (round {report['rounds']}): {issues}")
+
+        config = {"configurable": {"thread_id": f"{thread_id}:repair{round_index}"}}
+        result = agent.invoke({"messages": [HumanMessage(content=request)]}, config)
+        last_message = result["messages"][-1]
+        usage_metadata = last_message.response_metadata.get("token_usage") if hasattr(last_message, "response_metadata") else None
+        if usage_metadata:
+            token_tracker.track_usage(usage_metadata)
+
+        delta = toon.parse_response(last_message.content)
+        data = merge_repair(data, delta if isinstance(delta, dict) else {}, schema, issues)
+
+    # Still invalid: keep whatever validates if only rows are broken and enough remain
+    issues = find_issues(data, schema, min_items)
+    if not issues["missing"] and not issues["short"]:
+        try:
+            return schema(**_drop_invalid_rows(data, schema, issues)), report
+        except ValidationError:
+            pass
+    return None, report
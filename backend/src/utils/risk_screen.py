@@ -0,0 +1,121 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+# --- Data categories ---
+# Keyword patterns for regulated data, mapped to the laws named in risk_prompt.
+# A feature matching any pattern is sent to the LLM risk assessment; the rest
+# get a deterministic low-risk row.
+DATA_CATEGORIES: Dict[str, Dict[str, Any]] = {
+    "health": {
+        "patterns": [r"health", r"medic", r"symptom", r"diagnos", r"heart ?rate", r"sleep", r"fitness",
+                     r"calori", r"workout", r"diet", r"medication", r"mental", r"therap", r"patient", r"wellness"],
+        "laws": ["HIPAA", "GDPR"],
+    },
+    "location": {
+        "patterns": [r"\bgps\b", r"locat", r"\bgeo", r"nearby", r"check-?in", r"\bmaps?\b", r"route", r"track(ing)? (users?|where)"],
+        "laws": ["GDPR", "CCPA"],
+    },
+    "minors": {
+        "patterns": [r"\bchild", r"\bkids?\b", r"\bminors?\b", r"\bteen", r"student", r"school", r"parent", r"toddler", r"\bunder 1[38]\b"],
+        "laws": ["COPPA", "GDPR"],
+    },
+    "payments": {
+        "patterns": [r"payment", r"\bpay\b", r"checkout", r"credit card", r"billing", r"subscription", r"wallet",
+                     r"invoice", r"\bbank", r"transaction", r"purchase", r"financ", r"payout"],
+        "laws": ["SOX", "CCPA", "GDPR"],
+    },
+    "biometrics": {
+        "patterns": [r"biometric", r"fingerprint", r"touch ?id", r"\bface", r"facial", r"\bunlock", r"\bvoice",
+                     r"\biris\b", r"retina", r"palm ?(print|scan)", r"selfie", r"\bgait\b"],
+        "laws": ["GDPR", "CCPA", "DPDPA"],
+    },
+    # Explicit collection of personal data only; generic words such as "account",
+    # "history" or "share" appear in most features and would defeat the screen
+    "personal_data": {
+        "patterns": [r"personal (data|info\w*|details)", r"\bpii\b", r"user data", r"e-?mail address", r"phone number",
+                     r"contacts? (list|book|sync|import|upload)", r"address book", r"home address", r"date of birth",
+                     r"\bbirthday", r"\bssn\b", r"social security", r"passport", r"national id", r"identity verif",
+                     r"\bkyc\b", r"government id", r"personali[sz]ed (ads?|recommendations?|feed)",
+                     r"behaviou?ral (data|tracking|profil\w*)", r"(user|usage) (analytics|tracking)",
+                     r"third[- ]party (analytics|tracking|sharing)", r"tracking pixel", r"\bcamera\b", r"microphone",
+                     r"photo (upload|library|gallery)", r"record(ing|s)? (calls?|audio|video|conversations?)",
+                     r"call recording", r"(private|direct) messag", r"(read|scan|store)s? (messages|chats|conversations)"],
+        "laws": ["GDPR", "CCPA", "DPDPA"],
+    },
+}
+
+_COMPILED = {
+    category: re.compile("|".join(spec["patterns"]), re.IGNORECASE)
+    for category, spec in DATA_CATEGORIES.items()
+}
+
+def screen_feature(feature: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Match a product feature against the data category index.
+
+    Args:
+        feature: Product feature dict ('name' and optionally 'reason'/'description')
+    Returns:
+        Tuple of (matched data categories, applicable laws)
+    """
+    text = " ".join(str(feature.get(key, "")) for key in ("name", "reason", "description"))
+    categories = [category for category, pattern in _COMPILED.items() if pattern.search(text)]
+    laws = []
+    for category in categories:
+        for law in DATA_CATEGORIES[category]["laws"]:
+            if law not in laws:
+                laws.append(law)
+    return categories, laws
+
+def low_risk_row(feature_name: str) -> Dict[str, Any]:
+    """Deterministic RiskFeature row for a feature that touches no regulated data"""
+    return {
+        "feature": feature_name,
+        "law_interaction": "None",
+        "is_potential_risk": False,
+        "potential_risk": "No personal or regulated data identified by pre-screen",
+        "border_line_thing": "None",
+        "gdpr_compliance": "Not applicable",
+        "data_retention": "Not applicable",
+        "user_consent": "Not required",
+        "risk_level": "low",
+        "mitigation": "Re-assess if the feature starts processing personal data",
+    }
+
+def unassessed_row(feature: Dict[str, Any]) -> Dict[str, Any]:
+    """Conservative row for a feature the LLM assessment did not return"""
+    categories = feature.get("data_categories")
+    return {
+        "feature": str(feature.get("name", "")),
+        "law_interaction": feature.get("laws") or "Unknown",
+        "is_potential_risk": True,
+        "potential_risk": f"Not assessed; pre-screen matched: {categories}" if categories
+                          else "Not assessed; the risk assessment returned no row for this feature",
+        "border_line_thing": "Requires review",
+        "gdpr_compliance": "Requires review",
+        "data_retention": "Requires review",
+        "user_consent": "Requires review",
+        "risk_level": "medium",
+        "mitigation": "Review with legal before implementation",
+    }
+
+def prescreen_features(features: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split features into those needing an LLM risk assessment and deterministic low-risk rows.
+
+    Risky features are returned with 'data_categories' and 'laws' hints added.
+
+    Args:
+        features: Product feature dicts
+    Returns:
+        Tuple of (plausibly risky features, low-risk RiskFeature rows)
+    """
+    risky, low_risk = [], []
+    for feature in features:
+        categories, laws = screen_feature(feature)
+        if categories:
+            risky.append({**feature, "data_categories": ", ".join(categories), "laws": ", ".join(laws)})
+        else:
+            low_risk.append(low_risk_row(str(feature.get("name", ""))))
+    print(f"Risk pre-screen: {len(risky)} features for LLM assessment, {len(low_risk)} low-risk")
+    return risky, low_risk
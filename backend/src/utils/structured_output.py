@@ -0,0 +1,110 @@
+import re
+import threading
+from typing import Any, Callable, Dict, Optional, Type
+from pydantic import BaseModel
+
+from src.config.env import STRUCTURED_OUTPUT
+from src.utils import toon
+from src.utils.token_tracker import token_tracker
+
+# Appended to the system prompt in structured mode; the response schema replaces
+# the TOON layout the prompt describes
+STRUCTURED_SUFFIX = """
+Output format override:
+Respond with a single JSON object that matches the response schema exactly.
+Ignore the TOON formatting instructions above; keep every other instruction.
+"""
+
+# Models whose provider rejected the json_schema response format
+_unsupported_models = set()
+_unsupported_lock = threading.Lock()
+
+# Provider errors meaning "no structured output here": only messages naming the
+# response format itself, so unrelated "not supported" errors are still raised
+_UNSUPPORTED_ERRORS = re.compile(r"response[_ ]format|json[_ ]schema|structured[_ ]outputs?", re.IGNORECASE)
+
+def json_schema_format(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAI-style non-strict json_schema response format for a Pydantic model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "schema": schema.model_json_schema(by_alias=True),
+            "strict": False,
+        },
+    }
+
+def _model_key(model) -> str:
+    bound = getattr(model, "bound", model)
+    return str(getattr(bound, "model_name", None) or getattr(bound, "model", None) or type(bound).__name__)
+
+def _is_unsupported_error(error: Exception) -> bool:
+    return bool(_UNSUPPORTED_ERRORS.search(str(error)))
+
+def _parses(content: str, schema: Type[BaseModel]) -> bool:
+    try:
+        schema(**toon.parse_response(content))
+        return True
+    except Exception:
+        return False
+
+class OutputModeAgent:
+    """
+    Agent that answers through the provider's structured output, falling back to TOON.
+
+    Exposes the same invoke() as the wrapped LangGraph agents. The returned state
+    gets an 'output_mode' key ("structured" or "toon") so callers can record it.
+    """
+
+    def __init__(self, name: str, schema: Type[BaseModel], structured_agent, toon_agent, model_key: str):
+        self.name = name
+        self.schema = schema
+        self.structured_agent = structured_agent
+        self.toon_agent = toon_agent
+        self.model_key = model_key
+
+    def _finish(self, result: Dict[str, Any], mode: str) -> Dict[str, Any]:
+        messages = result.get("messages") or []
+        content = messages[-1].content if messages else ""
+        token_tracker.track_output_mode(self.name.lower(), mode, _parses(content, self.schema))
+        return {**result, "output_mode": mode}
+
+    def invoke(self, inputs, config=None, **kwargs):
+        if self.model_key not in _unsupported_models:
+            try:
+                return self._finish(self.structured_agent.invoke(inputs, config, **kwargs), "structured")
+            except Exception as e:
+                if not _is_unsupported_error(e):
+                    raise
+                with _unsupported_lock:
+                    _unsupported_models.add(self.model_key)
+                print(f"{self.name}: structured output not supported by '{self.model_key}', falling back to TOON ({e})")
+        return self._finish(self.toon_agent.invoke(inputs, config, **kwargs), "toon")
+
+    def __getattr__(self, attr):
+        return getattr(self.toon_agent, attr)
+
+def with_output_mode(name: str, model, prompt: str, schema: Optional[Type[BaseModel]],
+                     build_agent: Callable[[Any, str], Any], structured: Optional[bool] = None):
+    """
+    Build an agent in TOON or structured-output mode.
+
+    Args:
+        name: Agent name, used in the output mode stats
+        model: Chat model (already bound with max_tokens etc.)
+        prompt: System prompt written for TOON output
+        schema: Pydantic response model, or None if the agent has no fixed schema
+        build_agent: Callable (model, prompt) -> agent
+        structured: Use structured output (defaults to the STRUCTURED_OUTPUT env setting)
+    Returns:
+        The TOON agent, or an OutputModeAgent wrapping both variants
+    """
+    if structured is None:
+        structured = STRUCTURED_OUTPUT
+    toon_agent = build_agent(model, prompt)
+    if not structured or schema is None:
+        return toon_agent
+
+    structured_model = model.bind(response_format=json_schema_format(schema))
+    structured_agent = build_agent(structured_model, prompt.rstrip() + "\n" + STRUCTURED_SUFFIX)
+    return OutputModeAgent(name, schema, structured_agent, toon_agent, _model_key(model))
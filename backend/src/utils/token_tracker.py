@@ -1,6 +1,24 @@
 import threading
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from src.utils.tokenizer import count_tokens
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of text from the shared local tokenizer (see src/utils/tokenizer.py)"""
+    return count_tokens(text, model)
+
+def cached_prompt_tokens(usage_data: Dict[str, Any]) -> int:
+    """Prompt tokens served from the provider's prompt cache, across usage payload layouts"""
+    if not usage_data:
+        return 0
+    details = usage_data.get("prompt_tokens_details") or {}
+    return int(
+        details.get("cached_tokens")               # OpenAI / OpenRouter
+        or usage_data.get("prompt_cache_hit_tokens")  # DeepSeek
+        or usage_data.get("cached_tokens")
+        or 0
+    )
 
 class TokenTracker:
     _instance = None
@@ -18,11 +36,18 @@ class TokenTracker:
         self.total_tokens = 0
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.cache_hit_requests = 0
         self.requests = 0
         self.cost_estimate = 0.0
+        # agent -> output mode -> {"runs", "parse_failures"}
+        self.output_modes: Dict[str, Dict[str, Dict[str, int]]] = {}
+        # stage -> prompt tokens before/after context reduction
+        self.context_savings: Dict[str, Dict[str, int]] = {}
         # Approximate costs per 1k tokens (example rates, adjust as needed)
         self.rates = {
             "input": 0.0005,  # $0.50 per 1M tokens
+            "cached_input": 0.00025,  # cached prompt tokens are billed at a discount
             "output": 0.0015  # $1.50 per 1M tokens
         }
 
@@ -33,25 +58,57 @@ class TokenTracker:
         p_tokens = usage_data.get("prompt_tokens", 0)
         c_tokens = usage_data.get("completion_tokens", 0)
         total = usage_data.get("total_tokens", 0)
+        cached = min(cached_prompt_tokens(usage_data), p_tokens)
 
         with self._lock:
             self.prompt_tokens += p_tokens
             self.completion_tokens += c_tokens
             self.total_tokens += total
+            self.cached_prompt_tokens += cached
             self.requests += 1
+            if cached:
+                self.cache_hit_requests += 1
             
             # Calculate cost
-            cost = (p_tokens / 1000 * self.rates["input"]) + (c_tokens / 1000 * self.rates["output"])
+            cost = ((p_tokens - cached) / 1000 * self.rates["input"]) + (cached / 1000 * self.rates["cached_input"]) \
+                + (c_tokens / 1000 * self.rates["output"])
             self.cost_estimate += cost
 
+    def track_context(self, stage: str, original_tokens: int, sent_tokens: int):
+        """Record prompt tokens a stage would have sent vs. what it actually sent"""
+        with self._lock:
+            entry = self.context_savings.setdefault(stage, {"original_tokens": 0, "sent_tokens": 0, "runs": 0})
+            entry["original_tokens"] += original_tokens
+            entry["sent_tokens"] += sent_tokens
+            entry["runs"] += 1
+
+    def track_output_mode(self, agent: str, mode: str, parsed: bool):
+        """Record which output mode (structured/toon) an agent call used and whether it parsed"""
+        with self._lock:
+            entry = self.output_modes.setdefault(agent, {}).setdefault(mode, {"runs": 0, "parse_failures": 0})
+            entry["runs"] += 1
+            if not parsed:
+                entry["parse_failures"] += 1
+
     def get_stats(self) -> Dict[str, Any]:
         with self._lock:
+            context_savings = {
+                stage: {**entry, "saved_tokens": entry["original_tokens"] - entry["sent_tokens"]}
+                for stage, entry in self.context_savings.items()
+            }
             return {
                 "total_tokens": self.total_tokens,
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                "cached_prompt_tokens": self.cached_prompt_tokens,
+                "cache_hit_rate": round(self.cached_prompt_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+                "cache_hit_requests": self.cache_hit_requests,
                 "requests": self.requests,
-                "cost_estimate": round(self.cost_estimate, 6)
+                "cost_estimate": round(self.cost_estimate, 6),
+                "output_modes": {agent: {mode: dict(entry) for mode, entry in modes.items()}
+                                 for agent, modes in self.output_modes.items()},
+                "context_savings": context_savings,
+                "saved_prompt_tokens": sum(entry["saved_tokens"] for entry in context_savings.values())
             }
 
 token_tracker = TokenTracker()
@@ -0,0 +1,189 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config.env import DEFAULT_MODEL
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to the character heuristic
+    tiktoken = None
+
+# Encoding per model name prefix (provider prefixes like "openai/" are stripped).
+# Models from other families have no public BPE in tiktoken; cl100k_base is the
+# closest match and is far nearer their real counts than a characters/3 guess.
+MODEL_ENCODINGS = [
+    ("gpt-4o", "o200k_base"),
+    ("gpt-4.1", "o200k_base"),
+    ("gpt-4.5", "o200k_base"),
+    ("gpt-5", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("o4", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+]
+DEFAULT_ENCODING = "cl100k_base"
+
+# Counts are cached per (encoding, text); longer texts are counted but not cached
+CACHE_SIZE = 8192
+CACHE_MAX_CHARS = 8000
+# Threads tiktoken uses for batch encoding
+BATCH_THREADS = 8
+
+def heuristic_tokens(text: str) -> int:
+    """Conservative token estimate: ~1 token per 3 characters"""
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text) / 3.0))
+
+def encoding_name(model: Optional[str] = None) -> str:
+    """tiktoken encoding name for a model (defaults to DEFAULT_MODEL)"""
+    name = (model or DEFAULT_MODEL or "").split("/")[-1].lower()
+    for prefix, encoding in MODEL_ENCODINGS:
+        if name.startswith(prefix):
+            return encoding
+    return DEFAULT_ENCODING
+
+class Tokenizer:
+    """
+    Local token counter shared by every caller that sizes prompts or chunks.
+
+    Encodings are loaded once per name and counts are kept in an LRU cache.
+    When tiktoken is not installed or an encoding cannot be loaded (its BPE
+    file is fetched on first use; set TIKTOKEN_CACHE_DIR to ship it with the
+    image), counting falls back to the characters/3 heuristic.
+    """
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._encodings: Dict[str, Any] = {}
+        self._cache: "OrderedDict[tuple, int]" = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    def encoding(self, model: Optional[str] = None):
+        """tiktoken encoding for a model, or None when only the heuristic is available"""
+        name = encoding_name(model)
+        with self._lock:
+            if name in self._encodings:
+                return self._encodings[name]
+        encoding = None
+        if tiktoken is not None:
+            try:
+                encoding = tiktoken.get_encoding(name)
+            except Exception as e:
+                print(f"Tokenizer: could not load '{name}' encoding, using character estimate ({e})")
+        with self._lock:
+            self._encodings[name] = encoding
+        return encoding
+
+    def _cached(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            count = self._cache.get(key)
+            if count is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            return count
+
+    def _store(self, key: tuple, count: int) -> None:
+        if len(key[1]) > CACHE_MAX_CHARS:
+            return
+        with self._lock:
+            self._cache[key] = count
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Number of tokens in text for a model"""
+        if not text:
+            return 0
+        encoding = self.encoding(model)
+        if encoding is None:
+            self.fallbacks += 1
+            return heuristic_tokens(text)
+        key = (encoding.name, text)
+        count = self._cached(key)
+        if count is None:
+            self.misses += 1
+            count = len(encoding.encode_ordinary(text))
+            self._store(key, count)
+        return count
+
+    def count_batch(self, texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+        """
+        Token counts for many strings at once.
+
+        Cached strings are answered from the cache; the rest are encoded in one
+        multi-threaded tiktoken batch call.
+
+        Args:
+            texts: Strings to count
+            model: Model the strings are sent to
+        Returns:
+            List of token counts in the order of texts
+        """
+        encoding = self.encoding(model)
+        if encoding is None:
+            self.fallbacks += len(texts)
+            lengths = np.fromiter((len(text or "") for text in texts), dtype=np.int64, count=len(texts))
+            return np.where(lengths > 0, np.maximum(1, np.ceil(lengths / 3.0)), 0).astype(int).tolist()
+
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            if not text:
+                counts[index] = 0
+                continue
+            cached = self._cached((encoding.name, text))
+            if cached is None:
+                missing.setdefault(text, []).append(index)
+            else:
+                counts[index] = cached
+
+        if missing:
+            unique = list(missing)
+            self.misses += len(unique)
+            for text, tokens in zip(unique, encoding.encode_ordinary_batch(unique, num_threads=BATCH_THREADS)):
+                self._store((encoding.name, text), len(tokens))
+                for index in missing[text]:
+                    counts[index] = len(tokens)
+        return counts
+
+    def truncate(self, text: str, max_tokens: int, model: Optional[str] = None) -> str:
+        """Longest prefix of text that fits in max_tokens"""
+        encoding = self.encoding(model)
+        if encoding is None:
+            return text[:max(0, max_tokens) * 3]
+        tokens = encoding.encode_ordinary(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max(0, max_tokens)])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "encodings": {name: encoding is not None for name, encoding in self._encodings.items()},
+                "cached": len(self._cache),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "fallbacks": self.fallbacks,
+            }
+
+tokenizer = Tokenizer()
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens in text for a model (defaults to DEFAULT_MODEL)"""
+    return tokenizer.count(text, model)
+
+def count_tokens_batch(texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+    """Token counts for many strings at once (see Tokenizer.count_batch)"""
+    return tokenizer.count_batch(texts, model)
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Longest prefix of text that fits in max_tokens"""
+    return tokenizer.truncate(text, max_tokens, model)
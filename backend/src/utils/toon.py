@@ -177,17 +177,19 @@ def loads(text: str) -> dict:
 
     return result
 
-def dumps(data: dict, indent: int = 0) -> str:
+def dumps(data: dict, indent: int = 0, delimiter: str = ",") -> str:
     """
     Serializes a dictionary to TOON format.
+    Use delimiter="|" when values may contain commas.
     """
     lines = []
     prefix = " " * indent
+    separator = ", " if delimiter == "," else f" {delimiter} "
     
     for key, value in data.items():
         if isinstance(value, dict):
             lines.append(f"{prefix}{key}:")
-            lines.append(dumps(value, indent + 2))
+            lines.append(dumps(value, indent + 2, delimiter))
         elif isinstance(value, list):
             if not value:
                 lines.append(f"{prefix}{key}: []")
@@ -197,15 +199,15 @@ def dumps(data: dict, indent: int = 0) -> str:
             if isinstance(value[0], dict):
                 lines.append(f"{prefix}{key}:")
                 headers = list(value[0].keys())
-                lines.append(f"{prefix}  " + ", ".join(headers))
+                lines.append(f"{prefix}  " + separator.join(headers))
                 for item in value:
                     row = []
                     for h in headers:
                         row.append(str(item.get(h, "")))
-                    lines.append(f"{prefix}  " + ", ".join(row))
+                    lines.append(f"{prefix}  " + separator.join(row))
             else:
                 # List of primitives
-                lines.append(f"{prefix}{key}: " + ", ".join(map(str, value)))
+                lines.append(f"{prefix}{key}: " + separator.join(map(str, value)))
         else:
             lines.append(f"{prefix}{key}: {value}")
             
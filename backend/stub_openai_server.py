@@ -0,0 +1,167 @@
+"""
+Minimal OpenAI-compatible server for exercising endpoint routing and the batch API locally.
+
+Implements POST /v1/chat/completions plus the batch interface used by
+src.services.batch.provider_batch: POST /v1/files, POST /v1/batches,
+GET /v1/batches/{id} and GET /v1/files/{id}/content. Batches report
+"in_progress" on the first poll and complete on the next one.
+
+Usage:
+    python stub_openai_server.py [port] [latency_seconds] [failure_rate]
+
+Point OPENAI_API_BASES at several instances, e.g.
+    OPENAI_API_BASES=http://127.0.0.1:8101/v1,http://127.0.0.1:8102/v1
+"""
+import sys
+import json
+import time
+import random
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+REPLY = "summary:\n  verdict: stub response"
+
+# Canned TOON replies for batch requests, picked by the agent's system prompt
+AGENT_REPLIES = {
+    "You are Product": """name: Stub App
+description: Stub product description
+features:
+  name | reason | goal_oriented | development_time | cost_estimate
+  Sync | Keep devices in sync | 0.8 | 2 weeks | 5000.0
+  Reports | Weekly progress reports | 0.6 | 1 week | 2000.0""",
+    "You are Engineer": """analysis:
+  feasibility_score: 0.8
+  tech_stack:
+    frontend:
+      - React
+    backend:
+      - FastAPI
+    database:
+      - PostgreSQL
+    infrastructure:
+      - Docker
+  technical_challenges:
+    title | severity | description | mitigation
+    Sync conflicts | High | Concurrent edits | Last-write-wins with history
+  implementation_plan:
+    phase | duration | description
+    Phase 1: MVP | 4 weeks | Core features""",
+    "You are Risk Assessment": """done: true
+summary: Low overall risk
+recommendations:
+  - Add a consent banner
+features:
+  feature | law_interaction | is_potential_risk | potential_risk | border_line_thing | gdpr_compliance | data_retention | user_consent | risk_level | mitigation
+  Sync | GDPR | true | Personal data stored | None | Partial | 30 days | Required | medium | Encrypt at rest""",
+}
+
+def _completion(request: dict) -> dict:
+    system = next((m.get("content") or "" for m in request.get("messages", []) if m.get("role") == "system"), "")
+    reply = next((text for marker, text in AGENT_REPLIES.items() if marker in system), REPLY)
+    return {
+        "id": f"stub-{time.time_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "system_fingerprint": "fp_stub",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+def make_handler(latency: float, failure_rate: float):
+    files = {}
+    batches = {}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body, content_type: str = "application/json"):
+            data = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def _upload(self, body: bytes) -> dict:
+            # multipart/form-data with "purpose" and "file" parts
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+            parts = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+            file_id = f"file-{len(files) + 1}"
+            files[file_id] = parts["file"].get_payload(decode=True)
+            return {"id": file_id, "object": "file", "bytes": len(files[file_id]),
+                    "purpose": parts["purpose"].get_content().strip(), "filename": parts["file"].get_filename()}
+
+        def _run_batch(self, batch: dict) -> None:
+            output = []
+            for line in files[batch["input_file_id"]].decode().splitlines():
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                output.append(json.dumps({"id": f"req-{len(output) + 1}", "custom_id": request["custom_id"],
+                                          "response": {"status_code": 200, "body": _completion(request["body"])},
+                                          "error": None}))
+            file_id = f"file-{len(files) + 1}"
+            files[file_id] = ("\n".join(output) + "\n").encode()
+            batch.update(status="completed", output_file_id=file_id,
+                         request_counts={"total": len(output), "completed": len(output), "failed": 0})
+
+        def do_POST(self):
+            body = self._body()
+            time.sleep(latency)
+            if random.random() < failure_rate:
+                self._send(503, {"error": {"message": "stub endpoint unavailable", "type": "server_error"}})
+                return
+            if self.path.endswith("/files"):
+                self._send(200, self._upload(body))
+            elif self.path.endswith("/batches"):
+                request = json.loads(body or b"{}")
+                batch_id = f"batch-{len(batches) + 1}"
+                batches[batch_id] = {"id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                                     "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+                                     "status": "validating", "created_at": int(time.time()), "polls": 0}
+                self._send(200, batches[batch_id])
+            else:
+                self._send(200, _completion(json.loads(body or b"{}")))
+
+        def do_GET(self):
+            parts = self.path.rstrip("/").split("/")
+            if "batches" in parts and parts[-1] in batches:
+                batch = batches[parts[-1]]
+                batch["polls"] += 1
+                if batch["polls"] == 1:
+                    batch["status"] = "in_progress"
+                elif batch["status"] != "completed":
+                    self._run_batch(batch)
+                self._send(200, {key: value for key, value in batch.items() if key != "polls"})
+            elif parts[-1] == "content" and parts[-2] in files:
+                self._send(200, files[parts[-2]], "application/jsonl")
+            else:
+                self._send(404, {"error": {"message": f"unknown path {self.path}", "type": "invalid_request_error"}})
+
+    return StubHandler
+
+def serve(port: int, latency: float = 0.0, failure_rate: float = 0.0, background: bool = False) -> ThreadingHTTPServer:
+    """Start a stub server; with background=True it runs on a daemon thread"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, failure_rate))
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        print(f"Stub OpenAI server on http://127.0.0.1:{port}/v1 (latency {latency}s, failure rate {failure_rate})")
+        server.serve_forever()
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8101
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    failure_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    serve(port, latency, failure_rate)
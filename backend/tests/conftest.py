@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+@pytest.fixture
+def stub_server():
+    """Local OpenAI-compatible stub server; yields its /v1 base URL"""
+    from stub_openai_server import serve
+
+    server = serve(0, background=True)
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,166 @@
+import math
+
+import pytest
+
+from src.utils.analytics import (
+    attach_customer_graph,
+    compute_analytics,
+    customer_graph,
+    feature_metrics,
+    parse_cost,
+    parse_duration_weeks,
+    parse_monthly_price,
+    parse_score,
+    risk_histogram,
+    timeline_metrics,
+)
+
+@pytest.mark.parametrize("text, expected", [
+    ("$5,000", 5000.0),
+    ("5k USD", 5000.0),
+    ("$10-20k", 15000.0),
+    ("$500 - 2k", 1250.0),
+    ("2-3k", 2500.0),
+    ("about 3 to 4k", 3500.0),
+    ("1.5m", 1500000.0),
+    ("Approx 2 developers, $8000", 8000.0),
+    ("2 devs, 8000 USD", 8000.0),
+    (1200, 1200.0),
+])
+def test_parse_cost(text, expected):
+    assert parse_cost(text) == expected
+
+@pytest.mark.parametrize("value", [None, True, "TBD", ""])
+def test_parse_cost_unknown(value):
+    assert math.isnan(parse_cost(value))
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 weeks", 2.0),
+    ("10 days", 2.0),
+    ("1-2 months", 1.5 * 52 / 12),
+    ("3 to 5 wks", 4.0),
+    ("2 sprints", 4.0),
+    ("1 quarter", 13.0),
+    ("80 hours", 2.0),
+    ("6", 6.0),
+    (3, 3.0),
+])
+def test_parse_duration_weeks(text, expected):
+    assert parse_duration_weeks(text) == pytest.approx(expected)
+
+@pytest.mark.parametrize("value", [None, False, "soon"])
+def test_parse_duration_weeks_unknown(value):
+    assert math.isnan(parse_duration_weeks(value))
+
+@pytest.mark.parametrize("value, expected", [
+    (0.75, 0.75),
+    ("80%", 0.8),
+    ("8/10", 0.8),
+    (7, 0.7),
+    (85, 0.85),
+    ("High", 0.8),
+    ("very low", 0.1),
+    (-1, 0.0),
+])
+def test_parse_score(value, expected):
+    assert parse_score(value) == pytest.approx(expected)
+
+@pytest.mark.parametrize("value", [None, True, "unclear", []])
+def test_parse_score_unknown(value):
+    assert math.isnan(parse_score(value))
+
+@pytest.mark.parametrize("text, expected", [
+    ("$10/mo", 10.0),
+    ("$120/year", 10.0),
+    ("$60 annually", 5.0),
+    ("Free", 0.0),
+    ("Freemium, $5/mo", 5.0),
+])
+def test_parse_monthly_price(text, expected):
+    assert parse_monthly_price(text) == pytest.approx(expected)
+
+def test_parse_monthly_price_unknown():
+    assert math.isnan(parse_monthly_price("Contact sales"))
+    assert math.isnan(parse_monthly_price(None))
+
+def test_feature_metrics():
+    metrics = feature_metrics([
+        {"cost_estimate": "$1,000", "development_time": "2 weeks", "goal_oriented": 0.5},
+        {"cost_estimate": "$3k", "development_time": "1 month", "goal_oriented": "90%"},
+        {"cost_estimate": "TBD", "development_time": "10 days", "goal_oriented": "high"},
+    ])
+    assert metrics["count"] == 3
+    assert metrics["total_cost"] == 4000.0
+    assert metrics["total_dev_weeks"] == round(2 + 52 / 12 + 2, 1)
+    assert metrics["longest_feature_weeks"] == round(52 / 12, 1)
+    assert metrics["avg_goal_score"] == round((0.5 + 0.9 + 0.8) / 3, 2)
+    assert metrics["cost_weighted_goal_score"] == 0.8
+    assert metrics["unparsed"] == 1
+
+def test_timeline_critical_path_from_plan():
+    timeline = timeline_metrics([
+        {"phase": "Design", "duration": "2 weeks"},
+        {"phase": "Build", "duration": "1-2 months"},
+        {"phase": "Launch", "duration": "unknown"},
+        {"phase": "Beta", "duration": "10 days"},
+    ], features=[{"development_time": "52 weeks"}])
+
+    assert timeline["source"] == "implementation_plan"
+    assert timeline["critical_path_weeks"] == 10.5
+    assert timeline["critical_path_months"] == round(10.5 * 12 / 52, 1)
+    assert timeline["phases"] == [
+        {"phase": "Design", "start_week": 0.0, "end_week": 2.0},
+        {"phase": "Build", "start_week": 2.0, "end_week": 8.5},
+        {"phase": "Launch", "start_week": 8.5, "end_week": 8.5},
+        {"phase": "Beta", "start_week": 8.5, "end_week": 10.5},
+    ]
+
+def test_timeline_falls_back_to_sequential_features():
+    timeline = timeline_metrics([], [{"development_time": "2 weeks"}, {"development_time": "3 weeks"}, {}])
+    assert timeline == {"critical_path_weeks": 5.0, "critical_path_months": 1.2, "source": "features", "phases": []}
+
+def test_risk_histogram():
+    histogram = risk_histogram([
+        {"risk_level": "High", "is_potential_risk": True},
+        {"risk_level": "high", "is_potential_risk": "yes"},
+        {"risk_level": "low", "is_potential_risk": False},
+        {"risk_level": "severe"},
+        {},
+        "not a row",
+    ])
+    assert histogram == {
+        "levels": {"low": 1, "medium": 0, "high": 2, "critical": 0, "severe": 1, "unknown": 1},
+        "potential_risks": 2,
+        "assessed": 5,
+    }
+
+def test_compute_analytics_skips_stages_that_have_not_run():
+    analytics = compute_analytics({"product": {"features": [{"cost_estimate": "$100", "development_time": "1 week"}]}})
+    assert set(analytics) == {"features", "timeline"}
+    assert analytics["timeline"]["source"] == "features"
+    assert compute_analytics({}) == {}
+
+MARKET = {"competitors": [
+    {"name": "Habitica", "pricing": "Free", "pros": ["Gamified", "Large community"], "cons": "Cluttered UI"},
+    {"name": "Streaks", "pricing": "$60/year", "pros": "Simple; widgets; Apple Health", "cons": []},
+    {"name": "Mystery", "pricing": "Contact sales"},
+]}
+
+def test_customer_graph_rows():
+    graph = customer_graph(MARKET, [{"name": "Reminders"}, {"name": "Streaks"}, {"name": "Reports"}], "Habit App")
+    assert graph == {"type": "bar", "data_in_table": [
+        {"name": "Habitica", "monthly_price": 0.0, "pros": 2, "cons": 1},
+        {"name": "Streaks", "monthly_price": 5.0, "pros": 3, "cons": 0},
+        {"name": "Mystery", "monthly_price": None, "pros": 0, "cons": 0},
+        {"name": "Habit App", "monthly_price": None, "pros": None, "cons": None, "features": 3, "is_product": True},
+    ]}
+
+def test_customer_graph_without_product():
+    assert customer_graph({}, []) == {"type": "bar", "data_in_table": []}
+
+def test_attach_customer_graph_replaces_model_graph():
+    customer = {"market_analysis": {**MARKET, "graph": {"type": "pie", "data_in_table": [{"x": 1}]}}}
+    attach_customer_graph(customer, {"name": "Habit App", "features": [{"name": "Reminders"}]})
+    rows = customer["market_analysis"]["graph"]["data_in_table"]
+    assert [row["name"] for row in rows] == ["Habitica", "Streaks", "Mystery", "Habit App"]
+    assert rows[-1]["features"] == 1
@@ -0,0 +1,74 @@
+from typing import Any, List
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.api import api
+from src.utils.checkpoint import get_checkpointer
+
+PRODUCT = ('{"name": "Habit App", "description": "Habit tracker", "features": ['
+           + ", ".join('{"name": "F%d", "reason": "r", "goal_oriented": 0.8, "development_time": "1 week", '
+                       '"cost_estimate": 100}' % i for i in range(5)) + "]}")
+
+class _ScriptedModel(BaseChatModel):
+    """Chat model answering from a script and recording the prompts it saw"""
+
+    answers: List[str]
+    prompts: List[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append([m.content for m in messages])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answers.pop(0)))])
+
+@pytest.fixture
+def client(monkeypatch):
+    model = _ScriptedModel(answers=[
+        '{"done": false, "resp": [{"question": "Who are the users?", "answer": ""}]}',
+        '{"done": true, "resp": []}',
+        PRODUCT,
+    ], prompts=[])
+    monkeypatch.setattr(api, "get_model", lambda **kwargs: model)
+    monkeypatch.setattr(api, "generate_mermaid_link", lambda *args, **kwargs: None)
+    return TestClient(api.app), model
+
+def _saved_messages(thread_id):
+    saved = get_checkpointer().get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+    return [m.content for m in saved.checkpoint["channel_values"]["messages"]] if saved else []
+
+def test_clarify_with_thread_id_resumes_saved_conversation(client):
+    client, model = client
+    idea = "Start gathering requirements for a new mobile app based on this: a habit tracker."
+    first = client.post("/clarify", json={"messages": [{"role": "user", "content": idea}], "thread_id": "api-1"})
+    assert first.json()["thread_id"] == "api-1" and first.json()["done"] is False
+
+    # Only the new turn is sent; the earlier ones come from the checkpointer
+    second = client.post("/clarify", json={"messages": [{"role": "user", "content": "Remote teams"}], "thread_id": "api-1"})
+    assert second.json()["done"] is True
+    assert model.prompts[1][1:] == [idea, first.json()["response"], "Remote teams"]
+    assert len(_saved_messages("api-1")) == 4
+
+    product = client.post("/generate_product", json={"thread_id": "api-1"})
+    assert product.status_code == 200
+    assert product.json()["product_data"]["name"] == "Habit App"
+    # Requirements came from the compacted clarifier thread
+    assert "requirements:" in model.prompts[2][-1] and "habit tracker" in model.prompts[2][-1]
+    assert _saved_messages("api-1:product")[-1] == PRODUCT
+
+def test_clarify_without_thread_id_is_stateless(client):
+    client, _ = client
+    threads = get_checkpointer().stats()["threads"]
+    response = client.post("/clarify", json={"messages": [{"role": "user", "content": "an idea"}]})
+    assert response.json()["thread_id"] is None
+    assert get_checkpointer().stats()["threads"] == threads
+
+def test_generate_product_needs_requirements_or_saved_thread(client):
+    client, _ = client
+    assert client.post("/generate_product", json={"thread_id": "unknown-thread"}).status_code == 400
+    assert client.post("/generate_product", json={}).status_code == 400
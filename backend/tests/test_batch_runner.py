@@ -0,0 +1,73 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.batch import batch_runner
+
+def _write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+def _read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+@pytest.fixture
+def stub_pipeline(monkeypatch):
+    """Run jobs in threads through a stub pipeline that records which ids ran"""
+    ran = []
+
+    def fake_run_pipeline(job):
+        ran.append(job["id"])
+        return {"id": job["id"], "idea": job["idea"], "status": "ok", "result": {}}
+
+    monkeypatch.setattr(batch_runner, "run_pipeline", fake_run_pipeline)
+    monkeypatch.setattr(batch_runner, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return ran
+
+@pytest.fixture
+def ideas(tmp_path):
+    path = tmp_path / "ideas.jsonl"
+    _write_jsonl(path, [{"id": f"idea-{i}", "idea": f"Idea number {i}"} for i in range(1, 4)])
+    return path
+
+def test_resume_skips_completed_ids(stub_pipeline, ideas, tmp_path):
+    output = tmp_path / "results.jsonl"
+    _write_jsonl(output, [{"id": "idea-1", "status": "ok"}, {"id": "idea-2", "status": "error"}])
+
+    summary = batch_runner.run_batch(str(ideas), str(output), workers=1)
+
+    assert stub_pipeline == ["idea-3"]
+    assert summary["skipped"] == 2
+    assert summary["ok"] == 1
+
+def test_retry_errors_replaces_failed_record(stub_pipeline, ideas, tmp_path):
+    output = tmp_path / "results.jsonl"
+    _write_jsonl(output, [{"id": "idea-1", "status": "ok"}, {"id": "idea-2", "status": "error"}])
+
+    batch_runner.run_batch(str(ideas), str(output), workers=1, retry_errors=True)
+    assert sorted(stub_pipeline) == ["idea-2", "idea-3"]
+
+    # A second resume drops the superseded error line so each id appears once
+    completed = batch_runner.load_completed_ids(str(output), retry_errors=True)
+    records = _read_jsonl(output)
+    assert sorted(r["id"] for r in records) == ["idea-1", "idea-2", "idea-3"]
+    assert all(r["status"] == "ok" for r in records)
+    assert completed == {"idea-1", "idea-2", "idea-3"}
+
+def test_later_record_wins_when_resuming(tmp_path):
+    output = tmp_path / "results.jsonl"
+    _write_jsonl(output, [
+        {"id": "a", "status": "ok"},
+        {"id": "b", "status": "ok"},
+        {"id": "b", "status": "error"},
+    ])
+
+    assert batch_runner.load_completed_ids(str(output), retry_errors=True) == {"a"}
+    assert _read_jsonl(output) == [{"id": "a", "status": "ok"}, {"id": "b", "status": "error"}]
+
+def test_truncated_line_is_dropped(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"id": "a", "status": "ok"}\n{"id": "b", "sta', encoding="utf-8")
+
+    assert batch_runner.load_completed_ids(str(output)) == {"a"}
+    assert _read_jsonl(output) == [{"id": "a", "status": "ok"}]
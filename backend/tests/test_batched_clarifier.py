@@ -0,0 +1,123 @@
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.utils.helper import (
+    DEFAULT_ANSWER,
+    auto_answer_from_idea,
+    format_batched_answers,
+    match_answer,
+    run_batched_clarifier,
+)
+
+IDEA = (
+    "A habit tracker that sends Slack reminders. It is built for remote software teams. "
+    "Sold as a monthly subscription per seat."
+)
+
+def _clarifier_reply(questions, done=False):
+    return AIMessage(content=json.dumps({
+        "done": done,
+        "resp": [{"question": q, "answer": ""} for q in questions],
+    }))
+
+class StubClarifier:
+    """Replays one scripted reply per invoke and records the messages it was sent"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def invoke(self, state, config=None):
+        self.calls.append(list(state["messages"]))
+        return {"messages": state["messages"] + [self.replies.pop(0)]}
+
+def test_match_answer_exact_key_ignores_case_and_whitespace():
+    answers = {"Who is the target audience?": "Remote teams"}
+    assert match_answer("  who is the TARGET audience? ", answers) == "Remote teams"
+
+def test_match_answer_falls_back_to_keyword_overlap():
+    answers = {
+        "Who is the target audience?": "Remote teams",
+        "How will you monetize it?": "Subscription",
+    }
+    assert match_answer("Which audience are you targeting first?", answers) == "Remote teams"
+    assert match_answer("What monetize strategy do you prefer?", answers) == "Subscription"
+
+def test_match_answer_without_overlap_returns_none():
+    assert match_answer("What should it be called?", {"Who is the target audience?": "Teams"}) is None
+    assert match_answer("Anything?", {}) is None
+
+def test_match_answer_uses_list_position():
+    answers = ["Remote teams", 42]
+    assert match_answer("Who is it for?", answers, 0) == "Remote teams"
+    assert match_answer("Budget?", answers, 1) == "42"
+    assert match_answer("Platform?", answers, 2) is None
+
+def test_auto_answer_prefers_the_sentence_on_the_question_topic():
+    assert auto_answer_from_idea("Who is the target audience?", IDEA) == \
+        "It is built for remote software teams."
+    assert auto_answer_from_idea("What reminders should it send?", IDEA) == \
+        "A habit tracker that sends Slack reminders."
+
+def test_auto_answer_without_a_matching_sentence():
+    assert auto_answer_from_idea("What colour scheme?", IDEA) is None
+    assert auto_answer_from_idea("Who is the target audience?", "") is None
+
+def test_format_batched_answers_escapes_table_separators():
+    text = format_batched_answers([{"question": "Web | mobile?", "answer": "Both\nweb first"}])
+    assert "  Web / mobile? | Both web first" in text
+    assert text.startswith("User answered all questions:")
+    assert "Still uncovered" not in text
+
+def test_format_batched_answers_lists_uncovered_slots():
+    text = format_batched_answers([{"question": "Q", "answer": "A"}], missing=["platform", "monetization"])
+    assert text.splitlines()[-1].startswith("Still uncovered: platform, monetization.")
+
+def test_batched_clarifier_answers_every_question_in_one_turn():
+    agent = StubClarifier([
+        _clarifier_reply(["Who is the target audience?", "What should it be called?", "Which platforms?"]),
+        _clarifier_reply([], done=True),
+    ])
+    clarifier_obj, messages, qa_pairs = run_batched_clarifier(
+        agent, HumanMessage(content="idea"), {}, idea=IDEA,
+        answers={"Which platforms should it run on?": "iOS and web"}, auto_answer=True,
+    )
+
+    assert clarifier_obj.done
+    assert len(agent.calls) == 2
+    assert [pair["answer"] for pair in qa_pairs] == [
+        "It is built for remote software teams.", DEFAULT_ANSWER, "iOS and web",
+    ]
+    batched = agent.calls[1][-1]
+    assert isinstance(batched, HumanMessage)
+    assert "Which platforms? | iOS and web" in batched.content
+
+def test_batched_clarifier_without_auto_answer_uses_default():
+    agent = StubClarifier([_clarifier_reply(["Who is the target audience?"]), _clarifier_reply([], done=True)])
+    _, _, qa_pairs = run_batched_clarifier(agent, HumanMessage(content="idea"), {}, idea=IDEA)
+    assert qa_pairs == [{"question": "Who is the target audience?", "answer": DEFAULT_ANSWER}]
+
+def test_batched_clarifier_stops_at_max_rounds():
+    agent = StubClarifier([_clarifier_reply([f"Question {i}?"]) for i in range(5)])
+    clarifier_obj, _, qa_pairs = run_batched_clarifier(agent, HumanMessage(content="idea"), {}, max_rounds=3)
+
+    # The last round's questions are left unanswered instead of triggering another call
+    assert len(agent.calls) == 3
+    assert [pair["question"] for pair in qa_pairs] == ["Question 0?", "Question 1?"]
+    assert not clarifier_obj.done
+
+def test_batched_clarifier_stops_when_reply_cannot_be_parsed():
+    agent = StubClarifier([AIMessage(content="I need more details."), _clarifier_reply([])])
+    clarifier_obj, _, qa_pairs = run_batched_clarifier(agent, HumanMessage(content="idea"), {})
+    assert clarifier_obj is None
+    assert qa_pairs == []
+    assert len(agent.calls) == 1
+
+def test_batched_clarifier_uses_first_agent_for_the_first_round():
+    first = StubClarifier([_clarifier_reply(["Who is the target audience?"])])
+    rest = StubClarifier([_clarifier_reply([], done=True)])
+    results = []
+    run_batched_clarifier(rest, HumanMessage(content="idea"), {}, first_agent=first, on_result=results.append)
+    assert len(first.calls) == 1 and len(rest.calls) == 1
+    assert len(results) == 2
@@ -0,0 +1,129 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, MessagesState, StateGraph
+
+from src.utils.checkpoint import BoundedMemorySaver, SqliteCheckpointSaver
+
+def _echo_graph(checkpointer):
+    """One-node graph that answers every message with its running message count"""
+    graph = StateGraph(MessagesState)
+    graph.add_node("echo", lambda state: {"messages": [AIMessage(content=f"seen {len(state['messages'])}")]})
+    graph.add_edge(START, "echo")
+    return graph.compile(checkpointer=checkpointer)
+
+def _say(app, thread_id: str, text: str = "hi") -> str:
+    config = {"configurable": {"thread_id": thread_id}}
+    return app.invoke({"messages": [HumanMessage(content=text)]}, config)["messages"][-1].content
+
+def test_memory_saver_keeps_conversation_state():
+    app = _echo_graph(BoundedMemorySaver())
+    assert _say(app, "a") == "seen 1"
+    assert _say(app, "a") == "seen 3"
+    assert _say(app, "b") == "seen 1"
+
+def test_memory_saver_evicts_least_recently_used_thread():
+    saver = BoundedMemorySaver(max_threads=2, ttl_seconds=0)
+    app = _echo_graph(saver)
+    _say(app, "a")
+    _say(app, "b")
+    _say(app, "a")
+    _say(app, "c")
+
+    assert set(saver.storage) == {"a", "c"}
+    assert saver.stats()["threads"] == 2 and saver.evictions == 1
+    assert _say(app, "a") == "seen 5"
+    assert _say(app, "b") == "seen 1"
+
+def test_memory_saver_evicts_idle_threads(monkeypatch):
+    saver = BoundedMemorySaver(ttl_seconds=60)
+    app = _echo_graph(saver)
+    _say(app, "old")
+
+    clock = time.monotonic() + 120
+    monkeypatch.setattr("src.utils.checkpoint.time.monotonic", lambda: clock)
+    _say(app, "new")
+    assert set(saver.storage) == {"new"}
+
+def test_memory_saver_byte_cap_keeps_current_thread():
+    saver = BoundedMemorySaver(ttl_seconds=0, max_bytes=1)
+    app = _echo_graph(saver)
+    _say(app, "a")
+    _say(app, "b")
+
+    assert set(saver.storage) == {"b"}
+    assert saver.stats()["bytes"] > 0
+    assert not any(key[0] == "a" for key in saver.blobs)
+
+def test_memory_saver_delete_thread_releases_bytes():
+    saver = BoundedMemorySaver(ttl_seconds=0)
+    app = _echo_graph(saver)
+    _say(app, "a")
+    saver.delete_thread("a")
+
+    assert saver.stats()["threads"] == 0 and saver.stats()["bytes"] == 0
+    assert not saver.blobs and not saver.writes
+
+def _sqlite(tmp_path, **kwargs):
+    return SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), **kwargs)
+
+def test_sqlite_conversation_resumes_in_new_saver(tmp_path):
+    saver = _sqlite(tmp_path)
+    _say(_echo_graph(saver), "a", "a" * 2000)
+    saver.close()
+
+    resumed = _sqlite(tmp_path)
+    app = _echo_graph(resumed)
+    assert _say(app, "a") == "seen 3"
+    messages = app.get_state({"configurable": {"thread_id": "a"}}).values["messages"]
+    assert messages[0].content == "a" * 2000
+    resumed.close()
+
+def test_sqlite_prunes_history_to_keep_last(tmp_path):
+    saver = _sqlite(tmp_path, keep_last=2)
+    app = _echo_graph(saver)
+    for _ in range(3):
+        _say(app, "a")
+
+    config = {"configurable": {"thread_id": "a"}}
+    assert len(list(saver.list(config))) == 2
+    live = {(channel, str(version)) for item in saver.list(config)
+            for channel, version in item.checkpoint["channel_versions"].items()}
+    stored = set(saver.conn.execute("SELECT channel, version FROM blobs WHERE thread_id = 'a'").fetchall())
+    assert stored == live
+    assert _say(app, "a") == "seen 7"
+    saver.close()
+
+def test_sqlite_expires_idle_threads(tmp_path):
+    saver = _sqlite(tmp_path, ttl_seconds=60, max_bytes=0)
+    app = _echo_graph(saver)
+    _say(app, "old")
+    _say(app, "new")
+    saver.conn.execute("UPDATE threads SET updated_at = updated_at - 120 WHERE thread_id = 'old'")
+
+    assert saver.cleanup(keep="new") == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "old"}}) is None
+    assert saver.stats()["threads"] == 1 and saver.evictions == 1
+    saver.close()
+
+def test_sqlite_size_cap_evicts_oldest_but_keeps_current(tmp_path):
+    saver = _sqlite(tmp_path, ttl_seconds=0, max_bytes=1)
+    app = _echo_graph(saver)
+    _say(app, "a")
+    _say(app, "b")
+
+    assert saver.cleanup(keep="b") == 1
+    threads = [row[0] for row in saver.conn.execute("SELECT thread_id FROM threads")]
+    assert threads == ["b"]
+    assert saver.get_tuple({"configurable": {"thread_id": "b"}}) is not None
+    saver.close()
+
+def test_sqlite_delete_thread(tmp_path):
+    saver = _sqlite(tmp_path)
+    app = _echo_graph(saver)
+    _say(app, "a")
+    saver.delete_thread("a")
+
+    for table in ("checkpoints", "blobs", "writes", "threads"):
+        assert saver.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+    saver.close()
@@ -0,0 +1,74 @@
+import pytest
+
+from src.utils.helper import DEFAULT_ANSWER, ClarifierCoverage, idea_features, question_topic
+
+THIN_IDEAS = [
+    "A tool for teams to track tasks on web with a paid plan",
+    "An app for users to chat",
+    "A paid platform that lets people share photos",
+    "A habit tracker",
+]
+
+RICH_IDEA = (
+    "A habit tracker for remote software teams on iOS and web. It sends Slack reminders, "
+    "shows streak leaderboards and emails weekly reports. Sold as a $5 per seat monthly "
+    "subscription and must be GDPR compliant."
+)
+
+QUESTIONS = {
+    "Who is the target audience?": "audience",
+    "What core features should the MVP include?": "features",
+    "How will you monetize?": "monetization",
+    "Which platforms should it run on?": "platform",
+    "What features do users need most?": "features",
+    "How will users pay for it?": "monetization",
+    "Are there budget or compliance constraints?": "constraints",
+    "What are the main pain points of your users?": "audience",
+    "What should the app be called?": None,
+}
+
+@pytest.mark.parametrize("question, topic", QUESTIONS.items())
+def test_question_topic(question, topic):
+    assert question_topic(question) == topic
+
+@pytest.mark.parametrize("idea", THIN_IDEAS)
+def test_thin_idea_does_not_cover_enough(idea):
+    coverage = ClarifierCoverage(idea, threshold=0.8)
+    assert coverage.coverage <= 0.2
+    assert not coverage.sufficient()
+    for question in ("Who is the target audience?", "What core features should the MVP include?",
+                     "How will you monetize?"):
+        assert not coverage.answered_by_idea(question)
+
+def test_thin_idea_keeps_explicit_platform():
+    coverage = ClarifierCoverage(THIN_IDEAS[0], threshold=0.8)
+    assert coverage.missing == ["audience", "features", "monetization", "constraints"]
+    assert coverage.answered_by_idea("Which platforms should it run on?")
+
+def test_rich_idea_covers_every_slot():
+    coverage = ClarifierCoverage(RICH_IDEA, threshold=0.8)
+    assert coverage.missing == []
+    assert coverage.sufficient()
+    assert coverage.answered_by_idea("Who is the target audience?")
+    assert coverage.answered_by_idea("How will you monetize?")
+
+def test_features_need_several_distinct_capabilities():
+    assert idea_features("track tasks and track time") == ["track"]
+    assert len(idea_features(RICH_IDEA)) >= 3
+
+def test_record_fills_only_the_questions_slot():
+    coverage = ClarifierCoverage("", threshold=0.8)
+    coverage.record("What features do users need most?", "Shared lists and reminders")
+    assert coverage.filled == {"features": "What features do users need most?"}
+
+@pytest.mark.parametrize("answer", ["", "n/a", "no idea", "skip", DEFAULT_ANSWER])
+def test_non_answers_do_not_fill_slots(answer):
+    coverage = ClarifierCoverage("", threshold=0.8)
+    coverage.record("Who is the target audience?", answer)
+    assert "audience" not in coverage.filled
+
+def test_skip_answers_from_the_idea():
+    coverage = ClarifierCoverage(RICH_IDEA, threshold=0.8)
+    answer = coverage.skip("Which platforms should it run on?")
+    assert "iOS" in answer
+    assert coverage.report()["skipped_questions"] == 1
@@ -0,0 +1,75 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.utils.compaction import build_requirements_record, compact_clarifier_history, extract_requirements
+from src.utils.helper import format_batched_answers
+from src.utils.token_tracker import estimate_tokens
+
+IDEA = "A habit tracker for remote teams with shared streaks and weekly reports"
+INITIAL = HumanMessage(content=f"Start gathering requirements for a new mobile app based on this: {IDEA}. "
+                               f"Only ask 3 critical questions that require user input.")
+
+def _interactive_history(answer="Remote engineering teams of 5-50 people"):
+    return [
+        INITIAL,
+        AIMessage(content='{"questions": ["Who are the target users?"], "done": false}'),
+        HumanMessage(content=f"User answered: 'Who are the target users?' -> '{answer}'"),
+        AIMessage(content='{"questions": ["Which platforms?"], "done": false}'),
+        HumanMessage(content="User answered: 'Which platforms?' -> 'iOS and Android'"),
+        AIMessage(content='{"done": true}'),
+    ]
+
+def test_extract_interactive_answers():
+    idea, qa_pairs = extract_requirements(_interactive_history())
+    assert idea == IDEA
+    assert qa_pairs == [
+        {"question": "Who are the target users?", "answer": "Remote engineering teams of 5-50 people"},
+        {"question": "Which platforms?", "answer": "iOS and Android"},
+    ]
+
+def test_extract_batched_answer_table():
+    batched = format_batched_answers([
+        {"question": "Who are the target users?", "answer": "Remote teams"},
+        {"question": "How will it make money?", "answer": "Per-seat subscription"},
+    ])
+    idea, qa_pairs = extract_requirements([INITIAL, AIMessage(content="{}"), HumanMessage(content=batched)])
+    assert idea == IDEA
+    assert qa_pairs == [
+        {"question": "Who are the target users?", "answer": "Remote teams"},
+        {"question": "How will it make money?", "answer": "Per-seat subscription"},
+    ]
+
+def test_record_skips_empty_answers_and_escapes_pipes():
+    record = build_requirements_record("  An   app ", [
+        {"question": "Pricing?", "answer": "Free | paid tier"},
+        {"question": "Skipped?", "answer": "  "},
+    ])
+    assert record == ("requirements:\n  idea: An app\n  answers:\n    question | answer\n"
+                      "    Pricing? | Free / paid tier")
+
+def test_compacted_message_is_smaller_than_history():
+    message, report = compact_clarifier_history(_interactive_history())
+    assert isinstance(message, HumanMessage)
+    assert "Which platforms? | iOS and Android" in message.content
+    assert report["answers"] == 2
+    assert report["compacted_tokens"] == estimate_tokens(message.content)
+    assert report["saved_tokens"] == report["original_tokens"] - report["compacted_tokens"] > 0
+
+def test_budget_shortens_answers_before_the_idea():
+    long_answer = "Remote engineering teams " * 60
+    unbounded, _ = compact_clarifier_history(_interactive_history(long_answer))
+    message, report = compact_clarifier_history(_interactive_history(long_answer), budget_tokens=120)
+
+    assert report["compacted_tokens"] <= 120 < estimate_tokens(unbounded.content)
+    assert f"idea: {IDEA}" in message.content
+    assert "Who are the target users? | Remote engineering teams" in message.content
+    assert "..." in message.content
+
+def test_budget_truncates_the_idea_last():
+    idea = "A habit tracker " + "with many detailed features " * 80
+    history = [HumanMessage(content=f"based on this: {idea}. Only ask 3 critical questions"),
+               HumanMessage(content="User answered: 'Which platforms?' -> 'iOS'")]
+    message, report = compact_clarifier_history(history, budget_tokens=80)
+
+    assert "Which platforms? | iOS" in message.content
+    assert "idea: A habit tracker" in message.content and "..." in message.content
+    assert report["compacted_tokens"] < estimate_tokens(idea)
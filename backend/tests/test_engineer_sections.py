@@ -0,0 +1,63 @@
+import threading
+
+from langchain_core.messages import AIMessage
+
+from src.agents.engineer import ENGINEER_SECTIONS, run_engineer_sections
+from src.models.agentComp import EngineerResp
+
+PAYLOAD = "Product: Habit App\nFeatures: streaks, Slack reminders"
+
+class _SectionAgent:
+    """Section agent stub that answers with the section's format example"""
+
+    def __init__(self, fail=(), replies=None, wrap=()):
+        self.fail = set(fail)
+        self.replies = replies or {}
+        self.wrap = set(wrap)
+        self.thread_ids = []
+        self._lock = threading.Lock()
+
+    def invoke(self, state, config):
+        content = state["messages"][-1].content
+        section = content.splitlines()[0].removeprefix("Section: ")
+        with self._lock:
+            self.thread_ids.append(config["configurable"]["thread_id"])
+        if section in self.fail:
+            raise RuntimeError(f"{section} timed out")
+        reply = self.replies.get(section, ENGINEER_SECTIONS[section])
+        if section in self.wrap:
+            reply = "analysis:\n" + "\n".join("  " + line for line in reply.splitlines())
+        return {"messages": state["messages"] + [AIMessage(content=f"```toon\n{reply}\n```")]}
+
+def test_sections_merge_into_a_valid_engineer_response():
+    agent = _SectionAgent(wrap={"tech_stack"})
+    results = []
+    merged = run_engineer_sections(agent, PAYLOAD, thread_id="t1", on_result=results.append)
+
+    assert list(merged["analysis"]) == list(ENGINEER_SECTIONS)
+    analysis = EngineerResp(**merged).analysis
+    assert analysis.feasibility_score == 0.9
+    assert analysis.tech_stack.backend == ["Python", "FastAPI"]
+    assert analysis.technical_challenges[0].severity == "High"
+    assert [phase.duration for phase in analysis.implementation_plan] == ["4 weeks", "2 weeks"]
+    assert sorted(agent.thread_ids) == sorted(f"t1:{section}" for section in ENGINEER_SECTIONS)
+    assert len(results) == len(ENGINEER_SECTIONS)
+
+def test_failed_section_degrades_to_partial_result():
+    agent = _SectionAgent(fail={"technical_challenges"})
+    merged = run_engineer_sections(agent, PAYLOAD)
+
+    assert "technical_challenges" not in merged["analysis"]
+    assert set(merged["analysis"]) == set(ENGINEER_SECTIONS) - {"technical_challenges"}
+    assert merged["analysis"]["tech_stack"]["database"] == ["PostgreSQL"]
+
+def test_unparseable_section_is_left_out():
+    agent = _SectionAgent(replies={"implementation_plan": "Sorry, I cannot help with that."})
+    merged = run_engineer_sections(agent, PAYLOAD)
+
+    assert "implementation_plan" not in merged["analysis"]
+    assert merged["analysis"]["feasibility_score"] == 0.9
+
+def test_every_section_failing_returns_empty_analysis():
+    agent = _SectionAgent(fail=ENGINEER_SECTIONS)
+    assert run_engineer_sections(agent, PAYLOAD, max_workers=1) == {"analysis": {}}
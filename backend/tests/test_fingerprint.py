@@ -0,0 +1,50 @@
+from langchain_core.messages import AIMessage
+
+from src.config import model_config
+from src.config.model_config import get_model
+from src.utils.fingerprint import FingerprintRegistry, generation_settings, model_fingerprint
+from src.utils.max_tokens_tuner import with_max_tokens
+from src.utils.model_router import RoutedChatModel
+
+def _message(system_fingerprint="fp_1"):
+    return AIMessage(content="ok", response_metadata={"model_name": "stub-model", "system_fingerprint": system_fingerprint})
+
+def test_generation_settings_of_default_model():
+    settings = generation_settings(get_model(model_name="stub-model", deterministic=False))
+    assert settings == {"model": "stub-model", "temperature": 0.1, "seed": None}
+
+def test_generation_settings_of_deterministic_model(monkeypatch):
+    monkeypatch.setattr(model_config, "DETERMINISTIC_SEED", 7)
+    settings = generation_settings(get_model(model_name="stub-model", deterministic=True))
+    assert settings == {"model": "stub-model", "temperature": 0, "seed": 7}
+
+def test_generation_settings_unwraps_wrappers():
+    model = get_model(model_name="stub-model", temperature=0.3, deterministic=False)
+    assert generation_settings(with_max_tokens(model, "risk"))["temperature"] == 0.3
+    assert generation_settings(model.bind(stop=["x"]))["temperature"] == 0.3
+    routed = RoutedChatModel(endpoints=[model], model_name="stub-model")
+    assert generation_settings(routed)["temperature"] == 0.3
+
+def test_model_fingerprint_records_settings():
+    fingerprint = model_fingerprint(_message(), {"model": "other", "temperature": 0.1, "seed": None})
+    assert fingerprint == {"model": "stub-model", "system_fingerprint": "fp_1", "temperature": 0.1,
+                           "seed": None, "deterministic": False}
+    assert model_fingerprint(_message(), {"temperature": 0, "seed": 42})["deterministic"] is True
+
+def test_registry_counts_fingerprint_changes():
+    registry = FingerprintRegistry()
+    registry.observe(model_fingerprint(_message("fp_1")))
+    registry.observe(model_fingerprint(_message("fp_1")))
+    registry.observe(model_fingerprint(_message("fp_2")))
+    registry.observe(model_fingerprint(_message(None)))
+    assert registry.summary() == {"models": {"stub-model": "fp_2"}, "changes": 1}
+
+def test_controller_records_stage_model_settings():
+    from src.ui.controller import ProductConversationManager
+
+    manager = ProductConversationManager(thread_id="fingerprint-test", model_tiering=False)
+    manager._record_output_mode("product", {"messages": [_message()]})
+
+    fingerprint = manager.fingerprints["product"]
+    assert fingerprint["temperature"] == 0.1
+    assert fingerprint["system_fingerprint"] == "fp_1"
@@ -0,0 +1,83 @@
+import socket
+import threading
+import time
+
+import openai
+import pytest
+
+from src.config.model_config import _chat_openai
+from src.utils import http_pool
+from src.utils.http_pool import PoolStats, get_http_client, pool_stats
+
+@pytest.fixture
+def silent_server():
+    """Accepts connections but never sends a response"""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    connections = []
+    stop = threading.Event()
+
+    def accept():
+        listener.settimeout(0.1)
+        while not stop.is_set():
+            try:
+                connections.append(listener.accept()[0])
+            except OSError:
+                continue
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{listener.getsockname()[1]}/v1"
+    stop.set()
+    thread.join()
+    for connection in connections:
+        connection.close()
+    listener.close()
+
+def test_pool_stats_reuse_counters():
+    stats = PoolStats()
+    for _ in range(4):
+        stats.record_request()
+    stats.record_connection()
+    stats.record_response("HTTP/1.1")
+
+    summary = stats.summary()
+    assert summary["requests"] == 4
+    assert summary["connections_opened"] == 1
+    assert summary["reused_requests"] == 3
+    assert summary["reuse_rate"] == 0.75
+    assert summary["http_versions"] == {"HTTP/1.1": 1}
+
+    stats.reset()
+    assert stats.summary()["requests"] == 0
+    assert stats.summary()["reuse_rate"] == 0.0
+
+def test_shared_client_reuses_keepalive_connection(stub_server):
+    pool_stats.reset()
+    client = get_http_client()
+    for _ in range(3):
+        client.post(f"{stub_server}/chat/completions", json={"model": "stub", "messages": []}).raise_for_status()
+
+    summary = pool_stats.summary()
+    assert summary["requests"] == 3
+    assert summary["connections_opened"] == 1
+    assert summary["reused_requests"] == 2
+
+def test_chat_client_uses_configured_timeout(monkeypatch):
+    monkeypatch.setattr(http_pool, "HTTP_READ_TIMEOUT", 7.0)
+    monkeypatch.setattr(http_pool, "HTTP_CONNECT_TIMEOUT", 3.0)
+    model = _chat_openai("stub", "test-key", "http://127.0.0.1:1/v1")
+
+    timeout = model.root_client.timeout
+    assert timeout.read == 7.0
+    assert timeout.connect == 3.0
+
+def test_read_timeout_fires(monkeypatch, silent_server):
+    monkeypatch.setattr(http_pool, "HTTP_READ_TIMEOUT", 0.5)
+    model = _chat_openai("stub", "test-key", silent_server, max_retries=0)
+
+    start = time.perf_counter()
+    with pytest.raises(openai.APITimeoutError):
+        model.invoke("hello")
+    assert time.perf_counter() - start < 3
@@ -0,0 +1,130 @@
+import json
+import os
+from typing import Any, List
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.config import model_limits
+from src.config.model_limits import get_agent_limit, get_tuning
+from src.utils import max_tokens_tuner as tuner_module
+from src.utils.max_tokens_tuner import AdaptiveMaxTokensModel, MaxTokensTuner, with_max_tokens
+
+class _StubChatModel(BaseChatModel):
+    """Chat model that records the max_tokens it was called with"""
+
+    model_name: str = "stub-model"
+    completion_tokens: int = 100
+    finish_reason: str = "stop"
+    calls: List[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs.get("max_tokens"))
+        message = AIMessage(content="ok", response_metadata={
+            "token_usage": {"completion_tokens": self.completion_tokens}, "finish_reason": self.finish_reason})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+@pytest.fixture
+def tuner(monkeypatch):
+    tuner = MaxTokensTuner()
+    monkeypatch.setattr(tuner_module, "max_tokens_tuner", tuner)
+    monkeypatch.setitem(model_limits.MAX_TOKENS_TUNING, "min_samples", 5)
+    return tuner
+
+def _record(tuner, lengths, agent="product"):
+    for tokens in lengths:
+        tuner.record(agent, "max_tokens", "stub-model", tokens, "stop", 5000)
+
+def test_cold_start_uses_configured_limit(tuner):
+    assert tuner.limit("product", "max_tokens", "stub-model") == 5000
+    _record(tuner, [100] * 4)
+    assert tuner.limit("product", "max_tokens", "stub-model") == 5000
+    assert tuner.limit("unknown_agent", "max_tokens", "stub-model") == model_limits.DEFAULT_MAX_TOKENS
+
+def test_limit_is_percentile_plus_headroom(tuner, monkeypatch):
+    monkeypatch.setitem(model_limits.MAX_TOKENS_TUNING, "percentile", 50)
+    _record(tuner, [400, 500, 600, 700, 800])
+    # p50 = 600, +25% headroom = 750, rounded up to a multiple of 64
+    assert tuner.limit("product", "max_tokens", "stub-model") == 768
+
+def test_limit_is_clamped(tuner):
+    _record(tuner, [10] * 5)
+    assert tuner.limit("product", "max_tokens", "stub-model") == get_tuning("min_tokens")
+    _record(tuner, [20000] * 5, agent="customer")
+    assert tuner.limit("customer", "max_tokens", "stub-model") == get_tuning("max_tokens")
+
+def test_truncation_sets_a_floor(tuner):
+    _record(tuner, [300] * 5)
+    assert tuner.limit("product", "max_tokens", "stub-model") == 384
+    tuner.record("product", "max_tokens", "stub-model", 384, "length", 384)
+    # 384 x 1.5 = 576, and short completions afterwards do not lower it again
+    _record(tuner, [100] * 10)
+    assert tuner.limit("product", "max_tokens", "stub-model") == 576
+    assert tuner.summary()["product.max_tokens"]["stub-model"]["truncations"] == 1
+
+def test_window_keeps_recent_samples(tuner, monkeypatch):
+    monkeypatch.setitem(model_limits.MAX_TOKENS_TUNING, "window", 5)
+    _record(tuner, [3000] * 5 + [300] * 5)
+    assert tuner.limit("product", "max_tokens", "stub-model") == 384
+
+def test_tuning_disabled_uses_configured_limit(tuner, monkeypatch):
+    monkeypatch.setitem(model_limits.MAX_TOKENS_TUNING, "enabled", False)
+    _record(tuner, [300] * 5)
+    assert tuner.limit("product", "max_tokens", "stub-model") == 5000
+
+def test_adaptive_model_passes_limit_and_feeds_back(tuner):
+    stub = _StubChatModel(calls=[], completion_tokens=1000, finish_reason="length")
+    model = with_max_tokens(stub, "summarizer")
+    assert isinstance(model, AdaptiveMaxTokensModel) and model.model_name == "stub-model"
+
+    model.invoke([HumanMessage(content="hi")])
+    model.invoke([HumanMessage(content="hi")])
+    # First call at the configured 3000; the truncation raises the floor to 3000 x 1.5, rounded up to 4544
+    assert stub.calls == [3000, 4544]
+    assert with_max_tokens(model, "engineer", "section_max_tokens").model is stub
+
+def test_explicit_max_tokens_is_kept(tuner):
+    stub = _StubChatModel(calls=[])
+    with_max_tokens(stub, "summarizer").invoke([HumanMessage(content="hi")], max_tokens=42)
+    assert stub.calls == [42]
+
+# --- Hot reload of MODEL_LIMITS_FILE ---
+
+@pytest.fixture
+def limits_file(tmp_path, monkeypatch):
+    path = tmp_path / "limits.json"
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(model_limits, "MODEL_LIMITS_FILE", str(path))
+    monkeypatch.setattr(model_limits, "_overrides", {})
+    monkeypatch.setattr(model_limits, "_overrides_mtime", 0.0)
+    monkeypatch.setattr(model_limits, "_overrides_checked", 0.0)
+    monkeypatch.setattr(model_limits.time, "monotonic", lambda: clock["now"])
+
+    def write(data, mtime):
+        path.write_text(data if isinstance(data, str) else json.dumps(data))
+        os.utime(path, (mtime, mtime))
+        clock["now"] += 2
+    return write
+
+def test_limits_reload_after_file_change(limits_file):
+    limits_file({"product": {"max_tokens": 1200}, "max_tokens_tuning": {"headroom": 0.5}}, mtime=100)
+    assert get_agent_limit("product", "max_tokens") == 1200
+    assert get_agent_limit("product", "context_tokens") == 1500
+    assert get_tuning("headroom") == 0.5
+
+    limits_file({"product": {"max_tokens": 900}}, mtime=200)
+    assert get_agent_limit("product", "max_tokens") == 900
+    assert get_tuning("headroom") == model_limits.MAX_TOKENS_TUNING["headroom"]
+
+def test_invalid_file_keeps_previous_limits(limits_file):
+    limits_file({"product": {"max_tokens": 1200}}, mtime=100)
+    assert get_agent_limit("product", "max_tokens") == 1200
+
+    limits_file("{not json", mtime=200)
+    assert get_agent_limit("product", "max_tokens") == 1200
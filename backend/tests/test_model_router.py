@@ -0,0 +1,60 @@
+import socket
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.config import model_config
+from src.config.model_config import _chat_openai, parse_endpoints
+from src.utils import model_router
+from src.utils.model_router import EndpointHealth, RoutedChatModel, endpoint_health
+
+def _closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/v1"
+
+def _endpoint(url: str, model: str = "stub-model"):
+    return _chat_openai(model, "test-key", url, max_retries=0)
+
+def test_parse_endpoints():
+    assert parse_endpoints("http://a/v1, http://b/v1|gpt-4o|key-b,,") == [
+        ("http://a/v1", "", ""), ("http://b/v1", "gpt-4o", "key-b")]
+
+def test_get_model_routes_between_configured_endpoints(monkeypatch):
+    monkeypatch.setattr(model_config, "OPENAI_API_BASES", "http://a/v1,http://b/v1|other-model")
+    model = model_config.get_model(model_name="main-model")
+    assert isinstance(model, RoutedChatModel)
+    assert [(e.openai_api_base, e.model_name) for e in model.endpoints] == [
+        ("http://a/v1", "main-model"), ("http://b/v1", "other-model")]
+
+def test_health_score_prefers_fast_reliable_endpoints(monkeypatch):
+    monkeypatch.setattr(model_router, "ROUTER_FAILURE_THRESHOLD", 2)
+    fast, slow, flaky = EndpointHealth("fast"), EndpointHealth("slow"), EndpointHealth("flaky")
+    fast.record_success(0.2)
+    slow.record_success(1.0)
+    flaky.record_success(0.2)
+    flaky.record_failure()
+    assert fast.score() < flaky.score() < slow.score()
+    assert EndpointHealth("untried").score() == 0.0
+
+    flaky.record_failure()
+    assert not flaky.available()
+    flaky.record_success(0.2)
+    assert flaky.available() and flaky.consecutive_failures == 0
+
+def test_fails_over_to_healthy_endpoint(stub_server):
+    dead = _closed_port_url()
+    model = RoutedChatModel(endpoints=[_endpoint(dead), _endpoint(stub_server)], model_name="stub-model")
+
+    result = model.invoke([HumanMessage(content="Hi")])
+    assert result.content
+    assert endpoint_health(f"{dead}#stub-model").failures == 1
+    assert endpoint_health(f"{stub_server}#stub-model").requests == 1
+    # The failed endpoint is now ranked after the healthy one
+    assert model.ordered_endpoints()[0].openai_api_base == stub_server
+
+def test_raises_when_every_endpoint_fails():
+    model = RoutedChatModel(endpoints=[_endpoint(_closed_port_url()), _endpoint(_closed_port_url())])
+    with pytest.raises(Exception) as error:
+        model.invoke([HumanMessage(content="Hi")])
+    assert model_router.is_retryable(error.value)
@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, MessagesState, StateGraph
+
+from src.config.model_tiers import TIER_POLICY
+from src.models.agentComp import SummarizerOutput
+from src.utils import model_tiering
+from src.utils.checkpoint import BoundedMemorySaver
+from src.utils.model_tiering import TieredAgent, TierTelemetry, choose_tier, eligible_tiers
+
+TIERS = [
+    {"name": "fast", "provider": "openai", "model": "fast-model", "input_cost": 0.001, "output_cost": 0.002},
+    {"name": "strong", "provider": "openai", "model": "strong-model", "input_cost": 0.01, "output_cost": 0.02},
+]
+USAGE = {"prompt_tokens": 1000, "completion_tokens": 1000}
+
+@pytest.fixture(autouse=True)
+def _tiers(monkeypatch):
+    monkeypatch.setattr(model_tiering, "tier_telemetry", TierTelemetry())
+    monkeypatch.setattr(model_tiering, "enabled_tiers", lambda: list(TIERS))
+    monkeypatch.setitem(TIER_POLICY, "min_samples", 3)
+    monkeypatch.setitem(TIER_POLICY, "reprobe_every", 10)
+    monkeypatch.setitem(TIER_POLICY, "floors", {})
+    monkeypatch.setattr(model_tiering, "get_model",
+                        lambda provider, model_name, agent_type: SimpleNamespace(model_name=model_name, temperature=0.1, seed=None))
+
+def _record(agent, tier_index, runs, parsed=True, latency=1.0):
+    for _ in range(runs):
+        model_tiering.tier_telemetry.record(agent, TIERS[tier_index], latency, USAGE, parsed)
+
+def test_cold_start_uses_cheapest_tier_until_measured():
+    assert choose_tier("product") == 0
+    _record("product", 0, 2)
+    assert choose_tier("product") == 0
+
+def test_qualifying_cheap_tier_skips_measuring_stronger_ones():
+    _record("product", 0, 3)
+    assert choose_tier("product") == 0
+
+def test_unreliable_tier_moves_to_stronger_tier():
+    _record("product", 0, 3, parsed=False)
+    assert choose_tier("product") == 1
+
+def test_slow_tier_is_skipped(monkeypatch):
+    monkeypatch.setitem(TIER_POLICY, "max_latency_seconds", 5.0)
+    _record("product", 0, 3, latency=10.0)
+    _record("product", 1, 3)
+    assert choose_tier("product") == 1
+
+def test_lowest_cost_per_valid_output_wins(monkeypatch):
+    # fast parses 2 of 3 but is 10x cheaper, so it still wins per valid output
+    monkeypatch.setitem(TIER_POLICY, "min_parse_rate", 0.5)
+    _record("product", 0, 2)
+    _record("product", 0, 1, parsed=False)
+    _record("product", 1, 3)
+    assert choose_tier("product") == 0
+
+    monkeypatch.setitem(TIER_POLICY, "min_parse_rate", 0.9)
+    assert choose_tier("product") == 1
+
+def test_falls_back_to_strongest_when_nothing_qualifies():
+    _record("product", 0, 3, parsed=False)
+    _record("product", 1, 3, parsed=False)
+    assert choose_tier("product") == 1
+
+def test_skipped_cheap_tier_is_reprobed():
+    _record("product", 0, 3, parsed=False)
+    _record("product", 1, 3)
+    choices = [choose_tier("product") for _ in range(10)]
+    assert choices == [1] * 9 + [0]
+
+def test_floor_removes_cheaper_tiers(monkeypatch):
+    monkeypatch.setitem(TIER_POLICY, "floors", {"risk": "strong"})
+    assert [tier["name"] for tier in eligible_tiers("risk")] == ["strong"]
+    assert [tier["name"] for tier in eligible_tiers("product")] == ["fast", "strong"]
+
+# --- TieredAgent ---
+
+VALID = '{"summary": "ok"}'
+
+def _builder(checkpointer, answers):
+    """Build one-node agents answering with answers[model_name] on a shared checkpointer"""
+    def build(model):
+        graph = StateGraph(MessagesState)
+        answer = answers[model.model_name]
+        graph.add_node("agent", lambda state: {"messages": [AIMessage(content=answer,
+                                                                        response_metadata={"token_usage": USAGE})]})
+        graph.add_edge(START, "agent")
+        return graph.compile(checkpointer=checkpointer)
+    return build
+
+def _thread(agent, thread_id):
+    state = agent.agent_for(TIERS[-1]).get_state({"configurable": {"thread_id": thread_id}})
+    return [(type(m).__name__, m.content) for m in state.values.get("messages", [])]
+
+def test_valid_output_stays_on_chosen_tier():
+    agent = TieredAgent("summarizer", SummarizerOutput,
+                        _builder(BoundedMemorySaver(), {"fast-model": VALID, "strong-model": VALID}))
+    result = agent.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": "t"}})
+
+    assert result["model_tier"] == "fast" and result["escalations"] == 0
+    assert result["model_settings"] == {"model": "fast-model", "temperature": 0.1, "seed": None}
+
+def test_invalid_output_escalates_and_rolls_back_failed_turn():
+    saver = BoundedMemorySaver()
+    agent = TieredAgent("summarizer", SummarizerOutput,
+                        _builder(saver, {"fast-model": "not the schema", "strong-model": VALID}))
+    config = {"configurable": {"thread_id": "t"}}
+    result = agent.invoke({"messages": [HumanMessage(content="hi")]}, config)
+
+    assert result["model_tier"] == "strong" and result["escalations"] == 1
+    assert result["model_settings"]["model"] == "strong-model"
+    assert _thread(agent, "t") == [("HumanMessage", "hi"), ("AIMessage", VALID)]
+    assert model_tiering.tier_telemetry.summary()["summarizer"]["fast"]["escalations"] == 1
+    assert model_tiering.tier_telemetry.stats("summarizer", "fast")["parse_rate"] == 0.0
+
+def test_rollback_keeps_earlier_turns():
+    answers = {"fast-model": VALID, "strong-model": VALID}
+    agent = TieredAgent("summarizer", SummarizerOutput, _builder(BoundedMemorySaver(), answers))
+    config = {"configurable": {"thread_id": "t"}}
+    agent.invoke({"messages": [HumanMessage(content="first")]}, config)
+
+    answers["fast-model"] = "broken"
+    agent._agents.clear()
+    agent.invoke({"messages": [HumanMessage(content="second")]}, config)
+
+    assert _thread(agent, "t") == [("HumanMessage", "first"), ("AIMessage", VALID),
+                                   ("HumanMessage", "second"), ("AIMessage", VALID)]
+
+def test_invalid_output_on_strongest_tier_is_returned():
+    agent = TieredAgent("summarizer", SummarizerOutput,
+                        _builder(BoundedMemorySaver(), {"fast-model": "broken", "strong-model": "still broken"}))
+    result = agent.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": "t"}})
+
+    assert result["model_tier"] == "strong" and result["escalations"] == 1
+    assert result["messages"][-1].content == "still broken"
@@ -0,0 +1,113 @@
+import json
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel
+
+from src.services.batch.provider_batch import (
+    BatchClient,
+    BatchSession,
+    OfflineChatModel,
+    request_body,
+    request_key,
+    response_message,
+    run_offline,
+)
+
+RESPONSE = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "model": "stub-model",
+    "system_fingerprint": "fp_stub",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "name: App"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+}
+
+class _Answer(BaseModel):
+    answer: str
+
+class _RecordingClient:
+    """Batch client that answers every request with RESPONSE"""
+
+    def __init__(self):
+        self.batches = []
+
+    def run(self, requests):
+        self.batches.append(requests)
+        return {custom_id: RESPONSE for custom_id in requests}
+
+def test_request_body_mapping():
+    body = request_body("stub-model", [SystemMessage(content="You are X"), HumanMessage(content="Hi")],
+                        {"temperature": 0, "seed": None}, stop=["END"], max_tokens=100,
+                        response_format={"type": "json_object"})
+    assert body == {
+        "model": "stub-model",
+        "messages": [{"role": "system", "content": "You are X"}, {"role": "user", "content": "Hi"}],
+        "temperature": 0,
+        "max_tokens": 100,
+        "response_format": {"type": "json_object"},
+        "stop": ["END"],
+    }
+
+def test_request_key_ignores_max_tokens():
+    body = request_body("stub-model", [HumanMessage(content="Hi")], {"temperature": 0.1})
+    assert request_key({**body, "max_tokens": 100}) == request_key({**body, "max_tokens": 900})
+    assert request_key(body) != request_key({**body, "temperature": 0})
+
+def test_response_message_mapping():
+    message = response_message(RESPONSE)
+    assert message.content == "name: App"
+    assert message.response_metadata == {
+        "token_usage": RESPONSE["usage"],
+        "model_name": "stub-model",
+        "system_fingerprint": "fp_stub",
+        "finish_reason": "stop",
+    }
+    assert message.usage_metadata == {"input_tokens": 12, "output_tokens": 3, "total_tokens": 15}
+
+def test_response_message_tool_calls():
+    response = json.loads(json.dumps(RESPONSE))
+    response["choices"][0]["message"] = {"role": "assistant", "content": None, "tool_calls": [
+        {"id": "call_1", "type": "function", "function": {"name": "search", "arguments": "{\"q\": \"x\"}"}}]}
+    message = response_message(response)
+    assert message.content == ""
+    assert message.tool_calls == [{"name": "search", "args": {"q": "x"}, "id": "call_1", "type": "tool_call"}]
+
+def test_offline_model_records_then_replays():
+    client = _RecordingClient()
+    session = BatchSession(client)
+    model = OfflineChatModel(session=session, model_name="stub-model", temperature=0.1)
+
+    first = model.invoke([HumanMessage(content="Hi")])
+    assert first.content == ""
+    assert first.response_metadata["batch_pending"] is True
+    assert list(session.pending.values()) == [
+        {"model": "stub-model", "messages": [{"role": "user", "content": "Hi"}], "temperature": 0.1}]
+
+    assert session.flush() == 1
+    assert session.pending == {}
+    second = model.invoke([HumanMessage(content="Hi")])
+    assert second.content == "name: App"
+    assert second.response_metadata["system_fingerprint"] == "fp_stub"
+    assert len(client.batches) == 1
+
+def test_batch_client_round_trip(stub_server):
+    client = BatchClient(api_key="test-key", base_url=stub_server, poll_seconds=0.01)
+    body = request_body("stub-model", [HumanMessage(content="Hi")], {"temperature": 0})
+    responses = client.run({"req-1": body})
+    assert list(responses) == ["req-1"]
+    assert responses["req-1"]["system_fingerprint"] == "fp_stub"
+
+def test_run_offline_maps_results_to_schemas(stub_server):
+    session = BatchSession(BatchClient(api_key="test-key", base_url=stub_server, poll_seconds=0.01))
+    jobs = [
+        {"id": "a", "idea": "Habit tracker for remote teams", "answers": {"Who?": "Remote teams"}},
+        {"id": "b", "idea": "Farm produce subscriptions", "answers": {}},
+    ]
+    records = run_offline(jobs, session=session)
+
+    assert [record["status"] for record in records] == ["ok", "ok"]
+    result = records[0]["result"]
+    assert result["product"]["name"] == "Stub App"
+    assert result["engineer"]["analysis"]["tech_stack"]["backend"] == ["FastAPI"]
+    assert result["risk"]["assessment"]["features"][0]["risk_level"] == "medium"
+    assert session.batches == 3
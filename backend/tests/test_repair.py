@@ -0,0 +1,106 @@
+from langchain_core.messages import AIMessage
+
+from src.models.agentComp import ProductResp
+from src.utils.repair import _drop_invalid_rows, build_repair_request, find_issues, merge_repair, repair_response
+
+def _feature(name, **fields):
+    return {"name": name, "reason": "Core", "goal_oriented": 0.8, "development_time": "1 week",
+            "cost_estimate": 1000, **fields}
+
+HEADER = "name | reason | goal_oriented | development_time | cost_estimate"
+
+class _RepairAgent:
+    """Agent stub that answers repair rounds with canned TOON deltas and records the requests"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests = []
+        self.thread_ids = []
+
+    def invoke(self, state, config):
+        self.requests.append(state["messages"][0].content)
+        self.thread_ids.append(config["configurable"]["thread_id"])
+        answer = self.answers.pop(0) if self.answers else ""
+        return {"messages": [AIMessage(content=answer)]}
+
+def test_find_issues_reports_missing_invalid_and_short():
+    bad = {"name": "Broken"}
+    data = {"name": "Habit App", "features": [_feature("Reminders"), bad, _feature("Streaks")]}
+    issues = find_issues(data, ProductResp, min_items={"features": 5})
+
+    assert issues["missing"] == ["description"]
+    assert set(issues["rows"]["features"]) == {1}
+    assert any(msg.startswith("reason:") for msg in issues["rows"]["features"][1])
+    # 2 valid rows of the 5 required
+    assert issues["short"] == {"features": 3}
+
+def test_find_issues_valid_response():
+    data = {"name": "App", "description": "Tracks habits", "features": [_feature("A"), _feature("B")]}
+    assert find_issues(data, ProductResp, min_items={"features": 2}) == {"missing": [], "rows": {}, "short": {}}
+
+def test_find_issues_on_empty_response():
+    issues = find_issues({}, ProductResp, min_items={"features": 5})
+    assert issues["missing"] == ["name", "description"]
+    assert issues["short"] == {"features": 5}
+
+def test_repair_request_starts_with_context_and_known_fields():
+    data = {"name": "Habit App", "description": "Habit tracker for remote teams", "features": [_feature("Reminders")]}
+    issues = find_issues(data, ProductResp, min_items={"features": 3})
+    request = build_repair_request(data, ProductResp, issues, context="requirements:\n  idea: Habit tracker")
+
+    assert request.startswith("Context:\nrequirements:\n  idea: Habit tracker\n")
+    assert "name: Habit App\ndescription: Habit tracker for remote teams" in request
+    assert "Add 2 more features rows, different from: Reminders. Put them under new_features:" in request
+    assert request.index("Context:") < request.index("failed validation")
+
+def test_merge_repair_fixes_rows_fills_fields_and_skips_duplicates():
+    data = {"name": "App", "features": [_feature("Reminders"), {"name": "Broken"}]}
+    issues = find_issues(data, ProductResp, min_items={"features": 3})
+    delta = {
+        "description": "Tracks habits",
+        "fixed_features": [_feature("Broken", reason="Fixed")],
+        "new_features": [_feature("reminders"), _feature("Reports"), {"reason": "no name"}],
+    }
+    merged = merge_repair(data, delta, ProductResp, issues)
+
+    assert merged["description"] == "Tracks habits"
+    assert [f["name"] for f in merged["features"]] == ["Reminders", "Broken", "Reports"]
+    assert merged["features"][1]["reason"] == "Fixed"
+    assert find_issues(merged, ProductResp, min_items={"features": 3}) == {"missing": [], "rows": {}, "short": {}}
+
+def test_drop_invalid_rows():
+    data = {"name": "App", "description": "d", "features": [_feature("A"), {"name": "Broken"}, _feature("B")]}
+    cleaned = _drop_invalid_rows(data, ProductResp, find_issues(data, ProductResp))
+    assert [f["name"] for f in cleaned["features"]] == ["A", "B"]
+    assert data["features"][1] == {"name": "Broken"}
+
+def test_repair_response_merges_delta():
+    agent = _RepairAgent(f"```toon\nnew_features:\n  {HEADER}\n  Reports | Insight | 0.7 | 1 week | 500\n```")
+    data = {"name": "App", "description": "d", "features": [_feature("Reminders")]}
+    product, report = repair_response(agent, data, ProductResp, "t", min_items={"features": 2}, context="idea: habits")
+
+    assert [f.name for f in product.features] == ["Reminders", "Reports"]
+    assert report["rounds"] == 1 and agent.thread_ids == ["t:repair0"]
+    assert agent.requests[0].startswith("Context:\nidea: habits")
+
+def test_repair_response_stops_after_max_rounds():
+    agent = _RepairAgent("nothing useful", "still nothing", "never asked")
+    product, report = repair_response(agent, {"name": "App"}, ProductResp, "t", min_items={"features": 5}, max_rounds=2)
+
+    assert product is None
+    assert report["rounds"] == 2 and len(report["issues"]) == 2
+    assert agent.thread_ids == ["t:repair0", "t:repair1"]
+
+def test_repair_response_drops_rows_that_stay_invalid():
+    features = [_feature(name) for name in "ABCDE"] + [{"name": "Broken"}]
+    agent = _RepairAgent("no fix")
+    product, report = repair_response(agent, {"name": "App", "description": "d", "features": features},
+                                      ProductResp, "t", min_items={"features": 5}, max_rounds=1)
+    assert [f.name for f in product.features] == list("ABCDE")
+    assert report["rounds"] == 1
+
+def test_repair_response_keeps_minimum_when_dropping_rows():
+    features = [_feature(name) for name in "ABCD"] + [{"name": "Broken"}]
+    product, _ = repair_response(_RepairAgent(), {"name": "App", "description": "d", "features": features},
+                                 ProductResp, "t", min_items={"features": 5}, max_rounds=1)
+    assert product is None
@@ -0,0 +1,96 @@
+from langchain_core.messages import AIMessage
+
+from src.agents.risk import assess_risk_fanout, dedupe_recommendations, merge_risk_assessments
+from src.utils import toon
+
+def _row(feature, risk_level, law="None", **fields):
+    return {"feature": feature, "law_interaction": law, "is_potential_risk": risk_level != "low",
+            "potential_risk": "", "border_line_thing": "", "gdpr_compliance": "", "data_retention": "",
+            "user_consent": "", "risk_level": risk_level, "mitigation": "", **fields}
+
+class _RiskAgent:
+    """Risk agent stub answering each batch with one TOON row per requested feature"""
+
+    def __init__(self):
+        self.thread_ids = []
+
+    def invoke(self, state, config):
+        self.thread_ids.append(config["configurable"]["thread_id"])
+        request = toon.loads(state["messages"][0].content.split("set done to true:\n", 1)[1])
+        names = [row["name"] for row in request["features"]]
+        rows = "\n".join(f"  {name}|None|false|||||||low|" for name in names)
+        header = "  feature|law_interaction|is_potential_risk|potential_risk|border_line_thing|gdpr_compliance|data_retention|user_consent|risk_level|mitigation"
+        return {"messages": [AIMessage(content=f"```toon\ndone: true\nfeatures:\n{header}\n{rows}\nrecommendations: Log access\n```")]}
+
+def test_duplicates_keep_highest_risk_level():
+    merged = merge_risk_assessments([
+        {"features": [_row("Payments", "medium", mitigation="first")]},
+        {"features": [_row("payments", "critical", mitigation="second"), _row("Dark mode", "low")]},
+        {"features": [_row("Payments", "high")]},
+    ])
+    assert [(f.feature, f.risk_level, f.mitigation) for f in merged.features] == [
+        ("payments", "critical", "second"), ("Dark mode", "low", "")]
+    assert merged.done is True
+
+def test_summary_is_recomputed_from_rows():
+    merged = merge_risk_assessments([
+        {"features": [_row("Payments", "high", law="PCI DSS, GDPR"), _row("Sleep tracking", "medium", law="HIPAA")]},
+        {"features": [_row("Dark mode", "low")]},
+    ])
+    assert merged.summary == ("3 features assessed (1 high, 1 medium, 1 low risk). Highest-risk features: Payments. "
+                              "Applicable laws: GDPR, HIPAA, PCI DSS.")
+
+def test_rows_are_normalized():
+    merged = merge_risk_assessments([{"features": [
+        {"feature": "Chat", "is_potential_risk": "yes", "risk_level": "HIGH", "law_interaction": None},
+        {"feature": "", "risk_level": "high"},
+        "not a row",
+    ]}])
+    assert len(merged.features) == 1
+    feature = merged.features[0]
+    assert feature.is_potential_risk is True and feature.risk_level == "high"
+    assert feature.law_interaction == "" and feature.mitigation == ""
+
+def test_recommendations_are_merged_and_deduplicated():
+    merged = merge_risk_assessments([
+        {"features": [], "recommendations": "Encrypt data at rest | Add consent screen"},
+        {"features": [], "recommendations": ["encrypt data at rest.", {"text": "Run a DPIA"}]},
+    ])
+    assert merged.recommendations == ["Encrypt data at rest", "Add consent screen", "Run a DPIA"]
+    assert merged.summary == "No features were assessed."
+
+def test_dedupe_recommendations_ignores_case_and_punctuation():
+    assert dedupe_recommendations(["Use TLS!", "use  tls", "", "Audit logs"]) == ["Use TLS!", "Audit logs"]
+
+def test_fanout_assesses_every_feature_once():
+    agent = _RiskAgent()
+    features = [{"name": name, "reason": "core"} for name in ("Login", "Payments", "Chat", "Streaks", "Export")]
+    merged = assess_risk_fanout(agent, features, "Product: App", thread_id="risk", batch_size=2, max_workers=2)
+
+    assert sorted(f.feature for f in merged.features) == ["Chat", "Export", "Login", "Payments", "Streaks"]
+    assert sorted(agent.thread_ids) == ["risk:0", "risk:1", "risk:2"]
+    assert merged.recommendations == ["Log access"]
+
+class _FailingRiskAgent(_RiskAgent):
+    """Risk agent stub whose batches containing 'Payments' raise and 'Chat' come back unparseable"""
+
+    def invoke(self, state, config):
+        content = state["messages"][0].content
+        if "Payments" in content:
+            raise RuntimeError("provider error")
+        if "Chat" in content:
+            self.thread_ids.append(config["configurable"]["thread_id"])
+            return {"messages": [AIMessage(content="")]}
+        return super().invoke(state, config)
+
+def test_fanout_backfills_features_of_failed_batches():
+    features = [{"name": name, "reason": "core"} for name in ("Login", "Payments", "Chat", "Streaks")]
+    merged = assess_risk_fanout(_FailingRiskAgent(), features, "Product: App", batch_size=1, max_workers=2)
+
+    rows = {f.feature: f for f in merged.features}
+    assert sorted(rows) == ["Chat", "Login", "Payments", "Streaks"]
+    assert rows["Login"].risk_level == "low"
+    for name in ("Payments", "Chat"):
+        assert rows[name].is_potential_risk is True and rows[name].risk_level == "medium"
+        assert rows[name].potential_risk.startswith("Not assessed")
+    assert merged.summary.startswith("4 features assessed (2 medium, 2 low risk)")
@@ -0,0 +1,60 @@
+import pytest
+
+from src.utils.risk_screen import prescreen_features, screen_feature, unassessed_row
+
+# Feature name -> expected data categories
+FEATURE_CATEGORIES = [
+    ("Face unlock", ["biometrics"]),
+    ("Fingerprint login", ["biometrics"]),
+    ("Voice commands", ["biometrics"]),
+    ("Touch ID sign-in", ["biometrics"]),
+    ("Share to social", []),
+    ("Order history", []),
+    ("Account settings", []),
+    ("Live chat support", []),
+    ("Dark mode", []),
+    ("Export to PDF", []),
+    ("Sleep tracking", ["health"]),
+    ("Medication reminders", ["health"]),
+    ("Nearby stores on a map", ["location"]),
+    ("GPS route recording", ["location"]),
+    ("Parental controls for kids", ["minors"]),
+    ("Credit card checkout", ["payments"]),
+    ("Subscription billing", ["payments"]),
+    ("Contact list import", ["personal_data"]),
+    ("Personalized recommendations", ["personal_data"]),
+    ("Profile photo upload", ["personal_data"]),
+    ("Record calls for review", ["personal_data"]),
+    ("Identity verification with passport scan", ["personal_data"]),
+]
+
+@pytest.mark.parametrize("name, categories", FEATURE_CATEGORIES)
+def test_feature_categories(name, categories):
+    assert screen_feature({"name": name})[0] == categories
+
+def test_reason_text_is_screened():
+    categories, laws = screen_feature({"name": "Smart onboarding", "reason": "Asks for date of birth"})
+    assert categories == ["personal_data"]
+    assert laws == ["GDPR", "CCPA", "DPDPA"]
+
+def test_laws_are_merged_without_duplicates():
+    categories, laws = screen_feature({"name": "Heart rate monitoring for children"})
+    assert categories == ["health", "minors"]
+    assert laws == ["HIPAA", "GDPR", "COPPA"]
+
+def test_prescreen_splits_features():
+    features = [{"name": "Face unlock"}, {"name": "Dark mode"}, {"name": "Credit card checkout"}]
+    risky, low_risk = prescreen_features(features)
+
+    assert [feature["name"] for feature in risky] == ["Face unlock", "Credit card checkout"]
+    assert risky[0]["data_categories"] == "biometrics"
+    assert risky[1]["laws"] == "SOX, CCPA, GDPR"
+    assert [row["feature"] for row in low_risk] == ["Dark mode"]
+    assert low_risk[0]["risk_level"] == "low"
+    assert low_risk[0]["is_potential_risk"] is False
+
+def test_unassessed_row_is_conservative():
+    row = unassessed_row({"name": "Face unlock", "data_categories": "biometrics", "laws": "GDPR"})
+    assert row["is_potential_risk"] is True
+    assert row["risk_level"] == "medium"
+    assert "biometrics" in row["potential_risk"]
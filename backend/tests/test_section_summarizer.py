@@ -0,0 +1,69 @@
+import threading
+
+from langchain_core.messages import AIMessage
+
+from src.agents import summarizer as summarizer_module
+from src.agents.summarizer import SUMMARY_SECTIONS, SectionSummarizer
+
+FINAL_DATA = {"product": {"name": "Habit App"}, "customer": {}, "engineer": {}, "risk": {}}
+
+class _Agent:
+    """Agent stub that answers with a fixed text and records thread ids and worker threads"""
+
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.thread_ids = []
+        self.threads = []
+
+    def invoke(self, state, config):
+        self.thread_ids.append(config["configurable"]["thread_id"])
+        self.threads.append(threading.current_thread().name)
+        return {"messages": [AIMessage(content=self.answer)]}
+
+def _summarizer(monkeypatch):
+    section_agent = _Agent("Section body")
+    merge_agent = _Agent('{"executive_summary": "Overview", "conclusion": "Build it"}')
+    monkeypatch.setattr(summarizer_module, "get_section_summarizer_agent", lambda model: section_agent)
+    monkeypatch.setattr(summarizer_module, "get_summary_merge_agent", lambda model: merge_agent)
+    return SectionSummarizer(model=None, thread_id="t"), section_agent, merge_agent
+
+def _run_report(summarizer):
+    for section in SUMMARY_SECTIONS:
+        summarizer.submit(section, FINAL_DATA)
+    return summarizer.merge(FINAL_DATA)
+
+def test_merge_builds_report_from_background_drafts(monkeypatch):
+    summarizer, section_agent, _ = _summarizer(monkeypatch)
+    report = _run_report(summarizer)
+
+    assert report.startswith("## Executive Summary\n\nOverview")
+    assert "## Risk Assessment & Mitigation\n\nSection body" in report
+    assert report.endswith("## Conclusion & Next Steps\n\nBuild it")
+    assert all(name.startswith("summary") for name in section_agent.threads)
+
+def test_instance_can_produce_several_reports(monkeypatch):
+    summarizer, section_agent, merge_agent = _summarizer(monkeypatch)
+    first = _run_report(summarizer)
+    second = _run_report(summarizer)
+
+    assert first == second
+    assert len(section_agent.thread_ids) == 2 * len(SUMMARY_SECTIONS)
+    # Each report starts fresh checkpoint threads
+    assert merge_agent.thread_ids == ["t:0:merge", "t:1:merge"]
+    assert summarizer.executor is None and summarizer.futures == {}
+
+def test_merge_without_submit_drafts_inline(monkeypatch):
+    summarizer, section_agent, _ = _summarizer(monkeypatch)
+    report = summarizer.merge(FINAL_DATA)
+
+    assert "## Market Analysis & Customer Insights\n\nSection body" in report
+    assert section_agent.threads == [threading.current_thread().name] * len(SUMMARY_SECTIONS)
+
+def test_close_discards_pending_report(monkeypatch):
+    summarizer, _, merge_agent = _summarizer(monkeypatch)
+    summarizer.submit("market", FINAL_DATA)
+    summarizer.close()
+
+    assert summarizer.executor is None and summarizer.futures == {}
+    summarizer.merge(FINAL_DATA)
+    assert merge_agent.thread_ids == ["t:1:merge"]
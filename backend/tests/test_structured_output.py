@@ -0,0 +1,102 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.models.agentComp import SummarizerOutput
+from src.utils import structured_output
+from src.utils.structured_output import OutputModeAgent
+
+class _Agent:
+    """Agent stub returning a fixed answer, or raising a fixed error"""
+
+    def __init__(self, answer: str = "", error: Exception = None, output_mode: str = None):
+        self.answer = answer
+        self.error = error
+        self.output_mode = output_mode
+        self.calls = 0
+
+    def invoke(self, inputs, config=None, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        result = {"messages": [AIMessage(content=self.answer, response_metadata={"system_fingerprint": "fp_1"})]}
+        if self.output_mode:
+            result["output_mode"] = self.output_mode
+        return result
+
+@pytest.fixture(autouse=True)
+def _fresh_unsupported_models(monkeypatch):
+    monkeypatch.setattr(structured_output, "_unsupported_models", set())
+
+def _agent(structured_agent, toon_agent, model_key="stub-model"):
+    return OutputModeAgent("Summarizer", SummarizerOutput, structured_agent, toon_agent, model_key)
+
+def test_structured_answer():
+    agent = _agent(_Agent('{"summary": "ok"}'), _Agent("summary: toon"))
+    result = agent.invoke({"messages": []})
+    assert result["output_mode"] == "structured"
+    assert result["messages"][-1].content == '{"summary": "ok"}'
+
+@pytest.mark.parametrize("message", [
+    "Error code: 400 - response_format json_schema is not supported by this model",
+    "This model does not support structured outputs",
+    "Invalid parameter: 'response format' of type 'json_schema'",
+])
+def test_falls_back_to_toon_and_remembers_model(message):
+    structured_agent, toon_agent = _Agent(error=ValueError(message)), _Agent("summary: toon")
+    agent = _agent(structured_agent, toon_agent)
+
+    assert agent.invoke({"messages": []})["output_mode"] == "toon"
+    assert agent.invoke({"messages": []})["output_mode"] == "toon"
+    assert structured_agent.calls == 1 and toon_agent.calls == 2
+    assert "stub-model" in structured_output._unsupported_models
+
+@pytest.mark.parametrize("message", [
+    "Error code: 400 - tool_choice 'required' is not supported",
+    "Streaming is not supported for this endpoint",
+    "Rate limit reached",
+])
+def test_unrelated_errors_are_raised(message):
+    structured_agent, toon_agent = _Agent(error=ValueError(message)), _Agent("summary: toon")
+    agent = _agent(structured_agent, toon_agent)
+
+    with pytest.raises(ValueError):
+        agent.invoke({"messages": []})
+    assert toon_agent.calls == 0
+    assert structured_output._unsupported_models == set()
+
+# --- Output mode recording for the fan-out stages ---
+
+TOON_RISK = ("```toon\ndone: true\nfeatures:\n  feature|law_interaction|is_potential_risk|potential_risk|border_line_thing|"
+             "gdpr_compliance|data_retention|user_consent|risk_level|mitigation\n  Login|None|false|||||||low|\n"
+             "recommendations: []\n```")
+
+def _manager(**kwargs):
+    from src.ui.controller import ProductConversationManager
+    return ProductConversationManager(thread_id="output-mode-test", model_tiering=False, **kwargs)
+
+def test_risk_fanout_records_output_mode():
+    manager = _manager(risk_mode="fanout")
+    manager.risk_agent = _Agent(TOON_RISK, output_mode="structured")
+    manager.final_data.update({"product": {"name": "App", "features": [{"name": "Login", "reason": "core"}]},
+                               "engineer": {"analysis": {}}})
+
+    assert manager.run_risk_agent()
+    assert manager.output_modes["risk"] == "structured"
+    assert manager.fingerprints["risk"]["system_fingerprint"] == "fp_1"
+
+def test_engineer_sections_record_output_mode():
+    manager = _manager(engineer_mode="sections")
+    manager.engineer_section_agent = _Agent("tech_stack:\n  backend: FastAPI")
+    manager.final_data["customer"] = {"market_analysis": {}}
+
+    assert manager.run_engineer_agent()
+    assert manager.output_modes["engineer"] == "toon"
+    assert manager.fingerprints["engineer"]["temperature"] == manager.stage_settings["engineer"]["temperature"]
+
+def test_batched_clarifier_records_output_mode():
+    manager = _manager()
+    manager.clarifier_agent = _Agent('{"done": true, "resp": []}', output_mode="structured")
+
+    assert manager._run_batched_clarifier(HumanMessage(content="based on this: habits."), "habits", {}, False)
+    assert manager.output_modes["clarifier"] == "structured"
+    assert "clarifier" in manager.fingerprints
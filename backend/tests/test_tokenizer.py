@@ -0,0 +1,97 @@
+import math
+
+import pytest
+import tiktoken
+
+from src.utils import tokenizer as tokenizer_module
+from src.utils.tokenizer import Tokenizer, encoding_name, heuristic_tokens
+
+class _BrokenTiktoken:
+    """tiktoken stand-in whose encodings can't be loaded (e.g. no network)"""
+
+    @staticmethod
+    def get_encoding(name):
+        raise ConnectionError("encoding download failed")
+
+def _byte_encoding(name="cl100k_base"):
+    """Offline byte-level encoding: one token per UTF-8 byte"""
+    return tiktoken.Encoding(name=name, pat_str=r"\S+|\s+",
+                             mergeable_ranks={bytes([i]): i for i in range(256)}, special_tokens={})
+
+@pytest.fixture
+def offline_tokenizer(monkeypatch):
+    monkeypatch.setattr(tokenizer_module, "tiktoken", _BrokenTiktoken)
+    return Tokenizer()
+
+@pytest.fixture
+def byte_tokenizer():
+    tokenizer = Tokenizer()
+    tokenizer._encodings["cl100k_base"] = _byte_encoding()
+    return tokenizer
+
+@pytest.mark.parametrize("model, encoding", [
+    ("gpt-4o-mini", "o200k_base"),
+    ("openai/gpt-4.1", "o200k_base"),
+    ("o3-mini", "o200k_base"),
+    ("gpt-4-turbo", "cl100k_base"),
+    ("z-ai/glm-4.5-air:free", "cl100k_base"),
+    ("playai-tts", "cl100k_base"),
+])
+def test_encoding_name(model, encoding):
+    assert encoding_name(model) == encoding
+
+def test_heuristic_tokens():
+    assert heuristic_tokens("") == 0
+    assert heuristic_tokens("ab") == 1
+    assert heuristic_tokens("abcdefg") == 3
+
+def test_count_falls_back_when_encoding_unavailable(offline_tokenizer):
+    text = "A habit tracker for remote teams"
+    assert offline_tokenizer.count(text, "gpt-4o") == math.ceil(len(text) / 3)
+    assert offline_tokenizer.count("", "gpt-4o") == 0
+    assert offline_tokenizer.stats()["encodings"] == {"o200k_base": False}
+    assert offline_tokenizer.stats()["fallbacks"] == 1
+
+def test_count_batch_falls_back_when_encoding_unavailable(offline_tokenizer):
+    texts = ["", "ab", "abcdefg", "x" * 300]
+    assert offline_tokenizer.count_batch(texts) == [0, 1, 3, 100]
+    assert offline_tokenizer.truncate("abcdefghij", 2) == "abcdef"
+
+def test_count_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(tokenizer_module, "tiktoken", None)
+    assert Tokenizer().count("abcdef") == 2
+
+def test_count_uses_encoding_and_cache(byte_tokenizer):
+    assert byte_tokenizer.count("héllo") == len("héllo".encode("utf-8"))
+    assert byte_tokenizer.count("héllo") == 6
+    stats = byte_tokenizer.stats()
+    assert stats["cached"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_count_batch_matches_single_counts(byte_tokenizer):
+    texts = ["one", "", "two words", "one", "three more words"]
+    counts = byte_tokenizer.count_batch(texts)
+    assert counts == [len(text.encode("utf-8")) for text in texts]
+    assert counts == [byte_tokenizer.count(text) for text in texts]
+
+def test_long_texts_are_not_cached(byte_tokenizer):
+    byte_tokenizer.count("x" * (tokenizer_module.CACHE_MAX_CHARS + 1))
+    assert byte_tokenizer.stats()["cached"] == 0
+
+def test_cache_is_bounded():
+    tokenizer = Tokenizer(cache_size=2)
+    tokenizer._encodings["cl100k_base"] = _byte_encoding()
+    tokenizer.count_batch(["a", "b", "c"])
+    assert tokenizer.stats()["cached"] == 2
+
+def test_truncate(byte_tokenizer):
+    assert byte_tokenizer.truncate("abcdef", 3) == "abc"
+    assert byte_tokenizer.truncate("abc", 10) == "abc"
+
+def test_tts_estimate_stays_conservative(monkeypatch):
+    from src.services.tts import tts_api
+
+    monkeypatch.setattr(tts_api, "count_tokens", lambda text, model=None: len(text) // 5)
+    assert tts_api.estimate_tokens("x" * 30) == 10
+    monkeypatch.setattr(tts_api, "count_tokens", lambda text, model=None: len(text))
+    assert tts_api.estimate_tokens("x" * 30) == 30
@@ -0,0 +1,43 @@
+import pytest
+
+from src.utils import toon
+
+def test_loads_scalars_and_nested_objects():
+    data = toon.loads("name: Habit App\nscore: 4.5\ncount: 3\ndone: true\nmeta:\n  owner: Ana\n  public: false")
+    assert data == {"name": "Habit App", "score": 4.5, "count": 3, "done": True,
+                    "meta": {"owner": "Ana", "public": False}}
+
+def test_loads_table_rows():
+    data = toon.loads("features:\n  name, priority\n  Reminders, 1\n  Streaks, 2\ndone: true")
+    assert data == {"features": [{"name": "Reminders", "priority": 1}, {"name": "Streaks", "priority": 2}],
+                    "done": True}
+
+def test_loads_simple_list_items():
+    data = toon.loads("goals:\n  - Ship v1\n  - Reach 1k users")
+    assert data == {"goals": ["Ship v1", "Reach 1k users"]}
+
+def test_loads_empty_list():
+    assert toon.loads("recommendations: []") == {"recommendations": []}
+
+def test_pipe_delimited_table_keeps_commas():
+    data = {"features": [{"name": "Login", "reason": "Email, password and SSO"}]}
+    text = toon.dumps(data, delimiter="|")
+    assert text == "features:\n  name | reason\n  Login | Email, password and SSO"
+    assert toon.loads(text) == data
+
+def test_round_trip():
+    data = {"product": {"name": "App", "tags": "a, b"}, "features": [{"name": "X", "priority": 1}]}
+    assert toon.loads(toon.dumps(data)) == data
+
+@pytest.mark.parametrize("text", [
+    "```toon\nname: App\ndone: true\n```",
+    "Here you go:\n```json\n{\"name\": \"App\", \"done\": true}\n```",
+    "{\"name\": \"App\", \"done\": true}",
+    "name: App\ndone: true",
+])
+def test_parse_response_formats(text):
+    assert toon.parse_response(text) == {"name": "App", "done": True}
+
+@pytest.mark.parametrize("text", ["", "   ", None])
+def test_parse_response_empty(text):
+    assert toon.parse_response(text) == {}